@@ -3,27 +3,26 @@ import time
 from pathlib import Path
 
 import numpy as np
-import pandas as pd
 from sklearn.linear_model import SGDClassifier
 from sklearn.metrics import accuracy_score
 from sklearn.model_selection import train_test_split
 
 import psutil, os
 
-BASE_DIR = Path(__file__).parents[1].resolve()
-DATA_DIR = BASE_DIR / "../data_small"
+from src.preprocessing.datasetLoader import find_dataset, load_array
+
 process = psutil.Process(os.getpid())
 def get_mem_mb():
     return process.memory_info().rss / (1024 * 1024)
 
 
 def run_plaintext_baseline(dataset: str):
-    data_path = DATA_DIR / f"{dataset}.csv"
+    data_path = find_dataset(dataset)
     print(data_path)
-    df = pd.read_csv(data_path, header=None).astype(float)
+    data = load_array(data_path)
 
-    X = df.iloc[:, :-1].values
-    y = df.iloc[:, -1].values
+    X = data[:, :-1]
+    y = data[:, -1]
 
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, shuffle=False
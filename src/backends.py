@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+
+# ======================================================
+# MP-SPDZ protocol backends
+# ======================================================
+#
+# A backend pairs a party binary with the domain its shares live in, so
+# that offline.py writes input shares the protocol reconstructs correctly:
+#   - "ring": Z_2^64 (compile.py -R 64). Shares are uniform in Z_2^64 and
+#     only sum to x modulo 2^64, which is exactly the ring's arithmetic.
+#   - "field": a prime field of about 128 bits (compile.py default). Ring
+#     shares would reconstruct to x + j * 2^64 there, so the shares are
+#     integers instead: statistical masks below 2^FIELD_MASK_BITS whose
+#     plain sum is x, valid in any field larger than 2^64.
+# Every party inputs its share and thesis.mpc sums the n_parties inputs.
+# sfix truncation in Z_2^64 needs k + f <= RING_BITS; a larger ring would
+# not help, the ring shares only reconstruct modulo exactly 2^64.
+
+RING_BITS = 64
+
+
+@dataclass(frozen=True)
+class Backend:
+    """Party binary, number of parties, share domain and security model of a protocol."""
+
+    name: str
+    binary: str
+    n_parties: int
+    domain: str  # "ring" or "field"
+    security: str
+    fixed_parties: bool = False  # binary only runs its n_parties, takes no -N
+
+    @property
+    def compile_flags(self) -> list:
+        return ["-R", str(RING_BITS)] if self.domain == "ring" else []
+
+    @property
+    def encoding(self) -> tuple:
+        """What offline.py has to know to share data for this backend."""
+        return self.domain, self.n_parties
+
+    def check_precision(self, f: int, k: int):
+        """Raise ValueError if sfix(f, k) does not fit the backend's domain."""
+        if self.domain == "ring" and k + f > RING_BITS:
+            raise ValueError(
+                f"sfix precision f={f}, k={k} needs a ring of {k + f} bits, but {self.name} "
+                f"runs in Z_2^{RING_BITS} (offline.py's ring encoding); use k <= {RING_BITS - f}, "
+                f"e.g. the precision chosen by model/precision_tuner.py"
+            )
+
+    def command(self, party: int, program: str, network_args=(), extra_args=()) -> list:
+        """Command line of one party (run in an MP-SPDZ working directory)."""
+        cmd = [f"./{self.binary}", str(party), program]
+        if not self.fixed_parties:
+            cmd += ["-N", str(self.n_parties)]
+        return cmd + list(network_args) + list(extra_args)
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in [
+        Backend("mascot", "mascot-party.x", 2, "field", "malicious, dishonest majority"),
+        Backend("spdz2k", "spdz2k-party.x", 2, "ring", "malicious, dishonest majority"),
+        Backend("semi", "semi-party.x", 2, "field", "semi-honest, dishonest majority"),
+        Backend("semi2k", "semi2k-party.x", 2, "ring", "semi-honest, dishonest majority"),
+        Backend(
+            "replicated-ring", "replicated-ring-party.x", 3, "ring",
+            "semi-honest, honest majority", fixed_parties=True,
+        ),
+    ]
+}
+DEFAULT_BACKEND = "mascot"
+
+
+def get_backend(name: str) -> Backend:
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend {name!r}, choose from {sorted(BACKENDS)}") from None
+
+
+def namespace_for(dataset: str, backend: Backend) -> str:
+    """
+    Player-Data namespace of 'dataset' shared for 'backend': the dataset
+    name for the default backend's encoding, otherwise suffixed with the
+    encoding (e.g. trainingUIS_ring3), so backends sharing an encoding
+    share the files.
+    """
+    if backend.encoding == BACKENDS[DEFAULT_BACKEND].encoding:
+        return dataset
+    domain, n_parties = backend.encoding
+    return f"{dataset}_{domain}{n_parties}"
@@ -0,0 +1,354 @@
+# Unified benchmark over plaintext, fixed-point emulator and MPC backends
+import sys
+import csv
+import json
+import time
+import argparse
+import warnings
+import threading
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import psutil
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import SGDClassifier
+
+import main
+from backends import DEFAULT_BACKEND, get_backend
+from compile_cache import CompileCache
+from log_analysis import parse_log
+from profiler import read_peak_rss_mb
+from preprocessing.datasetLoader import load_array
+
+sys.path.append(str(Path(__file__).parent / "model"))
+from fixed_point_emulator import DEFAULT_F, DEFAULT_K, DEFAULT_LEARNING_RATE, FixedPoint, split_dataset, train_group
+
+# ======================================================
+# Configuration
+# ======================================================
+
+BASE_DIR = main.BASE_DIR
+DATA_DIRS = [BASE_DIR / "data", BASE_DIR / "data_small"]
+RESULTS_DIR = BASE_DIR / "benchmark_results"
+RESULTS_JSONL = RESULTS_DIR / "runs.jsonl"  # one line per measured repetition
+SUMMARY_CSV = RESULTS_DIR / "summary.csv"  # one row per (backend, dataset, config) and invocation
+
+BACKENDS = ("plaintext", "emulator", "mpc")
+REPEATS = 5
+WARMUP = 1
+MPC_REPEATS = 3  # MPC runs are expensive ...
+MPC_WARMUP = 0  # ... and start from a cold process anyway
+RSS_SAMPLE_S = 0.005  # RSS sampling interval where the peak cannot be reset (non-Linux)
+
+METRICS = (
+    "runtime_s",
+    "peak_memory_mb",
+    "train_acc",
+    "test_acc",
+    "data_sent_mb",
+    "global_data_sent_mb",
+    "triples",
+    "edabits",
+    "dabits",
+    "input_tuples",
+)
+
+
+# ======================================================
+# Datasets
+# ======================================================
+
+def find_datasets(data_dirs=DATA_DIRS, names=None):
+    """
+    All CSV datasets in 'data_dirs' (optionally only those in 'names').
+
+    Returns:
+        list of (source, name, path), source being the directory name
+    """
+    found = []
+    for data_dir in data_dirs:
+        for path in sorted(Path(data_dir).glob("*.csv")):
+            if names is None or path.stem in names:
+                found.append((Path(data_dir).name, path.stem, path))
+    return found
+
+
+def load_split(path: Path):
+    """Unshuffled train/test split of a dataset, as used by offline.py."""
+    return split_dataset(load_array(path))
+
+
+# ======================================================
+# Backends
+# ======================================================
+#
+# A backend returns a callable run(repeat) -> dict of METRICS for one
+# configuration. Metrics a backend cannot measure are left out.
+
+def plaintext_backend(path: Path, batch_size: int, epochs: int):
+    """sklearn SGD logistic regression (as in baseline.py); batch_size does not apply."""
+    X_train, y_train, X_test, y_test = load_split(path)
+
+    def run(repeat: int):
+        clf = SGDClassifier(loss="log_loss", max_iter=epochs, tol=None, random_state=repeat)
+        t0 = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", ConvergenceWarning)
+            clf.fit(X_train, y_train)
+        t1 = time.perf_counter()
+        return {
+            "runtime_s": t1 - t0,
+            "train_acc": float(clf.score(X_train, y_train)),
+            "test_acc": float(clf.score(X_test, y_test)),
+        }
+
+    return run
+
+
+def emulator_backend(
+    path: Path, batch_size: int, epochs: int,
+    f: int = DEFAULT_F, k: int = DEFAULT_K, learning_rate: float = DEFAULT_LEARNING_RATE,
+):
+    """Fixed-point emulation of the MPC training (model/fixed_point_emulator.py)."""
+    X_train, y_train, X_test, y_test = load_split(path)
+
+    def run(repeat: int):
+        t0 = time.perf_counter()
+        (result,) = train_group(
+            X_train, y_train, X_test, y_test, batch_size, [epochs], [learning_rate],
+            FixedPoint(f, k), seed=repeat,
+        )
+        t1 = time.perf_counter()
+        return {"runtime_s": t1 - t0, "train_acc": result["train_acc"], "test_acc": result["test_acc"]}
+
+    return run
+
+
+def mpc_backend(
+    path: Path, batch_size: int, epochs: int, cache: CompileCache, tag: str, namespace: str
+):
+    """
+    MASCOT run through main.py. Shares must already be generated for 'path'
+    into 'namespace' (main.run_preprocessing); the program is compiled once
+    (cache) and every repetition is a fresh pair of parties with its own logs.
+    """
+    program_dir = main.compile_mpc(cache, batch_size, epochs, namespace=namespace)
+
+    def run(repeat: int):
+        wall_time, log0, _ = main.run_mpc(
+            batch_size, epochs, path.stem, program_dir=program_dir,
+            tag=f"{tag}_r{repeat}", namespace=namespace,
+        )
+        record = parse_log(log0)
+        run_info = json.loads((Path(log0).parent / "run.json").read_text())
+        return {
+            "runtime_s": wall_time,
+            "peak_memory_mb": run_info.get("peak_rss_mb"),
+            "train_acc": record.train_acc[-1] if record.train_acc else None,
+            "test_acc": record.test_acc[-1] if record.test_acc else None,
+            "data_sent_mb": record.data_sent_mb,
+            "global_data_sent_mb": record.global_data_sent_mb,
+            "triples": record.triples,
+            "edabits": record.edabits,
+            "dabits": record.dabits,
+            "input_tuples": record.input_tuples,
+        }
+
+    return run
+
+
+# ======================================================
+# Measurement and statistics
+# ======================================================
+
+def reset_peak_rss() -> bool:
+    """Reset the RSS high-water mark (VmHWM) of this process to its current RSS (Linux)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def run_peak_rss_mb(run, repeat: int) -> float:
+    """
+    Peak resident set (MB) of the benchmark process during one extra run,
+    the same measure the MPC backend reports for its parties (profiler).
+    On Linux the high-water mark is reset before the run and read after
+    it; elsewhere the RSS is sampled every RSS_SAMPLE_S seconds.
+    """
+    process = psutil.Process()
+    if reset_peak_rss():
+        run(repeat)
+        return read_peak_rss_mb(process.pid)
+
+    peak = process.memory_info().rss
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.wait(RSS_SAMPLE_S):
+            peak = max(peak, process.memory_info().rss)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        run(repeat)
+    finally:
+        done.set()
+        sampler.join()
+    return max(peak, process.memory_info().rss) / (1024 * 1024)
+
+
+def measure(run, repeats: int, warmup: int, measure_memory: bool = True):
+    """
+    Run 'warmup' discarded and 'repeats' measured repetitions.
+    In-process backends get their peak memory (process RSS) from one
+    extra run, so measuring it does not distort the measured runtimes.
+
+    Returns:
+        list of metric dicts, one per measured repetition
+    """
+    for i in range(warmup):
+        run(repeats + 1 + i)  # seeds distinct from the measured ones
+    samples = [run(i) for i in range(repeats)]
+    if measure_memory:
+        peak = run_peak_rss_mb(run, repeats)
+        for sample in samples:
+            sample["peak_memory_mb"] = peak
+    return samples
+
+
+def summarize(samples):
+    """
+    Median and spread of every metric over the repetitions.
+
+    Returns:
+        dict with <metric>_median, <metric>_iqr (p75 - p25), <metric>_min, <metric>_max
+    """
+    summary = {}
+    for metric in METRICS:
+        values = np.array([s[metric] for s in samples if s.get(metric) is not None], dtype=float)
+        if len(values) == 0:
+            continue
+        p25, median, p75 = np.percentile(values, [25, 50, 75])
+        summary[f"{metric}_median"] = median
+        summary[f"{metric}_iqr"] = p75 - p25
+        summary[f"{metric}_min"] = values.min()
+        summary[f"{metric}_max"] = values.max()
+    return summary
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(BASE_DIR),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def write_results(runs, summaries, jsonl_path: Path = RESULTS_JSONL, csv_path: Path = SUMMARY_CSV):
+    """
+    Append raw repetitions to jsonl_path and summary rows to csv_path.
+    The CSV header grows when new metric columns appear.
+    """
+    Path(jsonl_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(jsonl_path, "a") as f:
+        for run in runs:
+            f.write(json.dumps(run) + "\n")
+
+    existing, columns = [], []
+    if Path(csv_path).exists():
+        with open(csv_path, newline="") as f:
+            reader = csv.DictReader(f)
+            existing, columns = list(reader), list(reader.fieldnames or [])
+    for row in summaries:
+        columns += [c for c in row if c not in columns]
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(existing + summaries)
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+def run_benchmarks(
+    backends=BACKENDS, datasets=None, experiments=main.EXPERIMENTS,
+    repeats: int = REPEATS, warmup: int = WARMUP,
+    mpc_repeats: int = MPC_REPEATS, mpc_warmup: int = MPC_WARMUP,
+):
+    """
+    Benchmark every backend on every dataset and (batch_size, epochs)
+    configuration.
+
+    Returns:
+        (list of per-repetition records, list of summary rows)
+    """
+    stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    context = {"timestamp": stamp, "commit": git_commit()}
+
+    party_binary = main.MP_SPDZ_DIR / get_backend(DEFAULT_BACKEND).binary
+    if "mpc" in backends and not party_binary.exists():
+        print(f"[SKIP] mpc backend: {party_binary} not built")
+        backends = [b for b in backends if b != "mpc"]
+    cache = None
+    if "mpc" in backends:
+        main.prepare_sources()
+        cache = CompileCache(main.COMPILE_CACHE_DIR, main.MP_SPDZ_DIR, main.MY_PROGRAM)
+
+    runs, summaries = [], []
+    for source, name, path in find_datasets(names=datasets):
+        for backend in backends:
+            namespace = f"{source}_{name}"  # names repeat across data directories
+            if backend == "mpc":
+                main.run_preprocessing(str(path), namespace)
+            for batch_size, epochs in experiments:
+                config = {
+                    **context, "backend": backend, "source": source, "dataset": name,
+                    "batch_size": batch_size, "epochs": epochs,
+                }
+                if backend == "plaintext":
+                    samples = measure(plaintext_backend(path, batch_size, epochs), repeats, warmup)
+                elif backend == "emulator":
+                    samples = measure(emulator_backend(path, batch_size, epochs), repeats, warmup)
+                else:
+                    run = mpc_backend(
+                        path, batch_size, epochs, cache, f"_bench_{source}", namespace
+                    )
+                    samples = measure(run, mpc_repeats, mpc_warmup, measure_memory=False)
+
+                runs += [{**config, "repeat": i, **s} for i, s in enumerate(samples)]
+                summary = {**config, "repeats": len(samples), **summarize(samples)}
+                summaries.append(summary)
+                print(
+                    f"[BENCH] {backend:<9} {source}/{name} B={batch_size} E={epochs}: "
+                    f"{summary['runtime_s_median']:.4f} s "
+                    f"(IQR {summary['runtime_s_iqr']:.4f}), "
+                    f"test_acc {summary.get('test_acc_median', float('nan')):.3f}"
+                )
+    return runs, summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark plaintext, emulator and MPC training.")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--datasets", nargs="+", help="Dataset names (default: all in data/ and data_small/)")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--mpc-repeats", type=int, default=MPC_REPEATS)
+    parser.add_argument("--mpc-warmup", type=int, default=MPC_WARMUP)
+    args = parser.parse_args()
+
+    runs, summaries = run_benchmarks(
+        args.backends, args.datasets, main.EXPERIMENTS,
+        args.repeats, args.warmup, args.mpc_repeats, args.mpc_warmup,
+    )
+    write_results(runs, summaries)
+    print(f"[INFO] {len(runs)} measurements appended to {RESULTS_JSONL}, summary in {SUMMARY_CSV}")
@@ -0,0 +1,72 @@
+# Report: cold vs. warm load time of a dataset through the memory-mapped dataset cache
+import sys
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(SRC_DIR))
+
+from preprocessing.datasetLoader import find_dataset, load_array, load_data
+
+# ======================================================
+# Configuration
+# ======================================================
+
+DATASETS = ["trainingNhanes", "trainingUIS"]
+REPEATS = 5
+
+
+def median_time(load, fresh_cache: bool):
+    """
+    Median wall time of REPEATS calls of load(cache_dir), each with an empty
+    cache directory (cold) or the same, already filled one (warm).
+
+    Returns:
+        tuple[float, result of the last call]
+    """
+    times = []
+    with tempfile.TemporaryDirectory() as shared:
+        load(shared)  # fills the warm cache (and imports pandas)
+        for _ in range(REPEATS):
+            with tempfile.TemporaryDirectory() as fresh:
+                cache_dir = fresh if fresh_cache else shared
+                t0 = time.perf_counter()
+                result = load(cache_dir)
+                times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    rows = []
+    for name in DATASETS:
+        path = find_dataset(name)
+        csv_time, expected = median_time(
+            lambda _: pd.read_csv(path, header=None).to_numpy(dtype=np.float64), True
+        )
+        variants = {
+            "cold (convert)": (lambda d: load_array(path, d), True),
+            "warm (map)": (lambda d: load_array(path, d), False),
+            "warm (map + read all)": (lambda d: np.array(load_array(path, d)), False),
+            "warm DataFrame": (lambda d: load_data(path, d), False),
+        }
+        rows.append((name, "pd.read_csv (before)", csv_time))
+        for variant, (load, fresh_cache) in variants.items():
+            load_time, data = median_time(load, fresh_cache)
+            assert np.array_equal(np.asarray(data), expected)
+            rows.append((name, variant, load_time))
+
+    print(f"\n=== Dataset load time (median of {REPEATS}) ===")
+    print(f"{'dataset':<16}{'variant':<24}{'load ms':>10}{'speedup':>9}")
+    for name, variant, load_time in rows:
+        baseline = next(t for n, v, t in rows if n == name and v.startswith("pd.read_csv"))
+        print(f"{name:<16}{variant:<24}{load_time * 1000:>10.2f}{baseline / load_time:>8.1f}x")
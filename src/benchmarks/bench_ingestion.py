@@ -0,0 +1,60 @@
+# Report: preprocessing and online cost of division-free vs. per-cell ingestion
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(SRC_DIR))
+
+import main
+from compile_cache import CompileCache, entry_requirements
+from log_analysis import parse_log
+
+# ======================================================
+# Configuration
+# ======================================================
+
+DATASETS = ["trainingLBW", "trainingPCS", "trainingUIS"]
+BATCH_SIZE, EPOCHS = main.EXPERIMENTS[0]
+VARIANTS = {
+    "legacy": ("legacy_ingest",),  # sfix(v) / 2^16 per cell
+    "direct": (),  # sfix._new(column), no division
+}
+
+
+def requirement(reqs: dict, word: str) -> int:
+    """Sum of compiler requirements whose description contains 'word'."""
+    return sum(count for name, count in reqs.items() if word in name.lower())
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    main.prepare_sources()
+    cache = CompileCache(main.COMPILE_CACHE_DIR, main.MP_SPDZ_DIR, main.MY_PROGRAM)
+
+    rows = []
+    for dataset in DATASETS:
+        main.run_preprocessing(dataset)
+        for variant, program_args in VARIANTS.items():
+            entry = main.compile_mpc(cache, BATCH_SIZE, EPOCHS, program_args, namespace=dataset)
+            reqs = entry_requirements(entry)
+            _, log0, _ = main.run_mpc(
+                BATCH_SIZE, EPOCHS, dataset, program_dir=entry, tag=f"_{variant}", namespace=dataset
+            )
+            rows.append(
+                (dataset, variant, requirement(reqs, "triples"),
+                 requirement(reqs, "edabit"), parse_log(log0))
+            )
+
+    print(f"\n=== Ingestion report (B={BATCH_SIZE}, E={EPOCHS}) ===")
+    print(
+        f"{'dataset':<14}{'variant':<8}{'req triples':>13}{'req edaBits':>13}"
+        f"{'used triples':>14}{'used edaBits':>14}{'online s':>10}"
+    )
+    for dataset, variant, req_triples, req_edabits, log in rows:
+        print(
+            f"{dataset:<14}{variant:<8}{req_triples:>13}{req_edabits:>13}"
+            f"{log.triples:>14}{log.edabits:>14}{log.online_time or float('nan'):>10.3f}"
+        )
@@ -0,0 +1,83 @@
+# Benchmark: vectorized GF(2^61 - 1) sharing with MACs vs. the old per-cell dealer loop
+# (correctness of the kernel: tests/test_mersenne.py)
+import sys
+import random
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(SRC_DIR))
+sys.path.append(str(SRC_DIR / "mpc"))
+
+import mersenne
+from preprocessing.datasetLoader import load_array
+
+# ======================================================
+# Configuration
+# ======================================================
+
+DATA_PATH = SRC_DIR.parent / "data" / "trainingNhanes.csv"
+SCALE = 2**16
+P = mersenne.P
+REPEATS = 5  # vectorized timings are medians, the slow loop runs once
+
+
+# ======================================================
+# Reference implementation (previous per-cell dealer loop)
+# ======================================================
+
+def share_with_macs_loop(data, alpha, scale=SCALE):
+    """Per-cell sharing with Python integers, as the dealer did before."""
+    n_rows, n_cols = data.shape
+    out = [[[0] * n_cols for _ in range(n_rows)] for _ in range(4)]
+    for i in range(n_rows):
+        for j in range(n_cols):
+            val = int(round(float(data[i][j]) * scale)) % P
+            share0 = random.randrange(0, P)
+            mac0 = random.randrange(0, P)
+            out[0][i][j] = share0
+            out[1][i][j] = (val - share0) % P
+            out[2][i][j] = mac0
+            out[3][i][j] = (val * alpha - mac0) % P
+    return out
+
+
+def share_with_macs_vectorized(data, scale=SCALE):
+    """The dealer's path (generate_shares): MAC key and shares from the OS CSPRNG."""
+    alpha = int(mersenne.random_elements(()))
+    return mersenne.share_with_macs(mersenne.encode(data, scale), alpha)
+
+
+def median_time(fn, *args) -> float:
+    times = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    data = np.asarray(load_array(DATA_PATH))
+    n_values = data.size
+
+    t0 = time.perf_counter()
+    share_with_macs_loop(data, random.randrange(0, P))
+    t_loop = time.perf_counter() - t0
+
+    t_vec = median_time(share_with_macs_vectorized, data)
+    # part of the vectorized time spent drawing the 2 random elements per value
+    t_random = median_time(mersenne.random_elements, (2,) + data.shape)
+
+    print(f"{DATA_PATH.stem}: {data.shape[0]} rows, {n_values} values")
+    print(f"  loop (random, Mersenne Twister): {t_loop:8.3f} s  {n_values / t_loop:14.0f} values/s")
+    print(f"  vectorized (secrets CSPRNG):     {t_vec:8.3f} s  {n_values / t_vec:14.0f} values/s")
+    print(f"    of which CSPRNG draws:         {t_random:8.3f} s")
+    print(f"  speedup:                         {t_loop / t_vec:8.1f}x")
@@ -0,0 +1,90 @@
+# Benchmark: vectorized share generation vs. the per-cell loop
+import sys, os
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(SRC_DIR))
+
+from offline import additive_shares, to_signed_64, save_shares, share_matrix, encode_fixed_point
+from preprocessing.datasetLoader import load_data
+
+# ======================================================
+# Configuration
+# ======================================================
+
+DATA_DIR = SRC_DIR.parent / "data"
+DATASETS = ["trainingLBW", "trainingPCS", "trainingUIS", "trainingNhanes"]
+SCALE = 2**16
+REPEATS = 3
+
+
+# ======================================================
+# Reference implementation (previous save_shares loop)
+# ======================================================
+
+def save_shares_loop(filename_p0, filename_p1, data, scale=SCALE):
+    """
+    Per-cell share generation as implemented before the NumPy engine.
+    Kept only as a reference point for this benchmark.
+    """
+    with open(filename_p0, "w") as f0, open(filename_p1, "w") as f1:
+        n_rows, n_cols = data.shape
+        for i in range(n_rows):
+            row_p0, row_p1 = [], []
+            for j in range(n_cols):
+                val = data.iat[i, j]
+                if j == n_cols - 1:
+                    val = int(val)
+                else:
+                    val = int(round(val * scale))
+                s0, s1 = additive_shares(val)
+                row_p0.append(to_signed_64(s0))
+                row_p1.append(to_signed_64(s1))
+            f0.write(" ".join(str(x) for x in row_p0) + ("\n" if i != n_rows - 1 else ""))
+            f1.write(" ".join(str(x) for x in row_p1) + ("\n" if i != n_rows - 1 else ""))
+
+
+def best_time(fn, *args):
+    """Return the best wall time of REPEATS calls of fn(*args)."""
+    times = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def check_reconstruction(data):
+    """Shares must add up to the fixed-point encoding modulo 2^64."""
+    share0, share1 = share_matrix(data, SCALE)
+    reconstructed = share0.view(np.uint64) + share1.view(np.uint64)
+    expected = encode_fixed_point(data, SCALE).view(np.uint64)
+    assert np.array_equal(reconstructed, expected), "reconstruction mismatch"
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        f0 = os.path.join(tmp, "Input-P0-0")
+        f1 = os.path.join(tmp, "Input-P1-0")
+
+        print(f"{'dataset':<16}{'rows':>8}{'loop rows/s':>16}{'numpy rows/s':>16}{'speedup':>10}")
+        for name in DATASETS:
+            df = load_data(DATA_DIR / f"{name}.csv")
+            check_reconstruction(df)
+
+            t_loop = best_time(save_shares_loop, f0, f1, df)
+            t_vec = best_time(save_shares, f0, f1, df)
+
+            n_rows = len(df)
+            print(
+                f"{name:<16}{n_rows:>8}{n_rows / t_loop:>16.0f}"
+                f"{n_rows / t_vec:>16.0f}{t_loop / t_vec:>9.1f}x"
+            )
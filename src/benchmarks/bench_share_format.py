@@ -0,0 +1,86 @@
+# Benchmark: text vs. binary share files (write/read time and disk size)
+import sys, os
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(SRC_DIR))
+
+from offline import share_matrix, write_share_text, write_share_binary, load_share_binary
+from preprocessing.datasetLoader import load_data
+
+# ======================================================
+# Configuration
+# ======================================================
+
+DATA_DIR = SRC_DIR.parent / "data"
+SCALE = 2**16
+REPEATS = 3
+
+
+def best_time(fn):
+    """Return (best wall time, last result) of REPEATS calls of fn()."""
+    times, result = [], None
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def write_text(path, shares):
+    with open(path, "w") as f:
+        write_share_text(f, shares)
+
+
+def write_binary(path, shares):
+    with open(path, "wb") as f:
+        write_share_binary(f, shares, SCALE)
+
+
+def read_text(path):
+    return np.loadtxt(path, dtype=np.int64)
+
+
+def read_binary(path):
+    # np.array forces every page of the memmap to be read
+    return np.array(load_share_binary(path))
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "Input-P0-0")
+        bin_path = os.path.join(tmp, "Input-P0-0.bin")
+
+        print(
+            f"{'dataset':<16}{'format':<8}{'write s':>10}{'read s':>10}"
+            f"{'size KiB':>12}{'size ratio':>12}"
+        )
+        for csv_path in sorted(DATA_DIR.glob("*.csv")):
+            df = load_data(csv_path)
+            shares, _ = share_matrix(df, SCALE)
+
+            t_write_text, _ = best_time(lambda: write_text(text_path, shares))
+            t_write_bin, _ = best_time(lambda: write_binary(bin_path, shares))
+            t_read_text, from_text = best_time(lambda: read_text(text_path))
+            t_read_bin, from_bin = best_time(lambda: read_binary(bin_path))
+            assert np.array_equal(from_text.reshape(shares.shape), shares)
+            assert np.array_equal(from_bin, shares)
+
+            size_text = os.path.getsize(text_path)
+            size_bin = os.path.getsize(bin_path)
+            for fmt, t_w, t_r, size in (
+                ("text", t_write_text, t_read_text, size_text),
+                ("binary", t_write_bin, t_read_bin, size_bin),
+            ):
+                print(
+                    f"{csv_path.stem:<16}{fmt:<8}{t_w:>10.4f}{t_r:>10.4f}"
+                    f"{size / 1024:>12.1f}{size / size_bin:>11.2f}x"
+                )
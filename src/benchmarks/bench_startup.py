@@ -0,0 +1,98 @@
+# Report: time to first share of main.run_preprocessing's old subprocess path vs. in-process
+import sys
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(SRC_DIR))
+
+import main
+import offline
+
+# ======================================================
+# Configuration
+# ======================================================
+
+DATASETS = ["trainingLBW", "trainingUIS", str(main.BASE_DIR / "data" / "trainingNhanes.csv")]
+REPEATS = 3
+OFFLINE_SCRIPT = SRC_DIR / main.PREPROCESSING_SCRIPT
+
+# Before: offline.py imported pandas and scikit-learn (for train_test_split)
+# at module level and main.py started it through "conda run" per dataset
+EAGER_IMPORTS = (
+    "import pandas, sklearn.model_selection, runpy, sys; sys.argv = sys.argv[1:]; "
+    f"runpy.run_path({str(OFFLINE_SCRIPT)!r}, run_name='__main__')"
+)
+
+
+def conda_env_exists() -> bool:
+    if shutil.which("conda") is None:
+        return False
+    result = subprocess.run(["conda", "env", "list"], capture_output=True, text=True)
+    return main.CONDA_ENV_NAME in result.stdout.split()
+
+
+def variants() -> dict:
+    """Name -> function(dataset, cwd, use_cache) that shares 'dataset' into cwd/Player-Data."""
+
+    def command(prefix):
+        def run(dataset, cwd, use_cache):
+            args = [dataset, "--format", main.SHARE_FORMAT] + ([] if use_cache else ["--no-cache"])
+            subprocess.run(prefix + args, cwd=cwd, check=True, capture_output=True)
+        return run
+
+    def in_process(dataset, cwd, use_cache):
+        offline.preprocess(
+            dataset, share_format=main.SHARE_FORMAT, use_cache=use_cache,
+            player_data=str(Path(cwd) / offline.OUTPUT_DIR),
+        )
+
+    runs = {}
+    if conda_env_exists():
+        runs["conda run (before)"] = command(
+            ["conda", "run", "-n", main.CONDA_ENV_NAME, "python", "-c", EAGER_IMPORTS, "offline.py"]
+        )
+    runs["subprocess, eager imports (before)"] = command(
+        [sys.executable, "-c", EAGER_IMPORTS, "offline.py"]
+    )
+    runs["subprocess, lazy imports"] = command([sys.executable, str(OFFLINE_SCRIPT)])
+    runs["in-process (after)"] = in_process
+    return runs
+
+
+def time_run(run, dataset: str, use_cache: bool) -> float:
+    """Median wall time of REPEATS runs, each in a fresh directory (after one warm-up share for hits)."""
+    times = []
+    for _ in range(REPEATS):
+        with tempfile.TemporaryDirectory() as cwd:
+            if use_cache:
+                offline.preprocess(
+                    dataset, share_format=main.SHARE_FORMAT,
+                    player_data=str(Path(cwd) / offline.OUTPUT_DIR),
+                )
+            t0 = time.perf_counter()
+            run(dataset, cwd, use_cache)
+            times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    runs = variants()
+    rows = [
+        (Path(dataset).stem, name, time_run(run, dataset, False), time_run(run, dataset, True))
+        for dataset in DATASETS
+        for name, run in runs.items()
+    ]
+
+    print(f"\n=== Time to first share (median of {REPEATS}) ===")
+    print(f"{'dataset':<16}{'variant':<38}{'share s':>9}{'cache hit s':>13}")
+    for dataset, name, share_time, hit_time in rows:
+        print(f"{dataset:<16}{name:<38}{share_time:>9.3f}{hit_time:>13.3f}")
@@ -0,0 +1,68 @@
+# Report: online time and training throughput against the MP-SPDZ thread count
+import sys
+import json
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(SRC_DIR))
+
+import main
+from compile_cache import CompileCache, entry_requirements, read_metadata
+from cost_model import summarize_requirements
+from log_analysis import parse_log
+
+# ======================================================
+# Configuration
+# ======================================================
+
+DATASET = main.BASE_DIR / "data" / "trainingNhanes.csv"
+BATCH_SIZE, EPOCHS = main.EXPERIMENTS[0]
+THREAD_COUNTS = [1, 2, 4, 8]
+
+
+def epoch_throughput(events_file: Path) -> float:
+    """Mean training samples/s of party 0 over the epochs after the first (input phase)."""
+    events = [json.loads(line) for line in events_file.read_text().splitlines()]
+    rates = [
+        e["samples_per_s"] for e in events
+        if e["event"] == "epoch" and e["party"] == 0 and e["epoch"] > 1 and e["samples_per_s"]
+    ]
+    return sum(rates) / len(rates) if rates else float("nan")
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    main.prepare_sources()
+    cache = CompileCache(main.COMPILE_CACHE_DIR, main.MP_SPDZ_DIR, main.MY_PROGRAM)
+    namespace = DATASET.stem
+    main.run_preprocessing(str(DATASET), namespace)
+    params = read_metadata(main.player_data_dir(namespace) / "metadata.txt")
+
+    rows = []
+    for threads in THREAD_COUNTS:
+        entry = main.compile_mpc(cache, BATCH_SIZE, EPOCHS, namespace=namespace, threads=threads)
+        wall_time, log0, _ = main.run_mpc(
+            BATCH_SIZE, EPOCHS, namespace, program_dir=entry, tag=f"_t{threads}", namespace=namespace
+        )
+        rows.append((
+            threads, summarize_requirements(entry_requirements(entry))["rounds"], wall_time,
+            parse_log(log0), epoch_throughput(Path(log0).parent / "events.jsonl"),
+        ))
+
+    print(f"\n=== Thread scaling on {namespace} (n_train={params['n_train']}, d={params['d']}, "
+          f"B={BATCH_SIZE}, E={EPOCHS}) ===")
+    print(
+        f"{'threads':>8}{'rounds':>10}{'online s':>10}{'speedup':>9}{'wall s':>9}"
+        f"{'samples/s':>11}{'data MB':>10}"
+    )
+    base = rows[0][3].online_time
+    for threads, rounds, wall_time, log, throughput in rows:
+        online = log.online_time or float("nan")
+        speedup = base / online if base and log.online_time else float("nan")
+        print(
+            f"{threads:>8}{rounds:>10}{online:>10.3f}{speedup:>9.2f}{wall_time:>9.3f}"
+            f"{throughput:>11.1f}{log.data_sent_mb or float('nan'):>10.1f}"
+        )
@@ -0,0 +1,214 @@
+import fcntl
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+# ======================================================
+# Content-addressed cache for compiled MP-SPDZ programs
+# ======================================================
+#
+# thesis.mpc reads metadata.txt (sizes, batch size, epochs, ...) and the
+# share files at compile time, so the compiled schedule/bytecode and the
+# Input-Binary-P* files written by input_tensor_via depend on:
+#   - the .mpc source and the Python modules it imports from Programs/Source
+#   - metadata.txt (compile-time parameters)
+#   - the Input-P*-* share files
+#   - the compiler flags and program arguments
+# An entry is keyed by a SHA-256 over exactly these inputs. Metadata and
+# shares may live in a namespace (Player-Data/<namespace>/, selected by
+# the program argument ns=<namespace>). Compilations are serialized by a
+# lock file, as input_tensor_via writes the shared Player-Data/Input-Binary-P*.
+
+CACHE_VERSION = "1"
+SOURCE_MODULES = ["sigmoid_approx.py"]  # imported by thesis.mpc (sigmoid=<name>)
+
+
+def _hash_file(h, path: Path):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+
+
+def read_metadata(metadata_file: Path) -> dict:
+    """
+    Parse metadata.txt into a dict: the five positional lines plus any
+    optional 'key=value' lines.
+    """
+    lines = metadata_file.read_text().splitlines()
+    names = ["n_train", "d", "n_test", "batch_size", "n_epochs"]
+    params = {name: int(value) for name, value in zip(names, lines)}
+    params.update(line.split("=", 1) for line in lines[len(names):] if "=" in line)
+    return params
+
+
+# "Program requires:" block of compile.py, e.g.
+#        12345 integer triples
+#          ~80 virtual machine rounds
+requirement_pattern = re.compile(r"^\s+~?(\d+) ([a-zA-Z].*?)\s*$")
+
+
+def parse_requirements(compile_output: str) -> dict:
+    """
+    Extract the preprocessing requirements reported by compile.py as
+    {description: count}, e.g. {"integer triples": 12345, ...}.
+    """
+    requirements = {}
+    lines = compile_output.splitlines()
+    for i, line in enumerate(lines):
+        if not line.startswith("Program requires"):
+            continue
+        for req_line in lines[i + 1:]:
+            match = requirement_pattern.match(req_line)
+            if not match:
+                break
+            requirements[match.group(2)] = requirements.get(match.group(2), 0) + int(match.group(1))
+    return requirements
+
+
+def entry_requirements(entry: Path) -> dict:
+    """Requirements of a compile cache entry (see parse_requirements)."""
+    return parse_requirements((Path(entry) / "compile.log").read_text())
+
+
+def compiled_name(program: str, args=()) -> str:
+    """Name compile.py gives a program compiled with 'args': <program>-<arg1>-<arg2>..."""
+    return "-".join([program, *args])
+
+
+def entry_program(entry: Path) -> str:
+    """Name to run a compile cache entry's program with (party binaries)."""
+    manifest = json.loads((Path(entry) / "manifest.json").read_text())
+    return manifest.get("name", manifest["program"])
+
+
+class CompileCache:
+    """
+    Compile each distinct (source, parameters, flags, inputs) combination
+    once and keep the result on disk across runs and invocations.
+
+    An entry directory contains:
+        Programs/Schedules/<name>.sch, Programs/Bytecode/<name>-*.bc
+        Player-Data/Input-Binary-P*   (inputs embedded at compile time)
+        compile.log                   (compiler output)
+        manifest.json                 (key, name, parameters, flags, compile time)
+    where <name> is compiled_name(program, args).
+    """
+
+    def __init__(self, cache_dir: Path, mp_spdz_dir: Path, program: str):
+        self.cache_dir = Path(cache_dir)
+        self.mp_spdz_dir = Path(mp_spdz_dir)
+        self.program = program
+        self.hits = 0
+        self.misses = 0
+        self.compile_time = 0.0
+
+    @property
+    def source_file(self) -> Path:
+        return self.mp_spdz_dir / "Programs" / "Source" / f"{self.program}.mpc"
+
+    @property
+    def player_data(self) -> Path:
+        return self.mp_spdz_dir / "Player-Data"
+
+    def data_dir(self, namespace: str = None) -> Path:
+        """Directory holding metadata.txt and the share files."""
+        return self.player_data / namespace if namespace else self.player_data
+
+    def key(self, flags, args=(), namespace: str = None) -> str:
+        """SHA-256 over source, metadata, share files, flags and program args."""
+        data_dir = self.data_dir(namespace)
+        h = hashlib.sha256(CACHE_VERSION.encode())
+        _hash_file(h, self.source_file)
+        for module in SOURCE_MODULES:
+            if (self.source_file.parent / module).exists():
+                _hash_file(h, self.source_file.parent / module)
+        _hash_file(h, data_dir / "metadata.txt")
+        for share_file in sorted(data_dir.glob("Input-P*")):
+            h.update(share_file.name.encode())
+            _hash_file(h, share_file)
+        h.update(json.dumps([list(flags), list(args)]).encode())
+        return h.hexdigest()
+
+    def get(self, flags=(), args=(), namespace: str = None) -> Path:
+        """
+        Return the entry directory for the current metadata and shares of
+        'namespace', compiling on a miss. 'flags' go to compile.py, 'args'
+        to the program (program.args).
+        """
+        key = self.key(flags, args, namespace)
+        entry = self.cache_dir / key
+        if (entry / "manifest.json").exists():
+            self.hits += 1
+            print(f"[CACHE] Compile cache hit {key[:12]}")
+            return entry
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)  # one compilation at a time
+            if (entry / "manifest.json").exists():  # compiled while we waited
+                self.hits += 1
+                print(f"[CACHE] Compile cache hit {key[:12]}")
+                return entry
+
+            self.misses += 1
+            print(f"[CACHE] Compile cache miss {key[:12]}, compiling {self.program}...")
+            t0 = time.perf_counter()
+            result = subprocess.run(
+                ["./compile.py", *flags, self.program, *args],
+                cwd=str(self.mp_spdz_dir),
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            compile_time = time.perf_counter() - t0
+            self.compile_time += compile_time
+            print(result.stdout)
+
+            self._store(entry, key, flags, args, namespace, result.stdout, compile_time)
+        print(f"[TIMING] Compilation took {compile_time:.3f} s")
+        return entry
+
+    def _store(self, entry: Path, key: str, flags, args, namespace, output: str, compile_time: float):
+        # build in a temporary directory, then rename: no half-written entries
+        tmp = entry.with_name(entry.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        (tmp / "Programs" / "Schedules").mkdir(parents=True)
+        (tmp / "Programs" / "Bytecode").mkdir(parents=True)
+        (tmp / "Player-Data").mkdir(parents=True)
+
+        name = compiled_name(self.program, args)
+        programs = self.mp_spdz_dir / "Programs"
+        shutil.copy2(
+            programs / "Schedules" / f"{name}.sch",
+            tmp / "Programs" / "Schedules",
+        )
+        for bytecode in programs.glob(f"Bytecode/{name}-[0-9]*.bc"):
+            shutil.copy2(bytecode, tmp / "Programs" / "Bytecode")
+        for binary_input in self.player_data.glob("Input-Binary-P*"):
+            shutil.copy2(binary_input, tmp / "Player-Data")
+
+        (tmp / "compile.log").write_text(output)
+        manifest = {
+            "key": key,
+            "program": self.program,
+            "name": name,
+            "namespace": namespace,
+            "params": read_metadata(self.data_dir(namespace) / "metadata.txt"),
+            "flags": list(flags),
+            "args": list(args),
+            "compile_time_s": compile_time,
+        }
+        (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+        shutil.rmtree(entry, ignore_errors=True)
+        tmp.rename(entry)
+
+    def report(self):
+        print(
+            f"[CACHE] Compile cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.compile_time:.3f} s compiling"
+        )
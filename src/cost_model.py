@@ -0,0 +1,207 @@
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+
+from backends import DEFAULT_BACKEND, get_backend
+from compile_cache import entry_requirements
+from log_analysis import parse_logs
+
+# ======================================================
+# Cost model for MPC runs
+# ======================================================
+#
+# Two stages, each a least-squares fit on data we already have:
+#   1) parameters -> preprocessing requirements
+#      fitted on compile cache entries (manifest params + compile.log)
+#   2) requirements -> online time, offline time, global data sent
+#      fitted on past runs (LOG_DIR/<exp>/run.json + party 0 log) under
+#      one network profile and protocol backend, as latency, bandwidth and
+#      the protocol change the costs
+# Both stages only use compilations and runs of one preprocessing mode
+# (main.PREPROCESSING_MODE): dealer runs have no MASCOT offline phase and
+# are compiled differently (-P, no_edabit), so mixing the modes would skew
+# offline_time and with it the total time plan_experiments budgets.
+# A configuration that is already compiled uses its exact requirements
+# and skips stage 1.
+
+REQUIREMENTS = ("triples", "edabits", "dabits", "bits", "inputs", "rounds")
+TARGETS = ("online_time", "offline_time", "global_data_sent_mb")
+
+
+def summarize_requirements(requirements: dict) -> dict:
+    """Collapse the compiler's descriptions into the REQUIREMENTS kinds."""
+    summary = dict.fromkeys(REQUIREMENTS, 0)
+    for name, count in requirements.items():
+        name = name.lower()
+        if "edabit" in name:
+            summary["edabits"] += count
+        elif "dabit" in name:
+            summary["dabits"] += count
+        elif "triple" in name:
+            summary["triples"] += count
+        elif "input" in name:
+            summary["inputs"] += count
+        elif "round" in name:
+            summary["rounds"] += count
+        elif name.endswith("bits"):
+            summary["bits"] += count
+    return summary
+
+
+def config_features(n_train, d, n_test, batch_size, n_epochs):
+    """
+    Features of a training configuration that drive its cost:
+    multiplications (E * n * d), sigmoids/comparisons (E * n),
+    batches (E * ceil(n_train / B)) and input size (n * (d + 1)).
+    """
+    n = n_train + n_test
+    return np.array(
+        [
+            1.0,
+            n_epochs * n * d,
+            n_epochs * n,
+            n_epochs * math.ceil(n_train / batch_size),
+            n * (d + 1),
+        ]
+    )
+
+
+def requirement_features(summary: dict):
+    return np.array([1.0] + [float(summary[kind]) for kind in REQUIREMENTS])
+
+
+def _fit(rows, values):
+    """
+    Least squares with column scaling; returns (coefficients, scale) or
+    None without data. Underdetermined systems get the min-norm solution.
+    """
+    if not rows:
+        return None
+    X = np.array(rows, dtype=float)
+    scale = np.abs(X).max(axis=0)
+    scale[scale == 0] = 1.0
+    coef, *_ = np.linalg.lstsq(X / scale, np.array(values, dtype=float), rcond=None)
+    return coef, scale
+
+
+def _predict(fit, features):
+    if fit is None:
+        return None
+    coef, scale = fit
+    return max(0.0, float((features / scale) @ coef))
+
+
+def _params(p: dict, args=()):
+    """Config of a compiled program; resumed programs train only the epochs after resume=<e>."""
+    resume = next((int(a.split("=", 1)[1]) for a in args if a.startswith("resume=")), 0)
+    return (
+        int(p["n_train"]), int(p["d"]), int(p["n_test"]),
+        int(p["batch_size"]), int(p.get("n_epochs", p.get("epochs", 0))) - resume,
+    )
+
+
+class CostModel:
+    """Predict requirements and costs of (n_train, d, n_test, B, E) configurations."""
+
+    def __init__(self):
+        self.requirement_fits = {}
+        self.cost_fits = {}
+        self.n_compiles = 0
+        self.n_runs = 0
+
+    @classmethod
+    def fit(
+        cls, cache_dir: Path, log_dir: Path, network: str = "lan", program: str = "thesis",
+        backend: str = DEFAULT_BACKEND, preprocessing: str = "mascot",
+    ):
+        model = cls()
+        ring = get_backend(backend).domain == "ring"
+        dealer = preprocessing == "dealer"
+
+        # --- stage 1: compile cache entries ---
+        req_rows, req_values = [], {kind: [] for kind in REQUIREMENTS}
+        summaries = {}
+        for manifest_file in Path(cache_dir).glob("*/manifest.json"):
+            manifest = json.loads(manifest_file.read_text())
+            if manifest.get("program", program) != program:  # e.g. predict.mpc entries
+                continue
+            if ("-R" in manifest.get("flags", [])) != ring:  # compiled for the other domain
+                continue
+            if ("no_edabit" in manifest.get("args", [])) != dealer:  # other preprocessing mode
+                continue
+            summary = summarize_requirements(entry_requirements(manifest_file.parent))
+            summaries[manifest["key"]] = summary
+            req_rows.append(config_features(*_params(manifest["params"], manifest.get("args", ()))))
+            for kind in REQUIREMENTS:
+                req_values[kind].append(summary[kind])
+        model.n_compiles = len(req_rows)
+        model.requirement_fits = {kind: _fit(req_rows, req_values[kind]) for kind in REQUIREMENTS}
+
+        # --- stage 2: past runs joined with their compiled program ---
+        runs = []
+        for run_file in Path(log_dir).glob("*/run.json"):
+            run = json.loads(run_file.read_text())
+            if run.get("network", "lan") != network or run.get("backend", DEFAULT_BACKEND) != backend:
+                continue
+            if run.get("preprocessing", "mascot") != preprocessing:
+                continue
+            if run.get("program_key") in summaries and Path(run["log_p0"]).exists():
+                runs.append(run)
+        records = parse_logs([run["log_p0"] for run in runs], log_dir=log_dir) if runs else []
+
+        cost_rows, cost_values = [], {target: [] for target in TARGETS}
+        for run, record in zip(runs, records):
+            if record.online_time is None:
+                continue
+            cost_rows.append(requirement_features(summaries[run["program_key"]]))
+            for target in TARGETS:
+                cost_values[target].append(getattr(record, target) or 0.0)
+        model.n_runs = len(cost_rows)
+        model.cost_fits = {target: _fit(cost_rows, cost_values[target]) for target in TARGETS}
+
+        print(
+            f"[MODEL] Cost model ({backend}, {network}, {preprocessing}) fitted on "
+            f"{model.n_compiles} compilations, {model.n_runs} runs"
+        )
+        return model
+
+    @property
+    def ready(self) -> bool:
+        return self.n_runs > 0
+
+    def predict_requirements(self, n_train, d, n_test, batch_size, n_epochs) -> dict:
+        features = config_features(n_train, d, n_test, batch_size, n_epochs)
+        return {
+            kind: _predict(self.requirement_fits.get(kind), features) or 0.0
+            for kind in REQUIREMENTS
+        }
+
+    def predict(self, n_train, d, n_test, batch_size, n_epochs, requirements: dict = None):
+        """
+        Predicted online_time, offline_time (s) and global_data_sent_mb,
+        plus total_time = online + offline. Returns None before any run
+        has been observed. 'requirements' (compiler output) overrides stage 1.
+        """
+        if not self.ready:
+            return None
+        summary = (
+            summarize_requirements(requirements)
+            if requirements is not None
+            else self.predict_requirements(n_train, d, n_test, batch_size, n_epochs)
+        )
+        features = requirement_features(summary)
+        prediction = {target: _predict(self.cost_fits[target], features) for target in TARGETS}
+        prediction["total_time"] = prediction["online_time"] + prediction["offline_time"]
+        return prediction
+
+
+def prediction_errors(prediction: dict, record) -> dict:
+    """Relative error (predicted / measured - 1) per target of a finished run."""
+    errors = {}
+    for target in TARGETS:
+        measured = getattr(record, target)
+        if prediction and measured:
+            errors[target] = prediction[target] / measured - 1.0
+    return errors
@@ -0,0 +1,399 @@
+# Long-running multi-party secure inference with micro-batched queries
+import re
+import json
+import time
+import queue
+import argparse
+import threading
+import subprocess
+import socketserver
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+
+import numpy as np
+
+import main
+import offline
+from backends import DEFAULT_BACKEND, get_backend, namespace_for
+from compile_cache import CompileCache, entry_program, read_metadata
+from live_capture import EventStream, start_party, wait_parties
+from preprocessing.datasetLoader import load_array
+
+# ======================================================
+# Configuration
+# ======================================================
+#
+# The parties run predict.mpc once and stay up: the model trained by
+# thesis.mpc is loaded from persistence (see main.save_model) and kept
+# secret-shared in memory, and every batch of queries costs one input
+# phase and one evaluation of 'capacity' rows instead of a process launch,
+# connection setup and a full input phase per prediction.
+#
+# Clients secret-share their query rows themselves (offline.share_encoded,
+# in the encoding of the service's protocol backend) and hand share i to
+# party i. The service collects queries for up to
+# 'window' seconds (or until 'capacity' are waiting) and sends them as one
+# padded batch through the parties' stdin (-I).
+
+SERVICE_PORT = 18540  # port base of the service parties
+CLIENT_PORT = 18600  # local JSON-lines client interface (serve_clients)
+DEFAULT_CAPACITY = 64  # rows per vectorized batch (predict.mpc batch=<rows>)
+BATCH_WINDOWS_MS = [0, 2, 10, 50]  # windows compared by the load benchmark
+N_QUERIES = 512
+N_CLIENTS = 32  # concurrent closed-loop clients of the load benchmark
+READY_TIMEOUT_S = 600.0  # model loading includes MASCOT's offline phase
+
+ready_pattern = re.compile(r"READY d=(\d+) batch=(\d+)")
+prediction_pattern = re.compile(r"PRED \[?([^\]]*)\]?")
+
+
+class _ServiceOutput(EventStream):
+    """Event stream of the service parties that also passes party 0's lines on."""
+
+    def __init__(self, path: Path, on_line):
+        super().__init__(path, exp_name="service")
+        self.on_line = on_line
+
+    def handle_line(self, party: int, line: str):
+        if party == 0:
+            self.on_line(line)
+        super().handle_line(party, line)
+
+
+class InferenceService:
+    """
+    The parties of predict.mpc (run with the protocol 'backend', see
+    backends.py) plus a batcher thread.
+
+    Usage:
+        with InferenceService(program_dir, run_dir, log_dir) as service:
+            probability = service.predict(row).result()
+    """
+
+    def __init__(
+        self,
+        program_dir: Path,
+        run_dir: Path,
+        log_dir: Path,
+        window_s: float = 0.0,
+        scale: int = None,
+        port: int = SERVICE_PORT,
+        backend: str = DEFAULT_BACKEND,
+    ):
+        self.program = entry_program(program_dir)
+        self.backend = get_backend(backend)
+        self.capacity = None  # both announced by predict.mpc once the model is loaded
+        self.n_features = None
+        self.run_dir = Path(run_dir)
+        self.log_dir = Path(log_dir)
+        self.window_s = window_s
+        # queries are encoded like the training data (precision of the dataset)
+        metadata = read_metadata(self.run_dir / "Player-Data" / "metadata.txt")
+        self.scale = scale or int(metadata.get("scale", offline.DEFAULT_SCALE))
+        self.port = port
+
+        self.batches = 0
+        self.queries = 0
+        self._queue = queue.Queue()
+        self._pending = deque()  # futures of the batches sent, in order
+        self._ready = threading.Event()
+        self._parties = []
+        self._batcher = None
+
+    # --- parties ---
+
+    def start(self):
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._events = _ServiceOutput(self.log_dir / "events.jsonl", self._on_line)
+        for party in range(self.backend.n_parties):
+            cmd = self.backend.command(
+                party, self.program, ["-pn", str(self.port), "-h", "localhost"], ["-I"]
+            )
+            self._parties.append(start_party(
+                cmd, self.run_dir, party, self.log_dir / f"service_p{party}.log",
+                self._events, stdin=subprocess.PIPE,
+            ))
+        t0 = time.perf_counter()
+        if not self._ready.wait(READY_TIMEOUT_S):
+            self.close()
+            raise RuntimeError(f"Service parties not ready, see logs in {self.log_dir}")
+        print(f"[SERVICE] Model loaded in {time.perf_counter() - t0:.3f} s, "
+              f"d={self.n_features}, batch capacity {self.capacity}")
+
+        self._batcher = threading.Thread(target=self._run_batcher, daemon=True)
+        self._batcher.start()
+        return self
+
+    def close(self):
+        if self._batcher:
+            self._queue.put(None)
+            self._batcher.join()
+        for proc, _ in self._parties:
+            if proc.stdin:
+                proc.stdin.close()
+        wait_parties(self._parties, self._events)
+        self._events.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _on_line(self, line: str):
+        match = ready_pattern.search(line)
+        if match:
+            self.n_features, self.capacity = int(match.group(1)), int(match.group(2))
+            self._ready.set()
+            return
+        match = prediction_pattern.search(line)
+        if match:
+            values = [float(v) for v in match.group(1).replace(",", " ").split()]
+            for future, value in zip(self._pending.popleft(), values):
+                future.set_result(value)
+
+    # --- queries ---
+
+    def submit_shares(self, *shares) -> Future:
+        """Queue one secret-shared query row (one int64 share per party)."""
+        if len(shares) != self.backend.n_parties:
+            raise ValueError(f"Expected {self.backend.n_parties} shares, got {len(shares)}")
+        shares = tuple(np.asarray(share, dtype=np.int64) for share in shares)
+        for share in shares:
+            if share.shape != (self.n_features,):
+                raise ValueError(
+                    f"Expected shares of {self.n_features} features, got shape {share.shape}"
+                )
+        future = Future()
+        self._queue.put((shares, future))
+        return future
+
+    def predict(self, x) -> Future:
+        """Secret-share one plaintext feature row on the client side and queue it."""
+        encoded = np.rint(np.asarray(x, dtype=np.float64) * self.scale).astype(np.int64)
+        domain, n_parties = self.backend.encoding
+        return self.submit_shares(*offline.share_encoded(encoded, n_parties, domain))
+
+    def _run_batcher(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, deadline = [first], time.perf_counter() + self.window_s
+            while len(batch) < self.capacity:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.perf_counter(), 0.0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            try:
+                self._send(batch)
+            except Exception as e:  # fail this batch's queries, keep serving the others
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+        self._write(0, b"0\n")  # stop predict.mpc
+
+    def _send(self, batch):
+        n_parties = self.backend.n_parties
+        shares = np.zeros((n_parties, self.capacity, self.n_features), dtype=np.int64)
+        for i, (row_shares, _) in enumerate(batch):
+            shares[:, i] = row_shares
+        futures = [future for _, future in batch]
+        self._pending.append(futures)
+        try:
+            for party in range(n_parties):
+                header = f"{len(batch)}\n" if party == 0 else ""
+                values = " ".join(map(str, shares[party].ravel().tolist()))
+                self._write(party, (header + values + "\n").encode())
+        except Exception:
+            self._pending.remove(futures)  # no predictions will come for this batch
+            raise
+        self.batches += 1
+        self.queries += len(batch)
+
+    def _write(self, party: int, data: bytes):
+        stdin = self._parties[party][0].stdin
+        stdin.write(data)
+        stdin.flush()
+
+
+# ======================================================
+# Local client interface
+# ======================================================
+
+class _ClientHandler(socketserver.StreamRequestHandler):
+    """
+    One JSON object per line: {"shares": [row of party 0, row of party 1, ...]},
+    answered with {"probability": p}.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                shares = json.loads(line)["shares"]
+                p = self.server.service.submit_shares(
+                    *(np.asarray(share, dtype=np.int64) for share in shares)
+                ).result()
+                reply = {"probability": p}
+            except (ValueError, KeyError, TypeError) as e:
+                reply = {"error": str(e)}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+
+def serve_clients(service: InferenceService, port: int = CLIENT_PORT):
+    """Accept secret-shared queries from local clients until interrupted."""
+    with socketserver.ThreadingTCPServer(("127.0.0.1", port), _ClientHandler) as server:
+        server.daemon_threads = True
+        server.service = service
+        print(f"[SERVICE] Accepting queries on 127.0.0.1:{port}; Ctrl-C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+# ======================================================
+# Load benchmark
+# ======================================================
+
+def run_load(service: InferenceService, X, n_queries: int = N_QUERIES, clients: int = N_CLIENTS):
+    """
+    Closed-loop load: 'clients' threads each send their queries one after
+    the other, so up to 'clients' queries wait for a batch at any time.
+
+    Returns:
+        dict with p50_ms, p99_ms, qps, mean_batch and the probabilities
+        (in the order of the rows of X used)
+    """
+    rows = np.arange(n_queries) % len(X)
+    latencies = np.zeros(n_queries)
+    probabilities = np.zeros(n_queries)
+    batches0, queries0 = service.batches, service.queries
+
+    def client(indices):
+        for i in indices:
+            t0 = time.perf_counter()
+            probabilities[i] = service.predict(X[rows[i]]).result()
+            latencies[i] = time.perf_counter() - t0
+
+    threads = [
+        threading.Thread(target=client, args=(part,))
+        for part in np.array_split(np.arange(n_queries), clients)
+    ]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - t0
+
+    p50, p99 = np.percentile(latencies * 1000, [50, 99])
+    return {
+        "queries": n_queries,
+        "clients": clients,
+        "p50_ms": p50,
+        "p99_ms": p99,
+        "qps": n_queries / elapsed,
+        "mean_batch": (service.queries - queries0) / max(service.batches - batches0, 1),
+        "rows": rows,
+        "probabilities": probabilities,
+    }
+
+
+def prepare_service(
+    dataset: str, batch_size: int, epochs: int, capacity: int = DEFAULT_CAPACITY,
+    backend: str = DEFAULT_BACKEND, sigmoid: str = None,
+):
+    """
+    Shares, trained model and compiled predict.mpc for 'dataset' under the
+    protocol 'backend': trains with thesis.mpc (sigmoid approximation
+    'sigmoid', default main.SIGMOID) unless main.MODELS_DIR already holds
+    the model of this (dataset, batch_size, epochs, backend). predict.mpc
+    uses the sigmoid the model was trained with (model.json).
+
+    Returns:
+        (program_dir, run_dir) of the service
+    """
+    main.prepare_sources()
+    main.run_preprocessing(dataset, backend=backend)
+    name = Path(dataset).stem
+    namespace = namespace_for(name, get_backend(backend))
+
+    tag = "" if backend == DEFAULT_BACKEND else f"_{backend}"
+    exp_name = f"{name}_B{batch_size}_E{epochs}{tag}"
+    model_dir = main.MODELS_DIR / exp_name
+    if not model_dir.exists():
+        train_cache = CompileCache(main.COMPILE_CACHE_DIR, main.MP_SPDZ_DIR, main.MY_PROGRAM)
+        program_dir = main.compile_mpc(
+            train_cache, batch_size, epochs, namespace=namespace, backend=backend, sigmoid=sigmoid
+        )
+        main.run_mpc(
+            batch_size, epochs, name, program_dir=program_dir, namespace=namespace, backend=backend
+        )
+    if not model_dir.exists():
+        raise RuntimeError(f"Training run {exp_name} persisted no model")
+    sigmoid = sigmoid or main.SIGMOID
+    default_args = [f"sigmoid={sigmoid}"] if sigmoid else []  # models stored without it
+    info = json.loads((model_dir / "model.json").read_text())
+    sigmoid_args = info.get("sigmoid_args", default_args)
+    print(f"[MODEL] Serving {model_dir} ({' '.join(sigmoid_args) or 'exact sigmoid'})")
+
+    cache = CompileCache(main.COMPILE_CACHE_DIR, main.MP_SPDZ_DIR, main.PREDICT_PROGRAM)
+    flags = main.COMPILE_FLAGS + get_backend(backend).compile_flags
+    program_dir = cache.get(
+        flags, (f"batch={capacity}", f"ns={namespace}", *sigmoid_args), namespace
+    )
+    run_dir = main.prepare_run_dir(f"service_{exp_name}", program_dir, namespace, model_dir)
+    return program_dir, run_dir
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve secure predictions of a trained model.")
+    parser.add_argument("dataset", nargs="?", default=main.DATASETS[0])
+    parser.add_argument("--batch-size", type=int, default=main.EXPERIMENTS[0][0], help="Training batch size")
+    parser.add_argument("--epochs", type=int, default=main.EXPERIMENTS[0][1], help="Training epochs")
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="Queries per batch")
+    parser.add_argument("--windows-ms", type=float, nargs="+", default=BATCH_WINDOWS_MS)
+    parser.add_argument("--queries", type=int, default=N_QUERIES)
+    parser.add_argument("--clients", type=int, default=N_CLIENTS)
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, help="Protocol backend (backends.py)")
+    parser.add_argument("--sigmoid", help="Sigmoid approximation to train with (sigmoid_approx.py)")
+    parser.add_argument("--serve", action="store_true", help=f"Accept client queries on port {CLIENT_PORT}")
+    args = parser.parse_args()
+
+    program_dir, run_dir = prepare_service(
+        args.dataset, args.batch_size, args.epochs, args.capacity, args.backend, args.sigmoid
+    )
+    data = load_array(args.dataset)
+    n_train, _ = offline.split_sizes(len(data))
+    X_test, y_test = data[n_train:, :-1], data[n_train:, -1]
+    log_dir = main.LOG_DIR / run_dir.name
+
+    with InferenceService(program_dir, run_dir, log_dir, backend=args.backend) as service:
+        if args.serve:
+            serve_clients(service)
+        else:
+            results = []
+            for window_ms in args.windows_ms:
+                service.window_s = window_ms / 1000
+                load = run_load(service, X_test, args.queries, args.clients)
+                accuracy = float(np.mean((load.pop("probabilities") > 0.5) == y_test[load.pop("rows")]))
+                results.append({"window_ms": window_ms, **load, "test_acc": accuracy})
+                print(
+                    f"[SERVICE] window {window_ms:>5.1f} ms: p50 {load['p50_ms']:.1f} ms, "
+                    f"p99 {load['p99_ms']:.1f} ms, {load['qps']:.1f} queries/s, "
+                    f"mean batch {load['mean_batch']:.1f}, test_acc {accuracy:.3f}"
+                )
+            (log_dir / "service.json").write_text(json.dumps(results, indent=2))
+            print(f"[INFO] Results written to {log_dir / 'service.json'}")
@@ -0,0 +1,143 @@
+import json
+import os
+import pty
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from log_analysis import loss_pattern, test_acc_pattern, train_acc_pattern
+
+# ======================================================
+# Live capture of party output
+# ======================================================
+#
+# Each party runs on a pseudo-terminal (like `script` did before), so its
+# output stays line-buffered. A reader thread per party copies every line
+# to the raw log file and timestamps progress lines into a shared JSONL
+# event stream:
+#   {"event": "start",     "party", "t"}
+#   {"event": "train_acc", "party", "t", "epoch", "value", "correct", "total"}
+#   {"event": "test_acc",  "party", "t", "epoch", "value", "correct", "total"}
+#   {"event": "test_loss", "party", "t", "epoch", "value"}
+#   {"event": "epoch",     "party", "t", "epoch", "duration_s", "samples_per_s"}
+#   {"event": "exit",      "party", "t", "returncode"}
+# 't' is seconds since the start of the run. An epoch ends with its
+# train_acc line; the first epoch also contains the input phase.
+
+
+class EventStream:
+    """Thread-safe JSONL writer for the events of one run."""
+
+    def __init__(self, path: Path, n_train: int = None, exp_name: str = ""):
+        self.path = Path(path)
+        self.n_train = n_train
+        self.exp_name = exp_name
+        self.t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = open(self.path, "w")
+        self._last_epoch_end = {}  # party -> t
+        self._epoch = {}  # party -> epochs finished
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.t0
+
+    def emit(self, event: str, party: int, **fields):
+        record = {"event": event, "party": party, "t": round(self.elapsed(), 6), **fields}
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+        return record
+
+    def handle_line(self, party: int, line: str):
+        """Turn one output line of 'party' into events."""
+        epoch = self._epoch.get(party, 0)
+
+        match = train_acc_pattern.search(line)
+        if match:
+            t = self.elapsed()
+            duration = t - self._last_epoch_end.get(party, 0.0)
+            self._last_epoch_end[party] = t
+            self._epoch[party] = epoch = epoch + 1
+            self.emit(
+                "train_acc", party, epoch=epoch, value=float(match.group(1)),
+                correct=int(match.group(2)), total=int(match.group(3)),
+            )
+            samples_per_s = self.n_train / duration if self.n_train and duration > 0 else None
+            self.emit(
+                "epoch", party, epoch=epoch, duration_s=round(duration, 6),
+                samples_per_s=samples_per_s,
+            )
+            if party == 0:
+                rate = f", {samples_per_s:.1f} samples/s" if samples_per_s else ""
+                print(f"[EPOCH] {self.exp_name} epoch {epoch}: {duration:.3f} s{rate}")
+            return
+
+        match = test_acc_pattern.search(line)
+        if match:
+            self.emit(
+                "test_acc", party, epoch=epoch, value=float(match.group(1)),
+                correct=int(match.group(2)), total=int(match.group(3)),
+            )
+            return
+
+        match = loss_pattern.search(line)
+        if match:
+            self.emit("test_loss", party, epoch=epoch, value=float(match.group(1)))
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _pump(master_fd: int, party: int, log_file: Path, events: EventStream):
+    """Copy the party's terminal output to log_file and the event stream."""
+    with open(master_fd, "rb", buffering=0, closefd=True) as src, open(log_file, "wb") as log:
+        pending = b""
+        while True:
+            try:
+                data = src.read(1 << 16)
+            except OSError:  # EIO once the party closed its terminal (Linux)
+                data = b""
+            if not data:
+                break
+            log.write(data)
+            log.flush()
+            pending += data
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                events.handle_line(party, line.decode(errors="replace"))
+        if pending:
+            events.handle_line(party, pending.decode(errors="replace"))
+
+
+def start_party(
+    cmd, cwd: Path, party: int, log_file: Path, events: EventStream, stdin=subprocess.DEVNULL
+):
+    """
+    Start one party with its output on a pseudo-terminal that is read live.
+    'stdin' may be subprocess.PIPE for parties reading inputs interactively (-I).
+
+    Returns:
+        (subprocess.Popen, reader thread)
+    """
+    master_fd, slave_fd = pty.openpty()
+    proc = subprocess.Popen(
+        cmd, cwd=str(cwd), stdin=stdin, stdout=slave_fd, stderr=slave_fd
+    )
+    os.close(slave_fd)
+    events.emit("start", party, pid=proc.pid)
+
+    reader = threading.Thread(
+        target=_pump, args=(master_fd, party, log_file, events), daemon=True
+    )
+    reader.start()
+    return proc, reader
+
+
+def wait_parties(parties, events: EventStream):
+    """Wait for all (proc, reader) pairs and record their exit codes."""
+    for party, (proc, reader) in enumerate(parties):
+        returncode = proc.wait()
+        reader.join()
+        events.emit("exit", party, returncode=returncode)
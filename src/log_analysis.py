@@ -0,0 +1,264 @@
+import csv
+import hashlib
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+# ======================================================
+# Configuration
+# ======================================================
+
+BASE_DIR = Path(__file__).parents[1].resolve()
+LOG_DIR = BASE_DIR / "logs"
+RESULTS_CSV = BASE_DIR / "mpc_results.csv"
+CACHE_FILE_NAME = ".parse_cache.json"
+PARSER_VERSION = 3  # bump when the record layout or patterns change
+
+# Log names written by main.run_mpc: <dataset>_B<batch>_E<epochs>[tag]_p<party>.log
+log_name_pattern = re.compile(
+    r"(?P<dataset>.+?)_B(?P<batch_size>\d+)_E(?P<epochs>\d+)(?P<tag>.*)_p(?P<party>\d+)\.log$"
+)
+
+# "X threads spent a total of A seconds ... on the online phase,
+#  B seconds ... on the preprocessing/offline phase, and C seconds idling"
+time_pattern = re.compile(
+    r"(\d+) threads spent a total of ([\-0-9\.]+) seconds .*? on the online phase, "
+    r"([\-0-9\.]+) seconds .*? on the preprocessing/offline phase, and "
+    r"([\-0-9\.]+) seconds idling"
+)
+# "Data sent = X MB in ~Y rounds", "Global data sent = Z MB"
+data_sent_pattern = re.compile(r"(?<!Global )Data sent = ([\d\.]+) MB in ~(\d+) rounds")
+global_sent_pattern = re.compile(r"Global data sent = ([\d\.]+) MB")
+# "   12345 Triples", "   ~6789 edaBits of size 40", "   1000 daBits", "   500 Input tuples"
+triples_pattern = re.compile(r"\s+(\d+)\s+Triples")
+edaBits_pattern = re.compile(r"\s+~?(\d+)\s+edaBits of size \d+")
+daBits_pattern = re.compile(r"\s+(\d+)\s+daBits")
+input_tuples_pattern = re.compile(r"\s+(\d+)\s+Input tuples")
+# "train_acc: 0.95 (95/100)", "acc: 0.90 (90/100)", "test loss: 0.1234"
+train_acc_pattern = re.compile(r"train_acc: ([\d\.]+) \((\d+)/(\d+)\)")
+test_acc_pattern = re.compile(r"(?<!train_)acc: ([\d\.]+) \((\d+)/(\d+)\)")
+loss_pattern = re.compile(r"test loss: ([\d\.\-e\+]+)")
+# "Resuming from the checkpoint of epoch 5" (thesis.mpc with resume=<e>)
+resume_pattern = re.compile(r"Resuming from the checkpoint of epoch (\d+)")
+
+
+# ======================================================
+# Records
+# ======================================================
+
+@dataclass
+class RunRecord:
+    """Everything parsed from one party log."""
+
+    log_file: str
+    dataset: Optional[str] = None
+    batch_size: Optional[int] = None
+    epochs: Optional[int] = None
+    resume_epochs: int = 0  # checkpoint a resumed run started from, it trained epochs - resume_epochs
+    tag: str = ""
+    party: Optional[int] = None
+    # timings (seconds, summed over threads)
+    threads: Optional[int] = None
+    online_time: Optional[float] = None
+    offline_time: Optional[float] = None
+    idle_time: Optional[float] = None
+    # communication
+    data_sent_mb: Optional[float] = None
+    rounds: Optional[int] = None
+    global_data_sent_mb: Optional[float] = None
+    # preprocessing consumed
+    triples: int = 0
+    edabits: int = 0
+    dabits: int = 0
+    input_tuples: int = 0
+    # per epoch
+    train_acc: List[float] = field(default_factory=list)
+    test_acc: List[float] = field(default_factory=list)
+    test_loss: List[float] = field(default_factory=list)
+
+
+def parse_log_text(log_text: str, log_file: str = "") -> RunRecord:
+    """
+    Parse the text of one party log into a RunRecord.
+    Fields that do not occur in the log stay None (or empty).
+    """
+
+    record = RunRecord(log_file=str(log_file))
+
+    name_match = log_name_pattern.search(Path(log_file).name)
+    if name_match:
+        record.dataset = name_match.group("dataset")
+        record.batch_size = int(name_match.group("batch_size"))
+        record.epochs = int(name_match.group("epochs"))
+        record.tag = name_match.group("tag")
+        record.party = int(name_match.group("party"))
+
+    match = time_pattern.search(log_text)
+    if match:
+        record.threads = int(match.group(1))
+        record.online_time = float(match.group(2))
+        record.offline_time = float(match.group(3))
+        record.idle_time = float(match.group(4))
+
+    match = data_sent_pattern.search(log_text)
+    if match:
+        record.data_sent_mb = float(match.group(1))
+        record.rounds = int(match.group(2))
+    match = global_sent_pattern.search(log_text)
+    if match:
+        record.global_data_sent_mb = float(match.group(1))
+
+    # sum over all matching lines (several protocol blocks possible)
+    record.triples = sum(int(x) for x in triples_pattern.findall(log_text))
+    record.edabits = sum(int(x) for x in edaBits_pattern.findall(log_text))
+    record.dabits = sum(int(x) for x in daBits_pattern.findall(log_text))
+    record.input_tuples = sum(int(x) for x in input_tuples_pattern.findall(log_text))
+
+    match = resume_pattern.search(log_text)
+    if match:
+        record.resume_epochs = int(match.group(1))
+
+    record.train_acc = [float(m.group(1)) for m in train_acc_pattern.finditer(log_text)]
+    record.test_acc = [float(m.group(1)) for m in test_acc_pattern.finditer(log_text)]
+    record.test_loss = [float(m.group(1)) for m in loss_pattern.finditer(log_text)]
+    return record
+
+
+def parse_log(log_file) -> RunRecord:
+    """Parse one party log file into a RunRecord."""
+    text = Path(log_file).read_text(errors="replace")
+    return parse_log_text(text, str(log_file))
+
+
+def find_logs(log_dir=LOG_DIR):
+    """All party logs below log_dir, sorted by path."""
+    return sorted(Path(log_dir).rglob("*_p[0-9]*.log"))
+
+
+# ======================================================
+# Incremental parsing with an mtime/hash-keyed cache
+# ======================================================
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _load_cache(cache_file: Path) -> dict:
+    try:
+        cache = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get("version") == PARSER_VERSION else {}
+
+
+def parse_logs(log_files=None, log_dir=LOG_DIR, max_workers: int = None):
+    """
+    Parse many party logs in parallel, reusing earlier results.
+
+    The cache (log_dir/.parse_cache.json) stores per file its mtime, size,
+    SHA-256 and record. Unchanged mtime and size is a hit without reading
+    the file; otherwise the hash decides whether the file is parsed again.
+    Entries of logs that no longer exist (deleted, rotated) are dropped
+    when the cache is written.
+
+    Returns:
+        list[RunRecord] in the order of 'log_files' (default: find_logs(log_dir))
+    """
+
+    log_dir = Path(log_dir)
+    log_files = [Path(p) for p in (log_files if log_files is not None else find_logs(log_dir))]
+    cache_file = log_dir / CACHE_FILE_NAME
+    cache = _load_cache(cache_file)
+    entries = cache.get("files", {})
+
+    records, todo = {}, []
+    for path in log_files:
+        key = str(path.resolve())
+        stat = path.stat()
+        entry = entries.get(key)
+        if entry and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+            records[key] = RunRecord(**entry["record"])
+            continue
+        digest = _file_hash(path)
+        if entry and entry["sha256"] == digest:
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            records[key] = RunRecord(**entry["record"])
+            continue
+        todo.append((key, path, stat, digest))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            parsed = pool.map(parse_log, [path for _, path, _, _ in todo])
+            for (key, _, stat, digest), record in zip(todo, parsed):
+                records[key] = record
+                entries[key] = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "sha256": digest,
+                    "record": asdict(record),
+                }
+
+    print(f"[LOGS] Parsed {len(todo)} new/changed logs, {len(log_files) - len(todo)} cached")
+    if log_dir.exists():
+        entries = {key: entry for key, entry in entries.items() if Path(key).exists()}
+        cache_file.write_text(json.dumps({"version": PARSER_VERSION, "files": entries}))
+    return [records[str(path.resolve())] for path in log_files]
+
+
+# ======================================================
+# Results table
+# ======================================================
+
+RESULT_COLUMNS = [
+    "dataset",
+    "batch_size",
+    "train_acc",
+    "test_acc",
+    "online_time",
+    "offline_time",
+    "idle_time",
+    "epochs",
+    "resume_epochs",
+    "tag",
+    "data_sent_mb",
+    "rounds",
+    "global_data_sent_mb",
+    "triples",
+    "edabits",
+    "dabits",
+    "input_tuples",
+    "log_file",
+]
+
+
+def write_results_csv(records, csv_path=RESULTS_CSV):
+    """
+    Write one row per run (party 0 log) to csv_path. Accuracies are the
+    values of the last epoch.
+    """
+
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        for record in records:
+            if record.party not in (None, 0):
+                continue
+            row = {k: v for k, v in asdict(record).items() if k in RESULT_COLUMNS}
+            row["train_acc"] = record.train_acc[-1] if record.train_acc else None
+            row["test_acc"] = record.test_acc[-1] if record.test_acc else None
+            writer.writerow(row)
+
+
+def update_results(log_dir=LOG_DIR, csv_path=RESULTS_CSV, max_workers: int = None):
+    """Parse all logs in log_dir (incrementally) and rewrite csv_path."""
+    records = parse_logs(log_dir=log_dir, max_workers=max_workers)
+    write_results_csv(records, csv_path)
+    print(f"[LOGS] Wrote {csv_path}")
+    return records
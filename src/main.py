@@ -1,8 +1,23 @@
 import sys, os
+import json
+import re
+import shutil
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from compile_cache import CompileCache, entry_program, entry_requirements, read_metadata
+import log_analysis
+from cost_model import CostModel, prediction_errors
+from live_capture import EventStream, start_party, wait_parties
+from netem_proxy import PROFILES as NETWORK_PROFILES, NetemProxy
+from backends import DEFAULT_BACKEND, get_backend, namespace_for
+import offline
+
+sys.path.append(str(Path(__file__).parent / "mpc"))
+import shareGenerator_trustedDealer as dealer
+
 # =======================================================
 # GLobal paths and configuration
 # =======================================================
@@ -14,7 +29,10 @@ DATA_DIR = BASE_DIR / "data_small"  # adjustable, whene using different datasets
 
 # File / program names
 MY_PROGRAM = "thesis"  # name of MP-SPDZ program thesis.mpc
-PREPROCESSING_SCRIPT = "offline.py"  # local preprocessing script
+PREDICT_PROGRAM = "predict"  # inference service predict.mpc (see inference_service.py)
+PREPROCESSING_SCRIPT = "offline.py"  # local preprocessing script (run in-process, see run_preprocessing)
+SIGMOID_MODULE = "model/sigmoid_approx.py"  # imported by thesis.mpc with sigmoid=<name>
+SHARE_FORMAT = "text"  # share file format written by offline.py: "text" or "binary"
 
 # MP-SPDZ paths
 MP_SPDZ_DIR = BASE_DIR / "third_party/MP-SPDZ"
@@ -24,15 +42,61 @@ MP_SPDZ_SOURCE_DIR = MP_SPDZ_DIR / "Programs" / "Source"
 LOG_DIR = BASE_DIR / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
-# --- Experiment configurations (batch_size, epochs) ---
+# Per-run working directories (linked views of MP_SPDZ_DIR)
+RUNS_DIR = BASE_DIR / "runs"
+
+# Compiled programs, keyed by source, parameters, inputs and flags
+COMPILE_CACHE_DIR = BASE_DIR / "compile_cache"
+COMPILE_FLAGS = []  # extra flags for compile.py
+
+# Trained models: persistence files and MAC keys of a training run
+MODELS_DIR = BASE_DIR / "models"
+MODEL_FILES = ["Persistence/Transactions-P*.data", "Player-Data/*/Player-MAC-Keys-*"]
+
+# Source of the preprocessing material for the online phase:
+#   "mascot": the parties run MASCOT's OT-based offline phase
+#   "dealer": a trusted dealer writes tuples to files, parties run with -F
+PREPROCESSING_MODE = "mascot"
+DEALER_PRIME = dealer.DEFAULT_PREP_PRIME  # compiled with -P in dealer mode
+
+# --- Datasets and experiment configurations (batch_size, epochs) ---
+DATASETS = ["trainingUIS", "trainingLBW", "trainingPCS"]
 EXPERIMENTS = [
     (32, 5),
     (128, 5),
     (32, 10),
 ]
 
-# Conda environment name
+# --- Parallel scheduling ---
+N_PARTIES = 2
+BASE_PORT = 17540  # first port base, run i uses BASE_PORT + i * PORTS_PER_RUN
+PORTS_PER_RUN = 10  # party j of a run listens on its port base + j
+THREADS_PER_PARTY = 1  # MP-SPDZ threads per party (threads=<n>), i.e. cores one party keeps busy
+
+# --- Fixed-point precision (sfix f, k) per dataset, chosen by model/precision_tuner.py ---
+PRECISION_FILE = BASE_DIR / "precision.json"
+DEFAULT_PRECISION = (16, 64)  # datasets the tuner has not seen
+
+# --- Sigmoid of the training (sigmoid_approx name, e.g. "minimax5"; None: ml's exact sigmoid) ---
+SIGMOID = None
+
+# --- Protocol backends (backends.BACKENDS: "mascot", "spdz2k", "semi", "semi2k",
+# "replicated-ring"); every configuration runs with each of them. Ring backends need
+# k + f <= 64 (Backend.check_precision), i.e. a tuned precision, not DEFAULT_PRECISION ---
+BACKENDS = ["mascot"]
+
+# --- Emulated networks (netem_proxy.PROFILES: "lan", "wan10", "wan50") ---
+NETWORKS = ["lan"]  # every configuration runs under each of these profiles
+
+# --- Resource profiling of the parties (profiler.py, needs psutil) ---
+PROFILE_INTERVAL_S = 0.1  # sampling interval (None: no profiling)
+
+# --- Cost model ---
+TIME_BUDGET_S = None  # skip configurations predicted to take longer (None: run all)
+
+# Conda environment name and Python version (numpy 2.3 needs Python >= 3.11)
 CONDA_ENV_NAME = "thesis"
+PYTHON_VERSION = "3.11"
 
 
 # ======================================================
@@ -46,14 +110,7 @@ def setup_conda_env():
     """
     # --- Check if environment already exists ---
     result = subprocess.run(["conda", "env", "list"], capture_output=True, text=True)
-    if CONDA_ENV_NAME not in result.stdout:
-        print(
-            f"[INFO] Creating conda environment '{CONDA_ENV_NAME}' with Python {PYTHON_VERSION}..."
-        )
-        subprocess.run(
-            ["conda", "create", "-n", CONDA_ENV_NAME, f"python={PYTHON_VERSION}", "-y"],
-            check=True,
-        )
+    if CONDA_ENV_NAME not in result.stdout.split():
         print(
             f"[INFO] Creating conda environment '{CONDA_ENV_NAME}' with Python {PYTHON_VERSION}..."
         )
@@ -64,13 +121,11 @@ def setup_conda_env():
     else:
         print(f"[INFO] Conda environment '{CONDA_ENV_NAME}' already exists.")
 
-    # --- Activate environment and install packages ---
-    print(f"[INFO] Activating conda environment '{CONDA_ENV_NAME}'...")
+    # --- Install packages into the environment ---
     conda_prefix = subprocess.run(
-        ["conda", "run", "-n", CONDA_ENV_NAME, "echo", "$CONDA_PREFIX"],
+        ["conda", "run", "-n", CONDA_ENV_NAME, "python", "-c", "import sys; print(sys.prefix)"],
         capture_output=True,
         text=True,
-        shell=True,
     ).stdout.strip()
     print(f"[INFO] Conda environment path: {conda_prefix}")
 
@@ -92,23 +147,6 @@ def setup_conda_env():
         ],
         check=True,
     )
-    subprocess.run(
-        ["conda", "run", "-n", CONDA_ENV_NAME, "pip", "install", "--upgrade", "pip"],
-        check=True,
-    )
-    subprocess.run(
-        [
-            "conda",
-            "run",
-            "-n",
-            CONDA_ENV_NAME,
-            "pip",
-            "install",
-            "-r",
-            str(BASE_DIR / "requirements.txt"),
-        ],
-        check=True,
-    )
 
 # ======================================================
 # MP-SPDZ setup and execution functions
@@ -151,16 +189,17 @@ def prepare_sources():
     """
     Prepare MP-SPDZ source directory:
     - Ensure Programs/Source exists
-    - Symlink the Python preprocessing script into MP-SPDZ
-    - Copy the MPC program into MP-SPDZ
+    - Symlink the Python preprocessing script and the sigmoid approximations into MP-SPDZ
+    - Copy the MPC programs into MP-SPDZ
     """
 
     print("[INFO] Preparing sources...")
     MP_SPDZ_SOURCE_DIR.mkdir(parents=True, exist_ok=True)
 
-    for name in [PREPROCESSING_SCRIPT, f"{MY_PROGRAM}.mpc"]:
+    sources = [PREPROCESSING_SCRIPT, SIGMOID_MODULE, f"{MY_PROGRAM}.mpc", f"{PREDICT_PROGRAM}.mpc"]
+    for name in sources:
         src_file = SRC_DIR / name
-        dst_file = MP_SPDZ_SOURCE_DIR / name
+        dst_file = MP_SPDZ_SOURCE_DIR / Path(name).name
 
         # Remove old version if present
         if dst_file.exists():
@@ -176,43 +215,103 @@ def prepare_sources():
         print(f" -> {name} linked/copied")
 
 
-def run_preprocessing(dataset):
+def player_data_dir(namespace: str = None) -> Path:
+    """Player-Data directory of 'namespace' (None: the shared Player-Data)."""
+    base = MP_SPDZ_DIR / "Player-Data"
+    return base / namespace if namespace else base
+
+
+def dataset_precision(dataset) -> tuple:
+    """(f, k) of 'dataset' (name or path) from PRECISION_FILE, else DEFAULT_PRECISION."""
+    precision = json.loads(PRECISION_FILE.read_text()) if PRECISION_FILE.exists() else {}
+    choice = precision.get(Path(dataset).stem)
+    return (choice["f"], choice["k"]) if choice else DEFAULT_PRECISION
+
+
+def run_preprocessing(dataset, namespace: str = None, backend: str = DEFAULT_BACKEND):
     """
-    Execute offline preprocessing inside MP-SPDZ.
-    Generates secret shares + metadata.
+    Execute offline preprocessing (offline.preprocess) in this process.
+    Generates secret shares + metadata in MP-SPDZ's Player-Data/<namespace>/
+    (default: backends.namespace_for the dataset name), so several datasets
+    can be prepared while others are compiled or run. The shares are
+    encoded for 'backend' (domain and number of parties, see backends.py)
+    with the scale 2^f of the dataset's precision (dataset_precision); f
+    and k are recorded in metadata.txt for thesis.mpc.
 
     Returns:
         float: execution time in seconds
     """
 
-    print(f"[INFO] Preprocessing dataset {dataset}...")
+    backend = get_backend(backend)
+    namespace = namespace or namespace_for(Path(dataset).stem, backend)
+    f, k = dataset_precision(dataset)
+    backend.check_precision(f, k)
+    print(f"[INFO] Preprocessing dataset {dataset} into namespace {namespace} (f={f}, k={k})...")
     t0 = time.perf_counter()
 
-    subprocess.run(
-        [
-            "conda",
-            "run",
-            "-n",
-            CONDA_ENV_NAME,
-            "python",
-            str(MP_SPDZ_SOURCE_DIR / PREPROCESSING_SCRIPT),
-            dataset,
-        ],
-        cwd=str(MP_SPDZ_DIR),
-        check=True,
+    offline.preprocess(
+        dataset, 2**f, share_format=SHARE_FORMAT, namespace=namespace,
+        n_parties=backend.n_parties, domain=backend.domain, k=k, player_data=player_data_dir(),
     )
 
     t1 = time.perf_counter()
-    print(f"[TIMING] Preprocessing (offline shares) took {t1 - t0:.3f} s")
+    print(f"[TIMING] Preprocessing (offline shares) of {namespace} took {t1 - t0:.3f} s")
     return t1 - t0  # offline time
 
 
-def compile_mpc():
+def compile_mpc(
+    cache: CompileCache,
+    batch_size: int,
+    epochs: int,
+    program_args=(),
+    namespace: str = None,
+    resume_epochs: int = 0,
+    threads: int = None,
+    backend: str = DEFAULT_BACKEND,
+    sigmoid: str = None,
+) -> Path:
     """
-    Compile the MPC program using MP-SPDZ's compile.py.
+    Compile the MPC program for one (batch_size, epochs) configuration
+    using MP-SPDZ's compile.py, or reuse an earlier compilation from 'cache'.
+    'program_args' are passed to the program (e.g. "legacy_ingest").
+    The program reads metadata and shares of 'namespace' (ns=<namespace>).
+    With 'resume_epochs' it continues from the checkpoint of that epoch
+    (resume=<epochs>, see chain_experiments) instead of training from scratch.
+    'threads' (default THREADS_PER_PARTY) sets the program's thread count
+    (threads=<n>); MP-SPDZ fixes it in the bytecode, the parties take no
+    thread option at run time.
+    'backend' adds the compile flags of its domain (e.g. -R 64 for rings);
+    a precision of the shared data that does not fit it raises ValueError.
+    'sigmoid' (default SIGMOID) selects a sigmoid approximation (sigmoid=<name>).
+
+    Returns:
+        Path: cache entry holding the compiled schedule and bytecode
     """
-    print("[INFO] Compiling MPC program...")
-    subprocess.run(["./compile.py", MY_PROGRAM], cwd=str(MP_SPDZ_DIR), check=True)
+    print(f"[INFO] Compiling MPC program for B={batch_size}, E={epochs}...")
+    metadata_file = player_data_dir(namespace) / "metadata.txt"
+    params = read_metadata(metadata_file)
+    backend = get_backend(backend)
+    f = int(params.get("scale", 2**16)).bit_length() - 1
+    backend.check_precision(f, int(params.get("k", 64)))
+    write_params_to_metadata(metadata_file, batch_size, epochs)
+
+    flags = list(COMPILE_FLAGS) + backend.compile_flags
+    program_args = tuple(program_args)
+    if namespace:
+        program_args += (f"ns={namespace}",)
+    if resume_epochs:
+        program_args += (f"resume={resume_epochs}",)
+    threads = threads or THREADS_PER_PARTY
+    if threads > 1:
+        program_args += (f"threads={threads}",)
+    sigmoid = sigmoid or SIGMOID
+    if sigmoid:
+        program_args += (f"sigmoid={sigmoid}",)
+    if PREPROCESSING_MODE == "dealer":
+        # dealt tuples live in GF(DEALER_PRIME); edaBits cannot be dealt
+        flags += ["-P", str(DEALER_PRIME)]
+        program_args += ("no_edabit",)
+    return cache.get(flags, program_args, namespace)
 
 
 def write_params_to_metadata(metadata_file: Path, batch_size: int, n_epochs: int):
@@ -227,126 +326,629 @@ def write_params_to_metadata(metadata_file: Path, batch_size: int, n_epochs: int
     metadata_file.write_text("\n".join(lines))
 
 
-def run_mpc(batch_size: int, epochs: int, dataset: str):
+def max_parallel_runs(n_parties: int = N_PARTIES):
+    """
+    Number of MPC runs that fit on this machine at once:
+    available cores / (parties per run * threads per party), at least 1.
+    """
+    cores = os.cpu_count() or 1
+    return max(1, cores // (n_parties * THREADS_PER_PARTY))
+
+
+def _link_entries(src_dir: Path, dst_dir: Path, skip=(), files_only=False):
+    """Symlink the entries of src_dir into dst_dir, replacing old links."""
+    for entry in src_dir.iterdir():
+        if entry.name in skip or (files_only and not entry.is_file()):
+            continue
+        link = dst_dir / entry.name
+        if link.is_symlink() or link.is_file():
+            link.unlink()
+        link.symlink_to(entry)
+
+
+def prepare_run_dir(
+    exp_name: str, program_dir: Path = None, namespace: str = None, model_dir: Path = None
+) -> Path:
     """
-    Run mascot-party.x for both parties and log outputs.
+    Create an isolated working directory for one run.
+
+    All top-level entries of MP_SPDZ_DIR (binaries, ...) are symlinked,
+    except Player-Data and Persistence which are fresh directories, the
+    former holding links to the shared input files only. Files written by
+    the parties during the run (MAC keys, persistence, ...) thus stay per
+    run. The files of 'namespace' (shares, metadata) are linked under
+    their usual names.
+
+    If 'program_dir' (a compile cache entry) is given, Programs/Schedules,
+    Programs/Bytecode and the compile-time input files come from there.
+    metadata.txt is then a copy holding the entry's batch size and epochs.
+    If 'model_dir' (see save_model) is given, its persistence files and
+    MAC keys are copied in, so the run can read the stored model.
+    """
+    run_dir = RUNS_DIR / exp_name
+    player_data = run_dir / "Player-Data"
+    player_data.mkdir(parents=True, exist_ok=True)
+    persistence = run_dir / "Persistence"
+    if persistence.is_symlink():
+        persistence.unlink()
+    persistence.mkdir(exist_ok=True)
+
+    skip = ["Player-Data", "Persistence"] + (["Programs"] if program_dir else [])
+    _link_entries(MP_SPDZ_DIR, run_dir, skip=skip)
+
+    shared_data = MP_SPDZ_DIR / "Player-Data"
+    if shared_data.exists():
+        _link_entries(shared_data, player_data, files_only=True)
+    if namespace:
+        _link_entries(player_data_dir(namespace), player_data, files_only=True)
+
+    if program_dir:
+        programs = run_dir / "Programs"
+        if programs.is_symlink():
+            programs.unlink()
+        programs.mkdir(exist_ok=True)
+        _link_entries(MP_SPDZ_DIR / "Programs", programs, skip=["Schedules", "Bytecode"])
+        _link_entries(program_dir / "Programs", programs)
+        _link_entries(program_dir / "Player-Data", player_data)
+
+        # compile_mpc rewrites batch size and epochs of the shared metadata.txt
+        # for every configuration, so the run keeps its own copy with the
+        # values its program was compiled with (from the entry's manifest)
+        metadata = player_data / "metadata.txt"
+        if metadata.exists():
+            params = json.loads((program_dir / "manifest.json").read_text())["params"]
+            text = metadata.read_text()
+            metadata.unlink()
+            metadata.write_text(text)
+            write_params_to_metadata(metadata, params["batch_size"], params["n_epochs"])
+
+    if model_dir:
+        _copy_model_files(Path(model_dir), run_dir)
+
+    return run_dir
+
+
+def _copy_model_files(src_dir: Path, dst_dir: Path):
+    """Copy the MODEL_FILES of src_dir to the same relative paths in dst_dir."""
+    copied = []
+    for pattern in MODEL_FILES:
+        for path in src_dir.glob(pattern):
+            target = dst_dir / path.relative_to(src_dir)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if target.is_symlink():
+                target.unlink()
+            shutil.copy2(path, target)
+            copied.append(target)
+    return copied
+
+
+def save_model(run_dir: Path, model_dir: Path, info: dict = None):
+    """
+    Keep the model a training run persisted (thesis.mpc writes W and b and
+    the per-epoch checkpoints to Persistence/) together with the run's MAC
+    keys, which MASCOT needs to check the persisted shares in a later run
+    (see prepare_run_dir). 'info' is stored as model.json.
 
     Returns:
-        (runtime, log_p0_path, log_p1_path)
-    """
-
-    exp_name = f"{dataset}_B{batch_size}_E{epochs}"
-    log0 = LOG_DIR / f"{exp_name}_p0.log"
-    log1 = LOG_DIR / f"{exp_name}_p1.log"
-
-    print(f"[INFO] Running MPC for {exp_name}")
-
-    # Party 0 command
-    cmd0 = [
-        "script",
-        str(log0),
-        "./mascot-party.x",
-        "0",
-        MY_PROGRAM,
-        "-N",
-        "2",
-        "-pn",
-        "17540",
-        "-h",
-        "localhost",
-        "-v",
-        "2",
-    ]
-    # Party 1 command
-    cmd1 = [
-        "script",
-        str(log1),
-        "./mascot-party.x",
-        "1",
-        MY_PROGRAM,
-        "-N",
-        "2",
-        "-pn",
-        "17540",
-        "-h",
-        "localhost",
-        "-v",
-        "2",
+        Path of the model directory, or None if the run persisted nothing
+    """
+    if not list(Path(run_dir).glob(MODEL_FILES[0])):
+        return None
+    shutil.rmtree(model_dir, ignore_errors=True)
+    model_dir.mkdir(parents=True)
+    _copy_model_files(Path(run_dir), model_dir)
+    (model_dir / "model.json").write_text(json.dumps(info or {}, indent=2))
+    return model_dir
+
+
+def data_fingerprint(namespace: str = None) -> dict:
+    """
+    Sizes and precision of the shared data of 'namespace' and the SHA-256
+    of the CSV it was shared from (offline.py's share cache state), to tell
+    whether a stored model was trained on the same data.
+    """
+    params = read_metadata(player_data_dir(namespace) / "metadata.txt")
+    state_file = player_data_dir(namespace) / "share_cache.json"
+    state = json.loads(state_file.read_text()) if state_file.exists() else {}
+    return {
+        "n_train": params["n_train"],
+        "d": params["d"],
+        "n_test": params["n_test"],
+        "scale": params.get("scale"),
+        "k": params.get("k"),
+        "sha256": state.get("sha256"),
+    }
+
+
+def run_mpc(
+    batch_size: int,
+    epochs: int,
+    dataset: str,
+    port: int = BASE_PORT,
+    program_dir: Path = None,
+    tag: str = "",
+    network: str = "lan",
+    namespace: str = None,
+    resume_from: Path = None,
+    backend: str = DEFAULT_BACKEND,
+):
+    """
+    Run the party binary of 'backend' (see backends.py, default
+    mascot-party.x) for all its parties and log outputs.
+
+    Each run gets its own working directory (see prepare_run_dir), its own
+    log directory LOG_DIR/<exp_name> and the port base 'port', so several
+    runs can execute at the same time. 'program_dir' selects the compiled
+    program (compile cache entry) to run, 'tag' is appended to the
+    experiment name to tell variants of the same configuration apart.
+    'namespace' selects the shares and metadata (see run_preprocessing).
+    'resume_from' is the stored model (see save_model) holding the
+    checkpoint a program compiled with resume_epochs continues from.
+    The trained model is stored in MODELS_DIR/<exp_name>. Backends other
+    than the default one are appended to the experiment name.
+
+    'network' names a profile of netem_proxy.PROFILES. Except for "lan",
+    the parties talk through a relay adding its latency and bandwidth cap
+    (party j listens on port + j, its relay on port + n_parties + j) and
+    get per-party hosts files (-ip) instead of -h localhost; the profile
+    name is appended to the experiment name.
+
+    Party output is read live (see live_capture): raw logs go to the usual
+    log files and timestamped per-epoch events to LOG_DIR/<exp_name>/events.jsonl.
+    While the parties run, their memory, per-thread CPU and I/O are sampled
+    to profile.jsonl (see profiler), summarized per epoch in profile_summary.json.
+
+    In PREPROCESSING_MODE "dealer" the tuples required by the compiled
+    program are dealt into the run's Player-Data and the parties only run
+    the online phase (-F); this needs the default backend (MASCOT).
+
+    Returns:
+        (runtime, log_p0_path, log_p1_path); further parties log next to them
+    """
+
+    profile = NETWORK_PROFILES[network]
+    backend = get_backend(backend)
+    n_parties = backend.n_parties
+    if PREPROCESSING_MODE == "dealer" and backend.name != DEFAULT_BACKEND:
+        raise ValueError(f"Dealer preprocessing is only supported for {DEFAULT_BACKEND}")
+    if backend.name != DEFAULT_BACKEND:
+        tag += f"_{backend.name}"
+    if not profile.direct:
+        tag += f"_{network}"
+    exp_name = f"{dataset}_B{batch_size}_E{epochs}{tag}"
+    run_dir = prepare_run_dir(exp_name, program_dir, namespace, resume_from)
+    program = entry_program(program_dir) if program_dir else MY_PROGRAM
+    log_dir = LOG_DIR / exp_name
+    log_dir.mkdir(parents=True, exist_ok=True)
+    logs = [log_dir / f"{exp_name}_p{j}.log" for j in range(n_parties)]
+    log0, log1 = logs[:2]
+
+    print(f"[INFO] Running MPC for {exp_name} (port {port})")
+
+    party_args = []
+    if PREPROCESSING_MODE == "dealer":
+        counts = dealer.tuple_counts(entry_requirements(program_dir), n_parties)
+        dealer.generate_preprocessing(run_dir / "Player-Data", counts, n_parties, DEALER_PRIME)
+        party_args.append("-F")
+
+    proxy = None
+    if profile.direct:
+        network_args = [["-pn", str(port), "-h", "localhost"]] * n_parties
+    else:
+        proxy = NetemProxy(
+            profile,
+            [port + j for j in range(n_parties)],
+            [port + n_parties + j for j in range(n_parties)],
+        )
+        hosts = proxy.hosts_files(run_dir / "Player-Data")
+        network_args = [["-ip", str(h.relative_to(run_dir))] for h in hosts]
+
+    commands = [
+        backend.command(j, program, network_args[j], ["-v", "2", *party_args])
+        for j in range(n_parties)
     ]
 
-    # --- Run both parties ---
-    t0 = time.perf_counter()
-    p0 = subprocess.Popen(cmd0, cwd=str(MP_SPDZ_DIR))
-    p1 = subprocess.Popen(cmd1, cwd=str(MP_SPDZ_DIR))
+    n_train = read_metadata(run_dir / "Player-Data" / "metadata.txt")["n_train"]
+    events = EventStream(log_dir / "events.jsonl", n_train, exp_name)
 
-    p0.wait()
-    p1.wait()
+    # --- Run all parties, reading their output while they run ---
+    if proxy:
+        proxy.start()
+    t0 = time.perf_counter()
+    parties = [
+        start_party(cmd, run_dir, j, log, events)
+        for j, (cmd, log) in enumerate(zip(commands, logs))
+    ]
+    profiler = None
+    if PROFILE_INTERVAL_S:
+        # psutil is only needed when profiling
+        from profiler import PartyProfiler, summarize_profile
+
+        profiler = PartyProfiler(
+            {party: proc.pid for party, (proc, _) in enumerate(parties)},
+            log_dir / "profile.jsonl",
+            PROFILE_INTERVAL_S,
+            clock=events.elapsed,
+        )
+        profiler.start()
+    wait_parties(parties, events)
     t1 = time.perf_counter()
+    events.close()
+    if proxy:
+        proxy.stop()
+
+    peak_rss_mb = None
+    if profiler:
+        profiler.stop()
+        peak_rss_mb = max(profiler.peak_rss_mb.values(), default=None)
+        profile_summary = summarize_profile(profiler.path, events.path)
+        (log_dir / "profile_summary.json").write_text(json.dumps(profile_summary, indent=2))
 
     total = t1 - t0
     print(f"[TIMING] MPC run {exp_name} took {total:.3f} s")
-    print(f"[INFO] Logs written to {log0} and {log1}")
+    print(f"[INFO] Logs written to {log_dir}, events to {events.path}")
+    # the sigmoid the model was trained with, predict.mpc serves with the same
+    program_args = []
+    if program_dir:
+        program_args = json.loads((program_dir / "manifest.json").read_text())["args"]
+    resume_epochs = next(
+        (int(arg.split("=", 1)[1]) for arg in program_args if arg.startswith("resume=")), 0
+    )
+    sigmoid_args = [arg for arg in program_args if arg.startswith(("sigmoid=", "sigmoid_bound="))]
+    model_dir = save_model(
+        run_dir, MODELS_DIR / exp_name,
+        {"batch_size": batch_size, "epochs": epochs, "sigmoid_args": sigmoid_args,
+         **data_fingerprint(namespace)},
+    )
+
+    # run description, joins the logs with the compiled program (cost model)
+    run_info = {
+        "dataset": dataset,
+        "batch_size": batch_size,
+        "epochs": epochs,
+        "tag": tag,
+        "network": network,
+        "backend": backend.name,
+        "preprocessing": PREPROCESSING_MODE,
+        "namespace": namespace,
+        "params": read_metadata(run_dir / "Player-Data" / "metadata.txt"),
+        "program_key": program_dir.name if program_dir else None,
+        "wall_time_s": total,
+        "peak_rss_mb": peak_rss_mb,
+        "model_dir": str(model_dir) if model_dir else None,
+        "resumed_from": str(resume_from) if resume_from else None,
+        "resume_epochs": resume_epochs,
+        "trained_epochs": epochs - resume_epochs,
+        "log_p0": str(log0),
+        "log_p1": str(log1),
+    }
+    (log_dir / "run.json").write_text(json.dumps(run_info, indent=2))
     return total, log0, log1
 
+
+def run_sweep(
+    jobs, program_dirs=None, max_workers: int = None, network: str = "lan", resume_dirs=None,
+    backend: str = DEFAULT_BACKEND,
+):
+    """
+    Run several (dataset, batch_size, epochs) jobs concurrently with the
+    protocol 'backend' under the network profile 'network'.
+
+    Job i gets the port base BASE_PORT + i * PORTS_PER_RUN and runs the
+    compiled program program_dirs[i] (if given) on the namespace of its
+    dataset for the backend, continuing from the stored model resume_dirs[i]
+    (if given). Concurrency is capped by max_parallel_runs() unless
+    'max_workers' is given.
+
+    Returns:
+        (list of (job, runtime, log0, log1) in job order, sweep wall time)
+    """
+
+    max_workers = max_workers or max_parallel_runs(get_backend(backend).n_parties)
+    program_dirs = program_dirs or [None] * len(jobs)
+    resume_dirs = resume_dirs or [None] * len(jobs)
+    print(
+        f"[INFO] Running {len(jobs)} MPC jobs ({backend}, {network}) with up to "
+        f"{max_workers} in parallel"
+    )
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(
+                run_mpc,
+                batch_size,
+                epochs,
+                dataset,
+                BASE_PORT + i * PORTS_PER_RUN,
+                program_dir,
+                "",
+                network,
+                namespace_for(dataset, get_backend(backend)),
+                resume_dir,
+                backend,
+            )
+            for i, ((dataset, batch_size, epochs), program_dir, resume_dir) in enumerate(
+                zip(jobs, program_dirs, resume_dirs)
+            )
+        ]
+        results = [(job, *f.result()) for job, f in zip(jobs, futures)]
+    sweep_time = time.perf_counter() - t0
+
+    print(
+        f"[TIMING] Sweep of {len(jobs)} runs took {sweep_time:.3f} s "
+        f"({len(jobs) / sweep_time * 3600:.1f} runs/hour)"
+    )
+    return results, sweep_time
+
 # ======================================================
 # Main execution
 # ======================================================
 
-def main():
-     """
-    Full execution pipeline:
-    1) Prepare sources
-    2) Preprocess dataset once
-    3) Compile program once
-    4) Run all MPC experiments with varied parameters
-    5) Print summary
+def plan_experiments(model: CostModel, params: dict, experiments):
     """
-    # --- Step 1: Prepare MP-SPDZ sources (thesis.mpc, offline.py) ---
-    prepare_sources()
+    Predict the cost of each (batch_size, epochs) configuration before
+    compiling, drop those over TIME_BUDGET_S and order the rest longest
+    first, so that parallel runs pack well.
 
-    # --- Step 2: Choose dataset (e.g., “trainingPCS” or whatever your 500-row file is) ---
-    dataset = "trainingUIS"  # adjust name to your CSV stem
+    Returns:
+        list of (batch_size, epochs, prediction or None)
+    """
+    planned = []
+    for batch_size, epochs in experiments:
+        prediction = model.predict(
+            params["n_train"], params["d"], params["n_test"], batch_size, epochs
+        )
+        if prediction and TIME_BUDGET_S and prediction["total_time"] > TIME_BUDGET_S:
+            print(
+                f"[SKIP] B={batch_size}, E={epochs}: predicted "
+                f"{prediction['total_time']:.1f}s > budget {TIME_BUDGET_S}s"
+            )
+            continue
+        planned.append((batch_size, epochs, prediction))
 
-    # --- Step 3: Preprocessing once to generate shares & initial metadata ---
-    offline_time = run_preprocessing(dataset)
+    planned.sort(key=lambda p: p[2]["total_time"] if p[2] else 0.0, reverse=True)
+    return planned
 
-    # --- Step 4: Compile MPC once ---
-    compile_mpc()
 
-    metadata_file = MP_SPDZ_DIR / "Player-Data" / "metadata.txt"
+def stored_checkpoints(dataset: str, batch_size: int, tag: str = "", namespace: str = None) -> dict:
+    """
+    Stored models (MODELS_DIR) of 'dataset' with 'batch_size' trained on
+    the current shares of the dataset (in 'namespace', default: the dataset
+    name), as {epochs: model_dir}. A model of E epochs holds the
+    checkpoints of epochs 1..E.
+    """
+    pattern = re.compile(rf"{re.escape(dataset)}_B{batch_size}_E(\d+){re.escape(tag)}$")
+    fingerprint = data_fingerprint(namespace or dataset)
+    found = {}
+    for model_dir in MODELS_DIR.glob(f"{dataset}_B{batch_size}_E*"):
+        match = pattern.match(model_dir.name)
+        info_file = model_dir / "model.json"
+        if not match or not info_file.exists():
+            continue
+        info = json.loads(info_file.read_text())
+        if all(info.get(k) == v for k, v in fingerprint.items()):
+            found[int(match.group(1))] = model_dir
+    return found
+
+
+def chain_experiments(
+    planned, dataset: str, network: str = "lan", backend: str = DEFAULT_BACKEND
+):
+    """
+    Let every configuration continue from the checkpoint of the largest
+    smaller epoch count with the same batch size, so that a sweep over
+    epochs trains max(epochs) epochs per batch size instead of their sum.
+    The checkpoint is the last one of a stored model of an earlier run
+    (the one with the most epochs below the configuration's) or of a
+    configuration of this sweep, which then has to finish first:
+    configurations are grouped into waves that run one after the other. Only runs that a configuration extends
+    (fewer epochs) are continued; equal configurations train from scratch.
+    Checkpoints are only taken from runs of the same backend and network.
+
+    In PREPROCESSING_MODE "dealer" every run gets fresh MAC keys, which
+    cannot check persisted shares, so nothing is chained.
+
+    Returns:
+        list of waves, each a list of (batch_size, epochs, prediction,
+        resume_epochs, resume_dir)
+    """
+    if PREPROCESSING_MODE == "dealer":
+        return [[(b, e, p, 0, None) for b, e, p in planned]] if planned else []
+
+    tag = "" if backend == DEFAULT_BACKEND else f"_{backend}"
+    tag += "" if NETWORK_PROFILES[network].direct else f"_{network}"
+    namespace = namespace_for(dataset, get_backend(backend))
+    waves = {}
+    for batch_size in dict.fromkeys(b for b, _, _ in planned):
+        stored = stored_checkpoints(dataset, batch_size, tag, namespace)
+        previous, previous_wave = 0, -1
+        configs = sorted(((e, p) for b, e, p in planned if b == batch_size), key=lambda c: c[0])
+        for epochs, prediction in configs:
+            resume = max((e for e in stored if e < epochs), default=0)
+            resume_dir, wave = stored.get(resume), 0
+            if previous > resume:
+                resume, wave = previous, previous_wave + 1
+                resume_dir = MODELS_DIR / f"{dataset}_B{batch_size}_E{previous}{tag}"
+            waves.setdefault(wave, []).append((batch_size, epochs, prediction, resume, resume_dir))
+            previous, previous_wave = epochs, wave
+    return [waves[k] for k in sorted(waves)]
+
+
+def share_dataset(dataset: str) -> float:
+    """
+    Preprocess 'dataset' once for every share encoding (domain, number of
+    parties) the BACKENDS need, see backends.namespace_for.
+
+    Returns:
+        float: total execution time in seconds
+    """
+    namespaces = {namespace_for(dataset, get_backend(b)): b for b in BACKENDS}
+    return sum(run_preprocessing(dataset, ns, b) for ns, b in namespaces.items())
+
+
+def print_network_tradeoff(results):
+    """
+    Rounds against data volume per batch size, for each backend and network
+    profile. 'from' is the checkpoint epoch a resumed run continued from,
+    its costs cover only the epochs after it.
+    """
+    print("\n=== Batch size vs. network ===")
+    print(
+        f"{'dataset':<14}{'backend':<17}{'network':<8}{'B':>6}{'E':>4}{'from':>5}{'rounds':>9}"
+        f"{'data MB':>10}{'online s':>10}{'total s':>10}"
+    )
+    for r in sorted(
+        results, key=lambda r: (r["dataset"], r["backend"], r["network"], r["E"], r["B"])
+    ):
+        print(
+            f"{r['dataset']:<14}{r['backend']:<17}{r['network']:<8}{r['B']:>6}{r['E']:>4}"
+            f"{r['resume_E']:>5}"
+            f"{r['rounds'] or 0:>9}{r['data_sent_mb'] or float('nan'):>10.1f}"
+            f"{r['online_time'] or float('nan'):>10.3f}{r['mpc_total_time_s']:>10.3f}"
+        )
 
-    # --- Step 5: Run our three MPC configurations ---
-    results = []  # collect for later printing
 
-    for batch_size, epochs in EXPERIMENTS:
-        print(f"\n=== Experiment B={batch_size}, E={epochs} ===")
-
-        # Update metadata with current batch size & epochs
-        write_params_to_metadata(metadata_file, batch_size, epochs)
-
-        # Run MPC
-        total_time, log0, log1 = run_mpc(batch_size, epochs, dataset)
-
-        # Store results
-        results.append(
-            {
-                "dataset": dataset,
-                "B": batch_size,
-                "E": epochs,
-                "offline_time_s": offline_time,
-                "mpc_total_time_s": total_time,
-                "log_p0": str(log0),
-                "log_p1": str(log1),
-            }
+def main():
+    """
+    Full execution pipeline:
+    1) Prepare sources, fit one cost model per backend and network profile
+       on earlier compilations and runs
+    2) Preprocess each dataset once per share encoding into its own
+       namespace, overlapping with the compilation and runs of the
+       previous dataset
+    3) Plan (predict, skip over budget, order), chain configurations that
+       extend others onto their checkpoints and compile each distinct
+       configuration once (compile cache)
+    4) Run the MPC experiments of a dataset in parallel (wave by wave),
+       once per protocol backend in BACKENDS and network profile in NETWORKS
+    5) Print summary with aggregate sweep throughput, prediction error and
+       the rounds/data trade-off of the batch size per network
+    6) Parse new logs and update mpc_results.csv
+    """
+    # --- Step 1: Prepare MP-SPDZ sources (thesis.mpc, offline.py) ---
+    prepare_sources()
+    cache = CompileCache(COMPILE_CACHE_DIR, MP_SPDZ_DIR, MY_PROGRAM)
+    models = {
+        (backend, network): CostModel.fit(
+            COMPILE_CACHE_DIR, LOG_DIR, network, backend=backend, preprocessing=PREPROCESSING_MODE
         )
+        for backend in BACKENDS
+        for network in NETWORKS
+    }
 
-    # --- Step 6: Print summary of all experiments ---
+    results = []  # collect for later printing
+    sweep_time = 0.0
+
+    # Shares go to per-dataset namespaces, so dataset k+1 is shared while
+    # dataset k is compiled and run
+    t_pipeline = time.perf_counter()
+    offline_total = 0.0
+    with ThreadPoolExecutor(max_workers=1) as offline_pool:
+        pending = offline_pool.submit(share_dataset, DATASETS[0]) if DATASETS else None
+        for k, dataset in enumerate(DATASETS):
+            # --- Step 2: Shares of this dataset; start sharing the next one ---
+            offline_time = pending.result()
+            offline_total += offline_time
+            if k + 1 < len(DATASETS):
+                pending = offline_pool.submit(share_dataset, DATASETS[k + 1])
+
+            for backend in BACKENDS:
+                namespace = namespace_for(dataset, get_backend(backend))
+                params = read_metadata(player_data_dir(namespace) / "metadata.txt")
+                for network in NETWORKS:
+                    model = models[(backend, network)]
+
+                    # --- Step 3: Plan, chain and compile every configuration (cached) ---
+                    planned = plan_experiments(model, params, EXPERIMENTS)
+                    for wave in chain_experiments(planned, dataset, network, backend):
+                        jobs, program_dirs, predictions, resume_dirs, resumes = [], [], [], [], []
+                        for batch_size, epochs, _, resume_epochs, resume_dir in wave:
+                            if resume_dir and not resume_dir.exists():  # earlier wave failed
+                                resume_epochs, resume_dir = 0, None
+                            if resume_epochs:
+                                print(f"[INFO] B={batch_size}, E={epochs} continues from epoch "
+                                      f"{resume_epochs} ({resume_dir.name})")
+                            program_dir = compile_mpc(
+                                cache, batch_size, epochs, namespace=namespace,
+                                resume_epochs=resume_epochs, backend=backend,
+                            )
+                            jobs.append((dataset, batch_size, epochs))
+                            program_dirs.append(program_dir)
+                            resume_dirs.append(resume_dir)
+                            resumes.append(resume_epochs)
+                            # exact requirements are known now
+                            predictions.append(
+                                model.predict(
+                                    params["n_train"], params["d"], params["n_test"],
+                                    batch_size, epochs,
+                                    requirements=entry_requirements(program_dir),
+                                )
+                            )
+
+                        # --- Step 4: Run the configurations of a wave concurrently ---
+                        runs, wave_sweep_time = run_sweep(
+                            jobs, program_dirs, network=network, resume_dirs=resume_dirs,
+                            backend=backend,
+                        )
+                        sweep_time += wave_sweep_time
+
+                        # Store results
+                        for (
+                            ((_, batch_size, epochs), total_time, log0, log1), prediction, resume_epochs
+                        ) in zip(runs, predictions, resumes):
+                            record = log_analysis.parse_log(log0)
+                            results.append(
+                                {
+                                    "dataset": dataset,
+                                    "network": network,
+                                    "backend": backend,
+                                    "B": batch_size,
+                                    "E": epochs,
+                                    "resume_E": resume_epochs,
+                                    "offline_time_s": offline_time,
+                                    "mpc_total_time_s": total_time,
+                                    "online_time": record.online_time,
+                                    "rounds": record.rounds,
+                                    "data_sent_mb": record.data_sent_mb,
+                                    "log_p0": str(log0),
+                                    "log_p1": str(log1),
+                                    "prediction": prediction,
+                                    "errors": prediction_errors(prediction, record),
+                                }
+                            )
+
+    pipeline_time = time.perf_counter() - t_pipeline
+
+    # --- Step 5: Print summary of all experiments ---
     print("\n=== Summary of MPC experiments ===")
     for r in results:
+        predicted = ""
+        if r["prediction"]:
+            errors = ", ".join(f"{k} {v:+.0%}" for k, v in r["errors"].items())
+            predicted = f" | predicted total={r['prediction']['total_time']:.3f}s ({errors})"
+        resumed = ""
+        if r["resume_E"]:
+            resumed = f" (from E={r['resume_E']}, {r['E'] - r['resume_E']} trained)"
         print(
-            f"{r['dataset']} | B={r['B']}, E={r['E']} | "
+            f"{r['dataset']} | {r['backend']} | {r['network']} | B={r['B']}, E={r['E']}{resumed} | "
             f"offline={r['offline_time_s']:.3f}s, total={r['mpc_total_time_s']:.3f}s"
+            f"{predicted}"
+        )
+    if results:
+        print(
+            f"Sweep: {len(results)} runs in {sweep_time:.3f}s of MPC wall time "
+            f"-> {len(results) / sweep_time * 3600:.1f} runs/hour"
+        )
+        print(
+            f"Pipeline: {pipeline_time:.3f}s wall for {offline_total:.3f}s offline sharing "
+            f"and {sweep_time:.3f}s of MPC runs (sequential: {offline_total + sweep_time:.3f}s)"
         )
+        print_network_tradeoff(results)
+    cache.report()
+
+    # --- Step 6: Parse logs (only new/changed ones) and fill mpc_results.csv ---
+    log_analysis.update_results(LOG_DIR)
 
 
 if __name__ == "__main__":
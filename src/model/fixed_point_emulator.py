@@ -0,0 +1,285 @@
+# Plaintext emulator of MP-SPDZ ml.SGDLogistic training under sfix arithmetic
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MODEL_DIR = Path(__file__).resolve().parent
+sys.path.append(str(MODEL_DIR))  # sigmoid_approx, also when imported as model.fixed_point_emulator
+sys.path.append(str(MODEL_DIR.parent))
+from sigmoid_approx import NAMES as APPROXIMATIONS, ArithOps, get_approximation
+from preprocessing.datasetLoader import load_array
+
+# ======================================================
+# Configuration
+# ======================================================
+
+BASE_DIR = Path(__file__).parents[2].resolve()
+DATA_DIR = BASE_DIR / "data"
+
+DEFAULT_F = 16  # default sfix precision of thesis.mpc (per dataset: precision_tuner.py)
+DEFAULT_K = 64
+DEFAULT_TEST_SIZE = 0.2  # same unshuffled split as offline.py
+DEFAULT_LEARNING_RATE = 0.01  # ml.SGD default step size
+DEFAULT_SIGMOID = "exact"
+
+BATCH_SIZES = [32, 128]
+EPOCHS = [5, 10]
+LEARNING_RATES = [0.01, 0.05, 0.1]
+
+# ======================================================
+# Arithmetic back ends
+# ======================================================
+#
+# FixedPoint keeps every value as an int64 integer v = round(x * 2^f),
+# wrapped to k bits like sfix. Products are summed first and truncated
+# once with round-to-nearest (sfix.round_nearest = True), as in MP-SPDZ
+# dot products. Exact for f up to about 23 (products must fit int64).
+# FloatPoint runs the same training in float64 as a reference.
+
+
+class FixedPoint:
+    def __init__(self, f: int = DEFAULT_F, k: int = DEFAULT_K):
+        self.f, self.k = f, k
+        self.one = 1 << f
+        self.half = 1 << (f - 1)
+        self.overflow = False
+
+    def encode(self, x):
+        return self.wrap(np.rint(np.asarray(x, dtype=np.float64) * self.one).astype(np.int64))
+
+    def decode(self, v):
+        return np.asarray(v, dtype=np.float64) / self.one
+
+    def wrap(self, v):
+        """Reduce to signed k-bit range, remembering whether anything wrapped."""
+        if self.k >= 64:
+            return v
+        bound = np.int64(1) << np.int64(self.k - 1)
+        wrapped = ((v + bound) & ((bound << np.int64(1)) - 1)) - bound
+        self.overflow |= bool(np.any(wrapped != v))
+        return wrapped
+
+    def trunc(self, v):
+        return (v + self.half) >> self.f
+
+    def matmul(self, a, b):
+        return self.wrap(self.trunc(a @ b))
+
+    def scale(self, v, c):
+        """Elementwise product with fixed-point factors c (broadcast)."""
+        return self.wrap(self.trunc(v * c))
+
+    def div_int(self, v, n: int):
+        """Division by a public integer, rounded to nearest."""
+        return (v + n // 2) // n
+
+
+class FloatPoint:
+    def __init__(self):
+        self.f, self.k = None, None
+        self.one = 1.0
+        self.overflow = False
+
+    def encode(self, x):
+        return np.asarray(x, dtype=np.float64)
+
+    def decode(self, v):
+        return np.asarray(v, dtype=np.float64)
+
+    def wrap(self, v):
+        return v
+
+    def matmul(self, a, b):
+        return a @ b
+
+    def scale(self, v, c):
+        return v * c
+
+    def div_int(self, v, n: int):
+        return v / n
+
+
+# ======================================================
+# Sigmoid approximations (on encoded values)
+# ======================================================
+
+def sigmoid_exact(arith, z):
+    """MP-SPDZ's exp-based sigmoid, i.e. the true sigmoid rounded to f bits."""
+    return arith.encode(1.0 / (1.0 + np.exp(-arith.decode(z))))
+
+
+def sigmoid_approx3(arith, z):
+    """ml.approx_sigmoid(n=3): 0 below -0.5, 1 above 0.5, else 0.5 + x."""
+    half = arith.encode(0.5)
+    return np.where(z < -half, 0, np.where(z > half, arith.encode(1.0), half + z))
+
+
+def sigmoid_approx5(arith, z):
+    """ml.approx_sigmoid(n=5): five linear pieces cut at -5, -2.5, 2.5, 5."""
+    x = arith.decode(z)
+    pieces = [
+        np.full_like(x, 1e-4),
+        0.02776 * x + 0.145,
+        0.17 * x + 0.5,
+        0.02776 * x + 0.85498,
+        np.full_like(x, 1 - 1e-4),
+    ]
+    index = np.searchsorted([-5, -2.5, 2.5, 5], x, side="left")
+    return arith.encode(np.choose(index, pieces))
+
+
+def sigmoid_approximation(name: str, bound: float = None):
+    """A sigmoid_approx approximation (selected in thesis.mpc with sigmoid=<name>)."""
+    approximation = get_approximation(name, bound)
+    return lambda arith, z: approximation.evaluate(z, ArithOps(arith))
+
+
+SIGMOIDS = {
+    "exact": sigmoid_exact,
+    "approx3": sigmoid_approx3,
+    "approx5": sigmoid_approx5,
+    **{name: sigmoid_approximation(name) for name in APPROXIMATIONS},
+}
+
+
+# ======================================================
+# Training
+# ======================================================
+
+def split_dataset(data, test_size: float = DEFAULT_TEST_SIZE):
+    """Unshuffled train/test split with the sizes used by offline.py."""
+    data = np.asarray(data, dtype=np.float64)
+    n_test = int(np.ceil(test_size * len(data)))
+    train, test = data[: len(data) - n_test], data[len(data) - n_test:]
+    return train[:, :-1], train[:, -1], test[:, :-1], test[:, -1]
+
+
+def _metrics(arith, W, b, X, y):
+    """Accuracy and log loss per configuration (rows of W)."""
+    z = arith.matmul(W, X.T) + b[:, None]
+    p = np.clip(1.0 / (1.0 + np.exp(-arith.decode(z))), 1e-12, 1 - 1e-12)
+    acc = ((z > 0) == (y[None, :] > 0.5)).mean(axis=1)
+    loss = -(y * np.log(p) + (1 - y) * np.log(1 - p)).mean(axis=1)
+    return acc, loss
+
+
+def train_group(
+    X_train, y_train, X_test, y_test,
+    batch_size: int, epochs, learning_rates,
+    arith=None, sigmoid: str = DEFAULT_SIGMOID, seed: int = 0,
+):
+    """
+    Train one model per learning rate at once (weights stacked as rows)
+    for max(epochs) epochs and record metrics after every epoch in 'epochs'.
+
+    Mirrors ml.SGDLogistic: Dense layer (Glorot-uniform weights, zero bias),
+    sigmoid output, per-epoch shuffling, n_train // batch_size batches per
+    epoch, gradient averaged over the batch.
+
+    Returns:
+        list of dicts (batch_size, epochs, learning_rate, train_acc, test_acc, test_loss, overflow)
+    """
+    arith = arith or FixedPoint()
+    sigmoid_fn = SIGMOIDS[sigmoid] if isinstance(sigmoid, str) else sigmoid
+    rng = np.random.default_rng(seed)
+    n, d = X_train.shape
+    n_cfg = len(learning_rates)
+
+    Xf, Xtf = arith.encode(X_train), arith.encode(X_test)
+    yf = arith.encode(y_train)
+    r = np.sqrt(6.0 / (d + 1))
+    W = np.repeat(arith.encode(rng.uniform(-r, r, size=(1, d))), n_cfg, axis=0)
+    b = arith.encode(np.zeros(n_cfg))
+    lr = arith.encode(np.asarray(learning_rates, dtype=np.float64))
+
+    results, wanted = [], set(epochs)
+    for epoch in range(1, max(epochs) + 1):
+        order = rng.permutation(n)
+        for start in range(0, n - batch_size + 1, batch_size):
+            idx = order[start:start + batch_size]
+            Xb = Xf[idx]
+            z = arith.matmul(W, Xb.T) + b[:, None]  # (n_cfg, batch)
+            err = sigmoid_fn(arith, z) - yf[idx][None, :]
+            grad_W = arith.div_int(arith.matmul(err, Xb), batch_size)
+            grad_b = arith.div_int(err.sum(axis=1), batch_size)
+            W = arith.wrap(W - arith.scale(grad_W, lr[:, None]))
+            b = arith.wrap(b - arith.scale(grad_b, lr))
+
+        if epoch in wanted:
+            train_acc, _ = _metrics(arith, W, b, Xf, y_train)
+            test_acc, test_loss = _metrics(arith, W, b, Xtf, y_test)
+            for i, rate in enumerate(learning_rates):
+                results.append({
+                    "batch_size": batch_size,
+                    "epochs": epoch,
+                    "learning_rate": rate,
+                    "train_acc": float(train_acc[i]),
+                    "test_acc": float(test_acc[i]),
+                    "test_loss": float(test_loss[i]),
+                    "overflow": arith.overflow,
+                })
+    return results
+
+
+def emulate_grid(
+    data, batch_sizes=BATCH_SIZES, epochs=EPOCHS, learning_rates=LEARNING_RATES,
+    f: int = DEFAULT_F, k: int = DEFAULT_K, sigmoid: str = DEFAULT_SIGMOID,
+    test_size: float = DEFAULT_TEST_SIZE, seed: int = 0,
+):
+    """
+    Screen a whole (batch_size x epochs x learning_rate) grid.
+    f=None trains in float64 instead of fixed point.
+
+    Returns:
+        pd.DataFrame with one row per configuration
+    """
+    X_train, y_train, X_test, y_test = split_dataset(data, test_size)
+    rows = []
+    for batch_size in batch_sizes:
+        arith = FloatPoint() if f is None else FixedPoint(f, k)
+        rows += train_group(
+            X_train, y_train, X_test, y_test, batch_size, epochs, learning_rates,
+            arith, sigmoid, seed,
+        )
+    return pd.DataFrame(rows)
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Screen SGDLogistic configurations under sfix arithmetic."
+    )
+    parser.add_argument("dataset", nargs="?", default="trainingUIS")
+    parser.add_argument("--f", type=int, default=DEFAULT_F)
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--sigmoid", choices=sorted(SIGMOIDS), default=DEFAULT_SIGMOID)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--epochs", type=int, nargs="+", default=EPOCHS)
+    parser.add_argument("--learning-rates", type=float, nargs="+", default=LEARNING_RATES)
+    args = parser.parse_args()
+
+    data = load_array(DATA_DIR / f"{args.dataset}.csv")
+
+    t0 = time.perf_counter()
+    fixed = emulate_grid(
+        data, args.batch_sizes, args.epochs, args.learning_rates, args.f, args.k, args.sigmoid
+    )
+    t1 = time.perf_counter()
+    floating = emulate_grid(
+        data, args.batch_sizes, args.epochs, args.learning_rates, None, None, args.sigmoid
+    )
+
+    keys = ["batch_size", "epochs", "learning_rate"]
+    table = fixed.merge(floating, on=keys, suffixes=("", "_float"))
+    table["acc_gap"] = table["test_acc"] - table["test_acc_float"]
+    print(f"[EMULATOR] {args.dataset}: {len(fixed)} configurations, f={args.f}, k={args.k}, "
+          f"sigmoid={args.sigmoid}, {t1 - t0:.3f} s")
+    print(table[keys + ["train_acc", "test_acc", "test_loss", "test_acc_float", "acc_gap", "overflow"]]
+          .to_string(index=False, float_format=lambda x: f"{x:.4f}"))
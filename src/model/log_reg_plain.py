@@ -20,7 +20,7 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
 
 
-X = df.drop(columns=[df.columns[-1]], axis=1)  # features
+X = df.drop(columns=[df.columns[-1]])  # features
 y = df.iloc[:, -1]  # target
 X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42, stratify=y
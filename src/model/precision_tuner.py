@@ -0,0 +1,191 @@
+# Per-dataset fixed-point precision (f, k) for the MPC training
+import sys
+import json
+import math
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent))  # fixed_point_emulator, also as model.precision_tuner
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from preprocessing.datasetLoader import find_dataset, load_array
+from fixed_point_emulator import (
+    DEFAULT_F, DEFAULT_K, DEFAULT_LEARNING_RATE, DEFAULT_SIGMOID, SIGMOIDS,
+    FixedPoint, FloatPoint, split_dataset, train_group,
+)
+
+# ======================================================
+# Configuration
+# ======================================================
+#
+# Comparisons and truncations in MP-SPDZ decompose sfix values into k bits
+# (edaBits of size k), so their preprocessing grows with k while f only
+# moves the binary point. The tuner therefore looks for the smallest k
+# that trains as well as float64 and, for that k, takes the largest such
+# f (most fractional precision at the same cost):
+#   1) dataset statistics give the integer bits every value needs
+#      (features, labels and a margin for weights and dot products);
+#      candidates with fewer than that in k - f are infeasible
+#   2) the remaining (f, k) pairs are trained in fixed_point_emulator
+#      (several seeds), k ascending until one qualifies: no overflow and
+#      test accuracy within 'tolerance' of the float64 baseline
+# The emulator does not model protocol limits on k (MP-SPDZ checks those
+# when compiling) nor the error of probabilistic truncation.
+# The choice is stored in PRECISION_FILE per dataset. main.run_preprocessing
+# reads it and has offline.py share with scale 2^f and record f and k in
+# metadata.txt, from which thesis.mpc sets sfix.set_precision(f, k).
+
+BASE_DIR = Path(__file__).parents[2].resolve()
+PRECISION_FILE = BASE_DIR / "precision.json"
+
+F_CANDIDATES = [8, 10, 12, 14, 16, 20]
+K_CANDIDATES = [24, 32, 40, 48, 64]
+DEFAULT_TOLERANCE = 0.01  # allowed test accuracy drop against float64
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_EPOCHS = 5
+SEEDS = [0, 1, 2]
+GUARD_BITS = 4  # integer headroom for weights, gradients and dot products
+
+
+def dataset_stats(data) -> dict:
+    """
+    Feature ranges and label statistics of a labeled matrix (label last).
+
+    Returns:
+        dict with n_rows, d, max_abs_feature, feature_min/max per column,
+        positive_rate, majority_acc and integer_bits (sign + bits of the
+        largest |value| + bits of d for dot products + GUARD_BITS)
+    """
+    data = np.asarray(data, dtype=np.float64)
+    X, y = data[:, :-1], data[:, -1]
+    max_abs = float(np.max(np.abs(X))) if X.size else 0.0
+    positive_rate = float(np.mean(y > 0.5))
+    integer_bits = (
+        1 + math.ceil(math.log2(max(max_abs, 1.0) + 1)) + math.ceil(math.log2(X.shape[1] + 1))
+    )
+    return {
+        "n_rows": len(data),
+        "d": X.shape[1],
+        "max_abs_feature": max_abs,
+        "feature_min": X.min(axis=0).tolist(),
+        "feature_max": X.max(axis=0).tolist(),
+        "positive_rate": positive_rate,
+        "majority_acc": max(positive_rate, 1 - positive_rate),
+        "integer_bits": integer_bits + GUARD_BITS,
+    }
+
+
+def emulate(data, arith, batch_size, epochs, learning_rate, sigmoid=DEFAULT_SIGMOID, seeds=SEEDS):
+    """Mean test accuracy, mean test loss and any overflow of one arithmetic over 'seeds'."""
+    X_train, y_train, X_test, y_test = split_dataset(data)
+    rows = []
+    for seed in seeds:
+        rows += train_group(
+            X_train, y_train, X_test, y_test, batch_size, [epochs], [learning_rate],
+            arith, sigmoid, seed,
+        )
+    return (
+        float(np.mean([r["test_acc"] for r in rows])),
+        float(np.mean([r["test_loss"] for r in rows])),
+        any(r["overflow"] for r in rows),
+    )
+
+
+def tune_precision(
+    data, tolerance: float = DEFAULT_TOLERANCE, batch_size: int = DEFAULT_BATCH_SIZE,
+    epochs: int = DEFAULT_EPOCHS, learning_rate: float = DEFAULT_LEARNING_RATE,
+    sigmoid: str = DEFAULT_SIGMOID, f_candidates=F_CANDIDATES, k_candidates=K_CANDIDATES,
+):
+    """
+    Cheapest (f, k) that trains within 'tolerance' of float64 (see Configuration).
+
+    Returns:
+        (choice dict or None if no candidate qualifies, stats, list of candidate rows)
+    """
+    stats = dataset_stats(data)
+    float_acc, float_loss, _ = emulate(data, FloatPoint(), batch_size, epochs, learning_rate, sigmoid)
+
+    rows, choice = [], None
+    for k in sorted(k_candidates):
+        for f in sorted(f_candidates):
+            row = {"f": f, "k": k, "feasible": k - f >= stats["integer_bits"] and f <= 23}
+            if row["feasible"]:
+                acc, loss, overflow = emulate(
+                    data, FixedPoint(f, k), batch_size, epochs, learning_rate, sigmoid
+                )
+                row.update({
+                    "test_acc": acc, "test_loss": loss, "overflow": overflow,
+                    "acc_gap": acc - float_acc,
+                    "ok": not overflow and acc >= float_acc - tolerance,
+                })
+            rows.append(row)
+
+        ok = [r for r in rows if r["k"] == k and r.get("ok")]
+        if not ok:
+            continue
+        best = max(ok, key=lambda r: r["f"])
+        choice = {
+            "f": best["f"], "k": best["k"], "test_acc": best["test_acc"],
+            "float_acc": float_acc, "tolerance": tolerance, "batch_size": batch_size,
+            "epochs": epochs, "learning_rate": learning_rate, "sigmoid": sigmoid,
+        }
+        break
+    return choice, {**stats, "float_acc": float_acc, "float_loss": float_loss}, rows
+
+
+def save_precision(dataset: str, choice: dict, path: Path = PRECISION_FILE):
+    """Store the choice for 'dataset' (file stem) in PRECISION_FILE, keeping other datasets."""
+    precision = json.loads(path.read_text()) if path.exists() else {}
+    precision[dataset] = choice
+    path.write_text(json.dumps(precision, indent=2, sort_keys=True))
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Choose the cheapest sfix precision (f, k) per dataset by emulated training."
+    )
+    parser.add_argument("datasets", nargs="+", help="Dataset names (data_small/, data/) or .csv paths")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument("--learning-rate", type=float, default=DEFAULT_LEARNING_RATE)
+    parser.add_argument("--sigmoid", choices=sorted(SIGMOIDS), default=DEFAULT_SIGMOID)
+    parser.add_argument("--dry-run", action="store_true", help=f"Do not write {PRECISION_FILE.name}")
+    args = parser.parse_args()
+
+    for name in args.datasets:
+        path = find_dataset(name)
+        data = load_array(path)
+        t0 = time.perf_counter()
+        choice, stats, rows = tune_precision(
+            data, args.tolerance, args.batch_size, args.epochs, args.learning_rate, args.sigmoid
+        )
+        t1 = time.perf_counter()
+
+        print(f"\n=== Precision of {path.stem} ({t1 - t0:.2f} s) ===")
+        print(f"n={stats['n_rows']}, d={stats['d']}, max |feature|={stats['max_abs_feature']:g}, "
+              f"positive rate={stats['positive_rate']:.3f}, integer bits={stats['integer_bits']}, "
+              f"float64 test_acc={stats['float_acc']:.4f} (majority {stats['majority_acc']:.4f})")
+        print(f"{'f':>4}{'k':>4}{'test_acc':>10}{'gap':>9}{'test_loss':>11}{'overflow':>10}{'ok':>5}")
+        for r in rows:
+            if not r["feasible"]:
+                print(f"{r['f']:>4}{r['k']:>4}{'too few integer bits':>28}")
+                continue
+            print(f"{r['f']:>4}{r['k']:>4}{r['test_acc']:>10.4f}{r['acc_gap']:>+9.4f}"
+                  f"{r['test_loss']:>11.4f}{str(r['overflow']):>10}{'yes' if r['ok'] else '':>5}")
+
+        if choice is None:
+            print(f"[SKIP] No candidate within {args.tolerance} of float64, keeping "
+                  f"f={DEFAULT_F}, k={DEFAULT_K}")
+            continue
+        print(f"[INFO] {path.stem}: f={choice['f']}, k={choice['k']} "
+              f"(test_acc {choice['test_acc']:.4f} vs. float64 {choice['float_acc']:.4f})")
+        if not args.dry_run:
+            save_precision(path.stem, {**choice, "integer_bits": stats["integer_bits"]})
+            print(f"[INFO] Written to {PRECISION_FILE}")
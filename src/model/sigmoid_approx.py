@@ -0,0 +1,399 @@
+# Sigmoid approximations for MPC training: fitting, cost and error report
+import re
+import argparse
+
+import numpy as np
+
+# ======================================================
+# Configuration
+# ======================================================
+#
+# Every approximation is written once against a small set of operations
+# (ops): + and - of values, products with public constants (local, plus a
+# truncation), secret products, comparisons with public constants and
+# products of a comparison bit with a value. The same code thus runs on
+# floats (FloatOps), on the values of fixed_point_emulator's arithmetics
+# (ArithOps), on sfix in thesis.mpc and on CostOps, which counts secret
+# products and comparisons and tracks the multiplicative depth.
+#
+# This module must not import MP-SPDZ: thesis.mpc imports it at compile
+# time from Programs/Source (see main.prepare_sources).
+
+DEFAULT_BOUNDS = {  # interval [-bound, bound] fitted by default, per kind
+    "clipped": 2.0,  # 0.5 + x / 4, the SecureML-style poly3 thesis.mpc used to define
+    "piecewise": 6.0,
+    "cheb": 8.0,
+    "minimax": 8.0,
+}
+DEFAULT_ERROR_RANGE = 16.0  # max error is measured on [-range, range]
+DEFAULT_F = 16  # default sfix precision of thesis.mpc (per dataset: precision_tuner.py)
+NAMES = [
+    "clipped", "piecewise5", "piecewise9",
+    "cheb3", "cheb5", "cheb7", "minimax3", "minimax5", "minimax7",
+]
+
+FIT_POINTS = 4001  # grid on [0, 1] for the minimax fit
+LAWSON_ITERATIONS = 2000
+ERROR_POINTS = 20001
+
+name_pattern = re.compile(r"^(clipped|piecewise|cheb|minimax)(\d*)$")
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.asarray(x, dtype=np.float64)))
+
+
+# ======================================================
+# Operations
+# ======================================================
+
+class FloatOps:
+    """Plain float64 evaluation."""
+
+    def const(self, c):
+        return np.float64(c)
+
+    def add(self, a, b):
+        return a + b
+
+    def sub(self, a, b):
+        return a - b
+
+    def scale(self, a, c):
+        return a * c
+
+    def mul(self, a, b):
+        return a * b
+
+    def ge(self, a, c):
+        return a >= c
+
+    def bit_mul(self, bit, a):
+        return np.where(bit, a, 0.0)
+
+    def bit_scale(self, bit, c):
+        return np.where(bit, c, 0.0)
+
+
+class ArithOps:
+    """Evaluation on encoded values of a fixed_point_emulator arithmetic (FixedPoint, ...)."""
+
+    def __init__(self, arith):
+        self.arith = arith
+
+    def const(self, c):
+        return self.arith.encode(c)
+
+    def add(self, a, b):
+        return a + b
+
+    def sub(self, a, b):
+        return a - b
+
+    def scale(self, a, c):
+        return self.arith.scale(a, self.arith.encode(c))
+
+    def mul(self, a, b):
+        return self.arith.scale(a, b)
+
+    def ge(self, a, c):
+        return a >= self.arith.encode(c)
+
+    def bit_mul(self, bit, a):
+        return np.where(bit, a, 0 * a)
+
+    def bit_scale(self, bit, c):
+        return np.where(bit, self.arith.encode(c), 0 * self.arith.encode(c))
+
+
+class CostOps:
+    """
+    Values are multiplicative depths. Products with public constants and
+    bits times public constants are local; comparisons are counted apart
+    (in MP-SPDZ each takes a few rounds, all of them run in parallel here).
+    """
+
+    def __init__(self):
+        self.products = 0
+        self.comparisons = 0
+
+    def const(self, c):
+        return 0
+
+    def add(self, a, b):
+        return max(a, b)
+
+    sub = add
+
+    def scale(self, a, c):
+        return a
+
+    def mul(self, a, b):
+        self.products += 1
+        return max(a, b) + 1
+
+    def ge(self, a, c):
+        self.comparisons += 1
+        return a
+
+    bit_mul = mul
+
+    def bit_scale(self, bit, c):
+        return bit
+
+
+class SfixOps:
+    """MP-SPDZ sfix (vectors) at compile time, used by thesis.mpc and predict.mpc."""
+
+    def __init__(self, sfix):
+        self.sfix = sfix
+
+    def const(self, c):
+        return c
+
+    def add(self, a, b):
+        return a + b
+
+    def sub(self, a, b):
+        return a - b
+
+    def scale(self, a, c):
+        return a * c
+
+    def mul(self, a, b):
+        return a * b
+
+    def ge(self, a, c):
+        return a >= c
+
+    def bit_mul(self, bit, a):
+        # bit times value: one integer product of the representations, no truncation
+        return self.sfix._new(bit * a.v)
+
+    def bit_scale(self, bit, c):
+        return self.sfix._new(bit * int(round(c * 2**self.sfix.f)))
+
+
+# ======================================================
+# Approximations
+# ======================================================
+
+class Piecewise:
+    """
+    Piecewise-linear sigmoid: piece i (a_i * x + c_i) between breakpoints
+    t_{i-1} and t_i. Evaluated as piece 0 plus, for every breakpoint, the
+    bit [x >= t_i] times the change of the linear function, so all
+    comparisons and products run in parallel (depth 1).
+    """
+
+    def __init__(self, name: str, breakpoints, slopes, intercepts, bound: float):
+        self.name = name
+        self.kind = "piecewise"
+        self.bound = bound
+        self.breakpoints = [float(t) for t in breakpoints]
+        self.slopes = [float(a) for a in slopes]
+        self.intercepts = [float(c) for c in intercepts]
+
+    def evaluate(self, x, ops):
+        y = ops.add(ops.scale(x, self.slopes[0]), ops.const(self.intercepts[0]))
+        for i, t in enumerate(self.breakpoints):
+            bit = ops.ge(x, t)
+            slope = self.slopes[i + 1] - self.slopes[i]
+            intercept = self.intercepts[i + 1] - self.intercepts[i]
+            if slope:
+                change = ops.add(ops.scale(x, slope), ops.const(intercept))
+                y = ops.add(y, ops.bit_mul(bit, change))
+            else:
+                y = ops.add(y, ops.bit_scale(bit, intercept))
+        return y
+
+    def describe(self) -> str:
+        return f"breakpoints {self.breakpoints}"
+
+
+class OddPolynomial:
+    """
+    0.5 + t * q(t^2) with t = x / bound, i.e. an odd polynomial in t, as
+    sigmoid(x) - 0.5 is odd. Working in t keeps the coefficients large
+    enough for f fractional bits. With clip=True, t is clipped to [-1, 1]
+    first (two comparisons), otherwise the polynomial diverges outside
+    the fitted interval.
+    """
+
+    def __init__(self, name: str, kind: str, coefficients, bound: float, clip: bool = True):
+        self.name = name
+        self.kind = kind
+        self.bound = bound
+        self.coefficients = [float(c) for c in coefficients]  # of t, t^3, t^5, ...
+        self.clip = clip
+
+    @property
+    def degree(self) -> int:
+        return 2 * len(self.coefficients) - 1
+
+    def evaluate(self, x, ops):
+        t = ops.scale(x, 1.0 / self.bound)
+        if self.clip:
+            above, below = ops.ge(t, 1.0), ops.ge(ops.scale(t, -1.0), 1.0)
+            t = ops.add(
+                t,
+                ops.add(
+                    ops.bit_mul(above, ops.sub(ops.const(1.0), t)),
+                    ops.bit_mul(below, ops.sub(ops.const(-1.0), t)),
+                ),
+            )
+        if len(self.coefficients) == 1:
+            return ops.add(ops.const(0.5), ops.scale(t, self.coefficients[0]))
+        t2 = ops.mul(t, t)
+        *rest, last = self.coefficients
+        q = ops.add(ops.scale(t2, last), ops.const(rest[-1]))
+        for c in reversed(rest[:-1]):
+            q = ops.add(ops.mul(q, t2), ops.const(c))
+        return ops.add(ops.const(0.5), ops.mul(t, q))
+
+    def describe(self) -> str:
+        return "t^1.. " + ", ".join(f"{c:+.6g}" for c in self.coefficients)
+
+
+def clipped_linear(bound: float = DEFAULT_BOUNDS["clipped"]) -> Piecewise:
+    """0 below -bound, 1 above bound, linear in between."""
+    slope = 0.5 / bound
+    return Piecewise("clipped", [-bound, bound], [0.0, slope, 0.0], [0.0, 0.5, 1.0], bound)
+
+
+def piecewise_linear(n_pieces: int, bound: float = DEFAULT_BOUNDS["piecewise"]) -> Piecewise:
+    """
+    Linear interpolation of the sigmoid between n_pieces - 1 equidistant
+    breakpoints on [-bound, bound], constant outside.
+    """
+    if n_pieces < 3:
+        raise ValueError("piecewise needs at least 3 pieces")
+    t = np.linspace(-bound, bound, n_pieces - 1)
+    s = sigmoid(t)
+    inner_slopes = np.diff(s) / np.diff(t)
+    inner_intercepts = s[:-1] - inner_slopes * t[:-1]
+    slopes = [0.0, *inner_slopes, 0.0]
+    intercepts = [s[0], *inner_intercepts, s[-1]]
+    return Piecewise(f"piecewise{n_pieces}", t, slopes, intercepts, bound)
+
+
+def chebyshev(degree: int, bound: float = DEFAULT_BOUNDS["cheb"], clip: bool = True):
+    """Interpolation at the Chebyshev nodes of [-bound, bound] (near-minimax)."""
+    cheb = np.polynomial.chebyshev.chebinterpolate(lambda t: sigmoid(bound * t), degree)
+    power = np.polynomial.chebyshev.cheb2poly(cheb)
+    return OddPolynomial(f"cheb{degree}", "cheb", power[1::2], bound, clip)
+
+
+def minimax(degree: int, bound: float = DEFAULT_BOUNDS["minimax"], clip: bool = True):
+    """
+    Odd polynomial minimizing the max error on [-bound, bound], fitted on
+    a grid with Lawson's iteratively reweighted least squares.
+    """
+    t = np.linspace(0.0, 1.0, FIT_POINTS)[1:]
+    target = sigmoid(bound * t) - 0.5
+    basis = np.stack([t ** (2 * j + 1) for j in range((degree + 1) // 2)], axis=1)
+    weights = np.full(len(t), 1.0 / len(t))
+    for _ in range(LAWSON_ITERATIONS):
+        root = np.sqrt(weights)[:, None]
+        coefficients = np.linalg.lstsq(basis * root, target * root[:, 0], rcond=None)[0]
+        error = np.abs(basis @ coefficients - target)
+        weights = weights * error
+        weights /= weights.sum()
+    return OddPolynomial(f"minimax{degree}", "minimax", coefficients, bound, clip)
+
+
+def get_approximation(name: str, bound: float = None):
+    """
+    Approximation by name: clipped, piecewise<n>, cheb<degree>, minimax<degree>
+    (odd degrees), fitted on [-bound, bound] (default: DEFAULT_BOUNDS).
+    """
+    match = name_pattern.match(name)
+    if not match:
+        raise ValueError(f"Unknown sigmoid approximation {name!r}, e.g. {', '.join(NAMES)}")
+    kind, number = match.group(1), match.group(2)
+    bound = float(bound or DEFAULT_BOUNDS[kind])
+    if kind == "clipped":
+        return clipped_linear(bound)
+    if not number:
+        raise ValueError(f"{kind} needs a size, e.g. {kind}5")
+    if kind == "piecewise":
+        return piecewise_linear(int(number), bound)
+    if int(number) % 2 == 0:
+        raise ValueError(f"{name}: the sigmoid is fitted by odd polynomials, use an odd degree")
+    return (chebyshev if kind == "cheb" else minimax)(int(number), bound)
+
+
+# ======================================================
+# Report
+# ======================================================
+
+def cost(approximation) -> dict:
+    """Secret products, their multiplicative depth and comparisons of one evaluation."""
+    ops = CostOps()
+    depth = approximation.evaluate(0, ops)
+    return {"products": ops.products, "depth": depth, "comparisons": ops.comparisons}
+
+
+def max_error(approximation, error_range: float = DEFAULT_ERROR_RANGE, arith=None) -> float:
+    """
+    Max |approximation - sigmoid| on [-error_range, error_range], in float64
+    or on the encoded values of 'arith' (e.g. FixedPoint(f)).
+    """
+    x = np.linspace(-error_range, error_range, ERROR_POINTS)
+    if arith is None:
+        y = approximation.evaluate(x, FloatOps())
+    else:
+        y = arith.decode(approximation.evaluate(arith.encode(x), ArithOps(arith)))
+    return float(np.max(np.abs(y - sigmoid(x))))
+
+
+def report(names=NAMES, bound: float = None, error_range: float = DEFAULT_ERROR_RANGE, arith=None):
+    """
+    Cost and accuracy of each approximation.
+
+    Returns:
+        list of dicts (name, bound, products, depth, comparisons, max_err,
+        max_err_fixed, coefficients)
+    """
+    rows = []
+    for name in names:
+        approximation = get_approximation(name, bound)
+        rows.append({
+            "name": name,
+            "bound": approximation.bound,
+            **cost(approximation),
+            "max_err": max_error(approximation, error_range),
+            "max_err_fixed": max_error(approximation, error_range, arith) if arith else None,
+            "coefficients": approximation.describe(),
+        })
+    return rows
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    from fixed_point_emulator import FixedPoint
+
+    parser = argparse.ArgumentParser(
+        description="Fit sigmoid approximations and report their MPC cost and max error."
+    )
+    parser.add_argument("names", nargs="*", default=NAMES)
+    parser.add_argument("--bound", type=float, help="Fitted interval [-bound, bound]")
+    parser.add_argument("--range", dest="error_range", type=float, default=DEFAULT_ERROR_RANGE,
+                        help="Max error is measured on [-range, range]")
+    parser.add_argument("--f", type=int, default=DEFAULT_F, help="Fractional bits (fixed-point error)")
+    parser.add_argument("--coefficients", action="store_true", help="Print the fitted coefficients")
+    args = parser.parse_args()
+
+    rows = report(args.names, args.bound, args.error_range, FixedPoint(args.f))
+    print(f"\n=== Sigmoid approximations (max error on [-{args.error_range:g}, "
+          f"{args.error_range:g}], f={args.f}) ===")
+    print(f"{'name':<12}{'bound':>7}{'products':>10}{'depth':>7}{'comparisons':>13}"
+          f"{'max err':>11}{'max err f':>11}")
+    for r in rows:
+        print(f"{r['name']:<12}{r['bound']:>7g}{r['products']:>10}{r['depth']:>7}"
+              f"{r['comparisons']:>13}{r['max_err']:>11.2e}{r['max_err_fixed']:>11.2e}")
+        if args.coefficients:
+            print(f"{'':<12}{r['coefficients']}")
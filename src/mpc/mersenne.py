@@ -0,0 +1,122 @@
+# vectorized arithmetic in the Mersenne prime field GF(2^61 - 1)
+
+import secrets
+
+import numpy as np
+
+P = 2**61 - 1
+P_U64 = np.uint64(P)
+
+_SHIFT_61 = np.uint64(61)
+_SHIFT_32 = np.uint64(32)
+_SHIFT_29 = np.uint64(29)
+_SHIFT_3 = np.uint64(3)
+_MASK_32 = np.uint64(2**32 - 1)
+_MASK_29 = np.uint64(2**29 - 1)
+
+
+def _fold(x):
+    """
+    Partial reduction using 2^61 ≡ 1 (mod p): x -> (x mod 2^61) + (x >> 61).
+    For any uint64 x the result is < 2^61 + 8.
+    """
+    return (x & P_U64) + (x >> _SHIFT_61)
+
+
+def reduce(x):
+    """Reduce uint64 values (any value < 2^64) to [0, p)."""
+    x = _fold(np.asarray(x, dtype=np.uint64))
+    return np.where(x >= P_U64, x - P_U64, x)
+
+
+def add(a, b):
+    """(a + b) mod p for a, b in [0, p)."""
+    return reduce(np.asarray(a, dtype=np.uint64) + np.asarray(b, dtype=np.uint64))
+
+
+def sub(a, b):
+    """(a - b) mod p for a, b in [0, p)."""
+    return reduce(np.asarray(a, dtype=np.uint64) + (P_U64 - np.asarray(b, dtype=np.uint64)))
+
+
+def mul(a, b):
+    """
+    (a * b) mod p for a, b in [0, p) without 128-bit intermediates.
+
+    Both operands are split into 32-bit limbs, a = a1 * 2^32 + a0, so
+        a * b = a1*b1 * 2^64 + (a1*b0 + a0*b1) * 2^32 + a0*b0
+    where every partial product fits into uint64. With 2^61 ≡ 1 (mod p):
+        2^64 ≡ 8 and mid * 2^32 = (mid >> 29) * 2^61 + (mid mod 2^29) * 2^32
+    and the sum of all folded terms stays below 2^63.
+    """
+    a = np.asarray(a, dtype=np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    a1, a0 = a >> _SHIFT_32, a & _MASK_32
+    b1, b0 = b >> _SHIFT_32, b & _MASK_32
+
+    high = a1 * b1  # < 2^58
+    mid = a1 * b0 + a0 * b1  # < 2^62
+    low = a0 * b0  # < 2^64
+
+    total = (
+        (high << _SHIFT_3)
+        + ((mid & _MASK_29) << _SHIFT_32)
+        + (mid >> _SHIFT_29)
+        + _fold(low)
+    )
+    return reduce(total)
+
+
+def random_words(shape):
+    """Uniform 64-bit words from the OS CSPRNG (secrets), in one bulk buffer."""
+    n_values = int(np.prod(shape))
+    buffer = secrets.token_bytes(8 * n_values)
+    return np.frombuffer(buffer, dtype="<u8").astype(np.uint64).reshape(shape)
+
+
+def random_elements(shape, rng: np.random.Generator = None):
+    """
+    Uniform field elements in [0, p) drawn in one bulk call, from the OS
+    CSPRNG. A seeded 'rng' (predictable, tests and benchmarks only) is
+    used instead if given.
+    """
+    if rng is not None:
+        return rng.integers(0, P, size=shape, dtype=np.uint64)
+    # 61 uniform bits; the single value 2^61 - 1 = p is redrawn
+    values = np.atleast_1d(random_words(shape) & P_U64)
+    redraw = values == P_U64
+    while redraw.any():
+        values[redraw] = random_words(int(redraw.sum())) & P_U64
+        redraw = values == P_U64
+    return values.reshape(shape)
+
+
+def encode(values, scale: int = 1):
+    """
+    Fixed-point encode real values into the field:
+    round(v * scale) mod p, negative values wrap to p - |x|.
+    """
+    encoded = np.rint(np.asarray(values, dtype=np.float64) * scale).astype(np.int64)
+    return np.mod(encoded, np.int64(P)).astype(np.uint64)
+
+
+def decode(values, scale: int = 1):
+    """Inverse of encode: map [0, p) back to signed values / scale."""
+    values = np.asarray(values, dtype=np.uint64)
+    signed = np.where(values > P_U64 // np.uint64(2), values.astype(np.int64) - P, values.astype(np.int64))
+    return signed / scale
+
+
+def share_with_macs(values, alpha: int, rng: np.random.Generator = None):
+    """
+    Two-party additive sharing with SPDZ-style MAC shares, all as array ops.
+
+    Returns:
+        (x0, x1, m0, m1) with x0 + x1 = values and m0 + m1 = alpha * values (mod p)
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    shares0 = random_elements(values.shape, rng)
+    shares1 = sub(values, shares0)
+    macs0 = random_elements(values.shape, rng)
+    macs1 = sub(mul(values, np.uint64(alpha)), macs0)
+    return shares0, shares1, macs0, macs1
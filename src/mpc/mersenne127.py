@@ -0,0 +1,145 @@
+# vectorized arithmetic in the Mersenne prime field GF(2^127 - 1)
+
+import numpy as np
+
+from mersenne import random_words
+
+# An element x < 2^127 is stored as two little-endian 64-bit words in the
+# last axis of a uint64 array, x = w[..., 1] * 2^64 + w[..., 0], which is
+# also the limb layout of MP-SPDZ's 128-bit gfp (PREP_LIMBS = 2).
+
+P = 2**127 - 1
+
+_LOW = np.uint64(2**64 - 1)
+_HIGH = np.uint64(2**63 - 1)  # high word of p
+_ONE = np.uint64(1)
+_SHIFT_63 = np.uint64(63)
+_SHIFT_32 = np.uint64(32)
+_SHIFT_31 = np.uint64(31)
+_SHIFT_1 = np.uint64(1)
+_MASK_32 = np.uint64(2**32 - 1)
+_MASK_31 = np.uint64(2**31 - 1)
+
+
+def words(low, high):
+    """Elements from their low and high 64-bit words."""
+    return np.stack(np.broadcast_arrays(low, high), axis=-1).astype(np.uint64)
+
+
+def from_int(x: int):
+    """One element (shape (2,)) from a Python integer, reduced mod p."""
+    x %= P
+    return words(np.uint64(x & (2**64 - 1)), np.uint64(x >> 64))
+
+
+def to_ints(x) -> list:
+    """Elements as Python integers, flattened."""
+    x = np.asarray(x, dtype=np.uint64).reshape(-1, 2)
+    return [(int(high) << 64) | int(low) for low, high in x.tolist()]
+
+
+def _add_words(a_low, a_high, b_low, b_high):
+    """
+    (a + b) mod p for 128-bit words with a, b < 2^127 + 1: the sum is
+    below 2^128, its bit 127 folds back in (2^127 ≡ 1), and the single
+    remaining non-canonical value p maps to 0.
+    """
+    low = a_low + b_low
+    high = a_high + b_high + (low < a_low)
+    # fold bit 127: x = top * 2^127 + rest -> rest + top (< 2^127 + 1)
+    top = high >> _SHIFT_63
+    high &= _HIGH
+    low_folded = low + top
+    high += low_folded < low
+    # x >= p  <=>  bit 127 set or x == p; x - p = x + 1 - 2^127
+    reduce = (high >> _SHIFT_63).astype(bool) | ((high == _HIGH) & (low_folded == _LOW))
+    low_reduced = low_folded + _ONE
+    high_reduced = (high + (low_reduced < low_folded)) & _HIGH
+    return (
+        np.where(reduce, low_reduced, low_folded),
+        np.where(reduce, high_reduced, high),
+    )
+
+
+def add(a, b):
+    """(a + b) mod p for a, b in [0, p)."""
+    a = np.asarray(a, dtype=np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    return words(*_add_words(a[..., 0], a[..., 1], b[..., 0], b[..., 1]))
+
+
+def sub(a, b):
+    """(a - b) mod p for a, b in [0, p); p - b is b with all 127 bits flipped."""
+    a = np.asarray(a, dtype=np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    return words(*_add_words(a[..., 0], a[..., 1], b[..., 0] ^ _LOW, b[..., 1] ^ _HIGH))
+
+
+def _limbs(x):
+    """Four 32-bit limbs (least significant first) of elements x."""
+    low, high = x[..., 0], x[..., 1]
+    return [low & _MASK_32, low >> _SHIFT_32, high & _MASK_32, high >> _SHIFT_32]
+
+
+def mul(a, b):
+    """
+    (a * b) mod p for a, b in [0, p) without 128-bit intermediates.
+
+    Schoolbook product of 32-bit limbs: every partial product a_i * b_j
+    fits into uint64 and is split into its 32-bit halves, so each of the
+    8 result columns sums at most 8 values below 2^32 before the carries
+    are propagated. With 2^127 ≡ 1 (mod p) the 254-bit product
+    x = H * 2^127 + L reduces to H + L.
+    """
+    a = np.asarray(a, dtype=np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    a_limbs, b_limbs = _limbs(a), _limbs(b)
+
+    columns = [np.uint64(0)] * 9
+    for i, a_i in enumerate(a_limbs):
+        for j, b_j in enumerate(b_limbs):
+            product = a_i * b_j
+            columns[i + j] = columns[i + j] + (product & _MASK_32)
+            columns[i + j + 1] = columns[i + j + 1] + (product >> _SHIFT_32)
+
+    carry = np.uint64(0)
+    for c in range(8):
+        total = columns[c] + carry
+        columns[c] = total & _MASK_32
+        carry = total >> _SHIFT_32
+
+    # L = bits 0..126, H = bits 127..253
+    low_l = columns[0] | (columns[1] << _SHIFT_32)
+    high_l = columns[2] | ((columns[3] & _MASK_31) << _SHIFT_32)
+    h = [
+        (columns[3 + k] >> _SHIFT_31) | ((columns[4 + k] << _SHIFT_1) & _MASK_32)
+        for k in range(4)
+    ]
+    low_h = h[0] | (h[1] << _SHIFT_32)
+    high_h = h[2] | (h[3] << _SHIFT_32)
+    return words(*_add_words(low_l, high_l, low_h, high_h))
+
+
+def random_elements(shape, rng: np.random.Generator = None):
+    """
+    Uniform field elements in [0, p) drawn in one bulk call (two words
+    each), from the OS CSPRNG unless a seeded 'rng' (predictable, tests
+    and benchmarks only) is given.
+    """
+    shape = (shape,) if isinstance(shape, int) else tuple(shape)
+
+    def draw(n):
+        if rng is not None:
+            return rng.integers(0, 2**64, size=(n, 2), dtype=np.uint64, endpoint=False)
+        return random_words((n, 2))
+
+    # 127 uniform bits; the single value 2^127 - 1 = p is redrawn
+    n_values = int(np.prod(shape))
+    values = draw(n_values)
+    values[:, 1] &= _HIGH
+    redraw = (values[:, 0] == _LOW) & (values[:, 1] == _HIGH)
+    while redraw.any():
+        values[redraw] = draw(int(redraw.sum()))
+        values[redraw, 1] &= _HIGH
+        redraw = (values[:, 0] == _LOW) & (values[:, 1] == _HIGH)
+    return values.reshape(shape + (2,))
@@ -1,8 +1,11 @@
 # share generator with trusted dealer
 
-import random
 import argparse
+import json
 import os
+import re
+import struct
+import time
 import numpy as np
 import sys
 from pathlib import Path
@@ -11,11 +14,21 @@ current_dir = Path(__file__).resolve().parent
 src_dir = current_dir.parent  # = src/
 root_dir = src_dir.parent  # = bachelorthesis/
 sys.path.append(str(src_dir / "preprocessing"))
-print("[DEBUG] Added to sys.path:", str(src_dir / "preprocessing"))
+sys.path.append(str(current_dir))
 
-from datasetLoader import load_data
+import mersenne
+import mersenne127
 
-DEFAULT_P = 2**61 - 1
+DEFAULT_P = mersenne.P
+
+# --- File-based preprocessing (mascot-party.x -F) ---
+# 2^127 - 1 leaves room for sfix(k=64) comparisons with 40 bits of
+# statistical security; compile with `-P <prime>` to match. Being a
+# Mersenne prime, it is dealt with the vectorized mersenne127 kernel.
+DEFAULT_PREP_PRIME = mersenne127.P
+PREP_LIMBS = 2  # MASCOT's gfp holds 2 x 64-bit limbs (128 bit) per element
+PREP_SAFETY = 1.1  # generate 10% more tuples than the compiler requires
+PREP_MIN_EXTRA = 1000
 
 
 def to_int_field(val, scale, p):
@@ -27,45 +40,46 @@ def to_int_field(val, scale, p):
 
 
 def write_matrix(path, matrix):
-    with open(path, "w") as f:
-        for row in matrix:
-            f.write(" ".join(str(x) for x in row) + "\n")
+    np.savetxt(path, matrix, fmt="%d", delimiter=" ")
 
 
 def create_output_dir(path):
     os.makedirs(path, exist_ok=True)
 
 
+def seeded_rng(seed=None):
+    """
+    None (OS CSPRNG) without a seed, otherwise a seeded NumPy generator
+    for reproducible tests and benchmarks; its output is predictable.
+    """
+    if seed is None:
+        return None
+    print(f"[WARN] Seeded PRNG (seed={seed}): shares and MAC keys are predictable, tests only")
+    return np.random.default_rng(seed)
+
+
 def generate_shares(df, out_dir, p, scale, seed=None):
-    if seed is not None:
-        random.seed(seed)
+    """
+    Secret-share a dataset in GF(p) with SPDZ-style MACs, vectorized.
+
+    For every value x: shares x0 + x1 = x, and MAC shares m0 + m1 = alpha * x
+    with the global MAC key alpha = alpha0 + alpha1 (all mod p).
+    Only the Mersenne prime 2^61 - 1 is supported (see mersenne.py).
+    """
+    if p != mersenne.P:
+        raise ValueError(f"Only the Mersenne prime 2^61 - 1 is supported, got p={p}")
+    rng = seeded_rng(seed)
 
     data = df.to_numpy(dtype=float)
     n_rows, n_cols = data.shape
     print(f"[INFO] Loaded dataset with {n_rows} rows and {n_cols} columns")
 
-    alpha = random.randrange(0, p)
-    alpha0 = random.randrange(0, p)
+    alpha = int(mersenne.random_elements((), rng))
+    alpha0 = int(mersenne.random_elements((), rng))
     alpha1 = (alpha - alpha0) % p
 
-    shares0 = np.zeros((n_rows, n_cols), dtype=int)
-    print("[DEBUG] first shares0 to check: \n", shares0[0:3])
-    shares1 = np.zeros((n_rows, n_cols), dtype=int)
-    mac0 = np.zeros((n_rows, n_cols), dtype=int)
-    mac1 = np.zeros((n_rows, n_cols), dtype=int)
-
-    for i in range(n_rows):
-        for j in range(n_cols):
-            val = to_int_field(data[i][j], scale, p)
-            share0 = random.randrange(0, p)
-            share1 = (val - share0) % p
-            shares0[i][j] = share0
-            shares1[i][j] = share1
-            mac0[i][j] = (share0 * alpha0) % p
-            mac1[i][j] = (share1 * alpha1) % p
-
-    print("[DEBUG] Sample shares0: \n", shares0[0:2])
-    print("[DEBUG] Sample shares1: \n", shares1[0:2])
+    values = mersenne.encode(data, scale)
+    shares0, shares1, mac0, mac1 = mersenne.share_with_macs(values, alpha, rng)
 
     create_output_dir(out_dir)
 
@@ -84,11 +98,256 @@ def generate_shares(df, out_dir, p, scale, seed=None):
     return alpha0, alpha1
 
 
+# ======================================================
+# Bulk preprocessing (Beaver triples, bits, squares, input masks)
+# ======================================================
+#
+# Layout read by MP-SPDZ with file-based preprocessing (-F), mirroring its
+# Fake-Offline tool, for n parties and a prime p of `bits` bits:
+#   Player-Data/<n>-p-<bits>/Params-Data                prime (decimal)
+#   Player-Data/<n>-p-<bits>/Player-MAC-Keys-p-P<i>     "<n>\n<alpha_i>"
+#   Player-Data/<n>-p-<bits>/Triples-p-P<i>             (a, b, c)
+#   Player-Data/<n>-p-<bits>/Squares-p-P<i>             (a, a^2)
+#   Player-Data/<n>-p-<bits>/Bits-p-P<i>                (b)
+#   Player-Data/<n>-p-<bits>/Inputs-p-P<i>-<j>          (r) [+ clear r if i == j]
+# Every binary file starts with the signature of the share type (see
+# file_signature); each share is (value share, MAC share) and every field
+# element is stored in Montgomery form (x * 2^128 mod p) as PREP_LIMBS
+# little-endian 64-bit limbs.
+
+
+class DealerField:
+    """
+    Bulk arithmetic in GF(p) for the dealer: the vectorized Mersenne
+    kernels for p = 2^61 - 1 (mersenne, uint64 elements) and p = 2^127 - 1
+    (mersenne127, pairs of uint64 words), Python integers in NumPy object
+    arrays for any other prime (several times slower).
+    Randomness comes from the OS CSPRNG; a seeded 'rng' makes every MAC key
+    and tuple predictable and is only meant for tests and benchmarks.
+    """
+
+    def __init__(self, p: int, rng: np.random.Generator = None):
+        self.p = p
+        self.rng = rng
+        self.kernel = {mersenne.P: mersenne, mersenne127.P: mersenne127}.get(p)
+        self.fast = self.kernel is not None
+        self.montgomery_r = pow(2, 64 * PREP_LIMBS, p)
+
+    def random(self, n: int):
+        if self.fast:
+            return self.kernel.random_elements(n, self.rng)
+        # p.bit_length() + 40 random bits, reduced mod p (bias < 2^-40)
+        n_limbs = (self.p.bit_length() + 40 + 63) // 64
+        if self.rng is None:
+            limbs = mersenne.random_words((n_limbs, n))
+        else:
+            limbs = self.rng.integers(0, 2**64, size=(n_limbs, n), dtype=np.uint64, endpoint=False)
+        values = np.zeros(n, dtype=object)
+        for limb in limbs:
+            values = (values << 64) | limb.astype(object)
+        return values % self.p
+
+    def random_bits(self, n: int):
+        if self.rng is None:
+            bits = mersenne.random_words(n) & np.uint64(1)
+        else:
+            bits = self.rng.integers(0, 2, size=n, dtype=np.uint64)
+        if self.kernel is mersenne127:
+            return mersenne127.words(bits, np.uint64(0))
+        return bits if self.fast else bits.astype(object)
+
+    def constant(self, x: int):
+        """A public constant in the representation of the elements."""
+        if self.kernel is mersenne127:
+            return mersenne127.from_int(x)
+        return np.uint64(x % self.p) if self.fast else x % self.p
+
+    def to_ints(self, values) -> list:
+        if self.kernel is mersenne127:
+            return mersenne127.to_ints(values)
+        return [int(x) for x in values]
+
+    def add(self, a, b):
+        return self.kernel.add(a, b) if self.fast else (a + b) % self.p
+
+    def sub(self, a, b):
+        return self.kernel.sub(a, b) if self.fast else (a - b) % self.p
+
+    def mul(self, a, b):
+        return self.kernel.mul(a, b) if self.fast else (a * b) % self.p
+
+    def to_bytes(self, columns):
+        """
+        Serialize equally long columns of field elements row by row
+        (row k = columns[0][k], columns[1][k], ...) in Montgomery form.
+        """
+        n_rows = len(columns[0])
+        if self.kernel is mersenne127:
+            # 2^128 ≡ 2 (mod 2^127 - 1): the Montgomery form is 2x
+            montgomery = [mersenne127.add(c, c) for c in columns]
+            return np.stack(montgomery, axis=1).astype("<u8").tobytes()
+        if self.fast:
+            limbs = np.zeros((n_rows, len(columns), PREP_LIMBS), dtype="<u8")
+            for j, column in enumerate(columns):
+                limbs[:, j, 0] = mersenne.mul(column, np.uint64(self.montgomery_r))
+            return limbs.tobytes()
+        size = 8 * PREP_LIMBS
+        interleaved = np.stack([(c * self.montgomery_r) % self.p for c in columns], axis=1)
+        return b"".join(int(x).to_bytes(size, "little") for x in interleaved.ravel())
+
+
+def file_signature(p: int) -> bytes:
+    """
+    Header of a preprocessing file, following MP-SPDZ's file_signature<T>():
+    an 8-byte little-endian length, then the share type string and the
+    prime (sign byte, 4-byte big-endian length, big-endian magnitude).
+    MP-SPDZ refuses files whose signature does not match its own.
+    """
+    prime = p.to_bytes((p.bit_length() + 7) // 8, "big")
+    body = b"SPDZ gfp" + b"\0" + struct.pack(">I", len(prime)) + prime
+    return struct.pack("<Q", len(body)) + body
+
+
+def prep_dir(player_data, n_parties: int, p: int) -> Path:
+    """Player-Data/<n>-p-<bits>, the directory read by -F."""
+    return Path(player_data) / f"{n_parties}-p-{p.bit_length()}"
+
+
+def share_with_macs_n(field: DealerField, values, alphas):
+    """
+    Additive n-party sharing of 'values' plus MAC shares of alpha * values.
+
+    Returns:
+        list over parties of (value shares, MAC shares)
+    """
+    n_parties = len(alphas)
+    alpha = sum(alphas) % field.p
+    macs = field.mul(values, field.constant(alpha))
+    shares, mac_shares = [], []
+    for _ in range(n_parties - 1):
+        shares.append(field.random(len(values)))
+        mac_shares.append(field.random(len(values)))
+    last_share, last_mac = values, macs
+    for share, mac in zip(shares, mac_shares):
+        last_share = field.sub(last_share, share)
+        last_mac = field.sub(last_mac, mac)
+    shares.append(last_share)
+    mac_shares.append(last_mac)
+    return list(zip(shares, mac_shares))
+
+
+def tuple_counts(requirements: dict, n_parties: int = 2) -> dict:
+    """
+    Map the compiler's requirements ({"integer triples": n, ...}) to tuple
+    counts with a safety margin. edaBits cannot be dealt here; compile
+    with the program argument 'no_edabit' for dealer runs.
+    """
+    def sized(n):
+        return int(max(n * PREP_SAFETY, n + PREP_MIN_EXTRA)) if n else 0
+
+    counts = {"triples": 0, "squares": 0, "bits": 0, "inputs": [0] * n_parties}
+    for name, n in requirements.items():
+        name = name.lower()
+        match = re.search(r"inputs from player (\d+)", name)
+        if match and int(match.group(1)) < n_parties:
+            counts["inputs"][int(match.group(1))] += sized(n)
+        elif "triples" in name:
+            counts["triples"] += sized(n)
+        elif "squares" in name:
+            counts["squares"] += sized(n)
+        elif name.endswith("bits") and "edabit" not in name and "dabit" not in name:
+            counts["bits"] += sized(n)
+        elif "edabit" in name or "dabit" in name:
+            print(f"[WARN] dealer cannot produce '{name}' ({n}); compile with 'no_edabit'")
+    return counts
+
+
+def generate_preprocessing(
+    player_data, counts: dict, n_parties: int = 2, p: int = DEFAULT_PREP_PRIME, seed=None
+):
+    """
+    Deal Beaver triples, squares, random bits and input masks in bulk and
+    write them in MP-SPDZ's file-based preprocessing layout.
+
+    Parameters:
+        player_data : path of the Player-Data directory of the run
+        counts : {"triples": n, "squares": n, "bits": n, "inputs": [n_p0, n_p1, ...]}
+        n_parties : number of parties
+        p : prime modulus (must match the compiled program and the parties)
+        seed : seeded PRNG for tests and benchmarks (default: OS CSPRNG, see seeded_rng)
+
+    Returns:
+        dict: number of tuples per kind, elapsed seconds and tuples/second
+    """
+    field = DealerField(p, seeded_rng(seed))
+    out_dir = prep_dir(player_data, n_parties, p)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    signature = file_signature(p)
+
+    t0 = time.perf_counter()
+    alphas = field.to_ints(field.random(n_parties))
+    (out_dir / "Params-Data").write_text(f"{p}\n")
+    for i, alpha_i in enumerate(alphas):
+        (out_dir / f"Player-MAC-Keys-p-P{i}").write_text(f"{n_parties}\n{alpha_i}\n")
+
+    def write_tuples(name, clear_columns):
+        shared = [share_with_macs_n(field, column, alphas) for column in clear_columns]
+        for i in range(n_parties):
+            columns = [c for per_party in shared for c in per_party[i]]
+            with open(out_dir / f"{name}-p-P{i}", "wb") as f:
+                f.write(signature)
+                f.write(field.to_bytes(columns))
+
+    n_triples = counts.get("triples", 0)
+    if n_triples:
+        a, b = field.random(n_triples), field.random(n_triples)
+        write_tuples("Triples", [a, b, field.mul(a, b)])
+
+    n_squares = counts.get("squares", 0)
+    if n_squares:
+        a = field.random(n_squares)
+        write_tuples("Squares", [a, field.mul(a, a)])
+
+    n_bits = counts.get("bits", 0)
+    if n_bits:
+        write_tuples("Bits", [field.random_bits(n_bits)])
+
+    inputs = counts.get("inputs", [])
+    for owner, n_inputs in enumerate(inputs):
+        if not n_inputs:
+            continue
+        masks = field.random(n_inputs)
+        shared = share_with_macs_n(field, masks, alphas)
+        for i in range(n_parties):
+            columns = list(shared[i]) + ([masks] if i == owner else [])
+            with open(out_dir / f"Inputs-p-P{i}-{owner}", "wb") as f:
+                f.write(signature)
+                f.write(field.to_bytes(columns))
+
+    elapsed = time.perf_counter() - t0
+    n_total = n_triples + n_squares + n_bits + sum(inputs)
+    stats = {
+        "triples": n_triples,
+        "squares": n_squares,
+        "bits": n_bits,
+        "inputs": list(inputs),
+        "seconds": elapsed,
+        "tuples_per_s": n_total / elapsed if elapsed > 0 else float("inf"),
+    }
+    print(
+        f"[DEALER] {n_total} tuples ({n_triples} triples, {n_squares} squares, "
+        f"{n_bits} bits, {sum(inputs)} inputs) in {elapsed:.3f} s "
+        f"-> {stats['tuples_per_s']:.0f} tuples/s into {out_dir}"
+    )
+    return stats
+
+
 def main():
     parser = argparse.ArgumentParser(
-        description="Secret-share a dataset for MPC (MASCOT-compatible)."
+        description="Secret-share a dataset for MPC (MASCOT-compatible) "
+        "and/or deal preprocessing tuples for file-based preprocessing."
     )
-    parser.add_argument("--dataset", required=True, help="Dataset name (without .csv)")
+    parser.add_argument("--dataset", help="Dataset name (without .csv)")
     parser.add_argument(
         "--out", default="../../Player-Data", help="Output folder for Player-Data"
     )
@@ -96,21 +355,45 @@ def main():
     parser.add_argument(
         "--scale", type=int, default=1, help="Fixed-point scaling factor"
     )
-    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--seed", type=int, default=None,
+        help="Seed a predictable PRNG instead of the OS CSPRNG (tests and benchmarks only)",
+    )
+    parser.add_argument(
+        "--requirements",
+        help="Compile cache entry (or compile.log) to size preprocessing tuples from",
+    )
+    parser.add_argument(
+        "--prep-prime", type=int, default=DEFAULT_PREP_PRIME,
+        help="Prime for dealt preprocessing (must match compile.py -P)",
+    )
+    parser.add_argument("--parties", type=int, default=2, help="Number of parties")
     args = parser.parse_args()
 
-    data_path = root_dir / "data" / f"{args.dataset}.csv"
-    out_dir = root_dir / "third_party" / "MP-SPDZ" / "Player-Data"
+    if args.dataset:
+        from datasetLoader import find_dataset, load_data
 
-    print(f"[INFO] Loading dataset from {data_path}")
-    df = load_data(args.dataset)
+        data_path = find_dataset(args.dataset)
+        print(f"[INFO] Loading dataset from {data_path}")
+        df = load_data(data_path)
 
-    alpha0, alpha1 = generate_shares(
-        df, args.out, p=args.p, scale=args.scale, seed=args.seed
-    )
+        alpha0, alpha1 = generate_shares(
+            df, args.out, p=args.p, scale=args.scale, seed=args.seed
+        )
+
+        print(f"[SUCCESS] Generated shares for dataset '{args.dataset}'.")
+        print(f"[MAC KEYS] alpha0={alpha0}, alpha1={alpha1}")
+
+    if args.requirements:
+        sys.path.append(str(src_dir))
+        from compile_cache import parse_requirements
 
-    print(f"[SUCCESS] Generated shares for dataset '{args.dataset}'.")
-    print(f"[MAC KEYS] alpha0={alpha0}, alpha1={alpha1}")
+        log = Path(args.requirements)
+        if log.is_dir():
+            log = log / "compile.log"
+        counts = tuple_counts(parse_requirements(log.read_text()), args.parties)
+        print(f"[DEALER] Tuple counts: {json.dumps(counts)}")
+        generate_preprocessing(args.out, counts, args.parties, args.prep_prime, args.seed)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# ======================================================
+# Userspace WAN emulation between MPC parties
+# ======================================================
+#
+# Every party gets a relay port that forwards to its real listening port.
+# Each party's hosts file (-ip) lists itself at its real port and every
+# other party at that party's relay port, so all party-to-party TCP
+# connections pass through a relay, whichever side connects.
+#
+# The relay shapes each direction of the link between two parties:
+#   - bandwidth: chunks are serialized at 'bandwidth_mbps' (FIFO per link),
+#   - latency: each chunk is delivered rtt/2 (+ jitter) after it was sent,
+#     without reordering.
+# No root rights or qdiscs are needed; the relay runs in its own thread.
+
+CHUNK_BYTES = 1 << 16  # largest piece read and delayed at once
+QUEUE_CHUNKS = 256  # chunks in flight per connection direction (backpressure)
+CONNECT_TIMEOUT_S = 60.0  # the target party may start listening later
+
+
+@dataclass(frozen=True)
+class NetworkProfile:
+    """Round-trip time (ms), bandwidth per direction (Mbit/s, None: unlimited) and jitter (ms)."""
+
+    name: str
+    rtt_ms: float = 0.0
+    bandwidth_mbps: Optional[float] = None
+    jitter_ms: float = 0.0
+
+    @property
+    def direct(self) -> bool:
+        """True if the profile needs no relay (plain localhost)."""
+        return not self.rtt_ms and not self.bandwidth_mbps and not self.jitter_ms
+
+
+PROFILES = {
+    "lan": NetworkProfile("lan"),
+    "wan10": NetworkProfile("wan10", rtt_ms=10, bandwidth_mbps=1000),
+    "wan50": NetworkProfile("wan50", rtt_ms=50, bandwidth_mbps=100),
+}
+
+
+class Link:
+    """One direction between two parties: serialization plus propagation delay."""
+
+    def __init__(self, profile: NetworkProfile, rng: random.Random):
+        self.profile = profile
+        self.rng = rng
+        self.free_at = 0.0  # when the link finished sending everything queued so far
+        self.last_delivery = 0.0
+        self.bytes = 0
+
+    def schedule(self, n_bytes: int, now: float) -> float:
+        """Delivery time of a chunk of n_bytes sent at 'now'."""
+        self.bytes += n_bytes
+        start = max(now, self.free_at)
+        if self.profile.bandwidth_mbps:
+            start += n_bytes * 8 / (self.profile.bandwidth_mbps * 1e6)
+        self.free_at = start
+        delay = self.profile.rtt_ms / 2000
+        if self.profile.jitter_ms:
+            delay = max(0.0, delay + self.rng.gauss(0.0, self.profile.jitter_ms / 1000))
+        self.last_delivery = max(start + delay, self.last_delivery)  # keep order
+        return self.last_delivery
+
+
+async def _pipe(reader, writer, link: Link):
+    """Forward reader -> writer, delivering every chunk at its scheduled time."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=QUEUE_CHUNKS)
+
+    async def receive():
+        while True:
+            data = await reader.read(CHUNK_BYTES)
+            await queue.put((link.schedule(len(data), loop.time()), data))
+            if not data:
+                return
+
+    async def deliver():
+        while True:
+            at, data = await queue.get()
+            delay = at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if not data:
+                if writer.can_write_eof():
+                    writer.write_eof()
+                return
+            writer.write(data)
+            await writer.drain()
+
+    try:
+        await asyncio.gather(receive(), deliver())
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _connect(host: str, port: int, timeout: float = CONNECT_TIMEOUT_S):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return await asyncio.open_connection(host, port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def _nodelay(writer):
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class NetemProxy:
+    """
+    Relays for 'n_parties' parties on one host. Party i listens on
+    party_ports[i]; its relay listens on relay_ports[i].
+
+    Usage:
+        with NetemProxy(profile, party_ports, relay_ports):
+            ... run the parties with hosts_files(...) ...
+    """
+
+    def __init__(self, profile: NetworkProfile, party_ports, relay_ports, host: str = "127.0.0.1", seed=None):
+        self.profile = profile
+        self.party_ports = list(party_ports)
+        self.relay_ports = list(relay_ports)
+        self.host = host
+        rng = random.Random(seed)
+        self.links = {}  # (from, to) -> Link
+        for j in range(len(self.party_ports)):
+            peer = self._peer(j)
+            for key in ((peer, j), (j, peer)):
+                self.links.setdefault(key, Link(profile, rng))
+        self._loop = None
+        self._thread = None
+        self._servers = []
+
+    def _peer(self, j: int):
+        """
+        Other end of connections arriving at party j's relay. With two
+        parties it is known, so both relays share the two real directions;
+        otherwise each relay gets links of its own.
+        """
+        return 1 - j if len(self.party_ports) == 2 else f"*{j}"
+
+    async def _handle(self, j: int, client_reader, client_writer):
+        try:
+            target_reader, target_writer = await _connect(self.host, self.party_ports[j])
+        except OSError:
+            client_writer.close()
+            return
+        _nodelay(client_writer)
+        _nodelay(target_writer)
+        peer = self._peer(j)
+        try:
+            await asyncio.gather(
+                _pipe(client_reader, target_writer, self.links[(peer, j)]),
+                _pipe(target_reader, client_writer, self.links[(j, peer)]),
+            )
+        except asyncio.CancelledError:  # proxy stopped with the connection open
+            client_writer.close()
+            target_writer.close()
+
+    async def _start_servers(self):
+        for j, port in enumerate(self.relay_ports):
+            server = await asyncio.start_server(
+                lambda r, w, j=j: self._handle(j, r, w), self.host, port, reuse_address=True
+            )
+            self._servers.append(server)
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_servers(), self._loop).result()
+        return self
+
+    def stop(self):
+        async def close():
+            for server in self._servers:
+                server.close()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def hosts_files(self, directory: Path, prefix: str = "hosts-P"):
+        """
+        Write one MP-SPDZ hosts file (-ip) per party: itself at its real
+        port, every other party at that party's relay port.
+
+        Returns:
+            list of paths, one per party
+        """
+        files = []
+        for i in range(len(self.party_ports)):
+            lines = [
+                f"{self.host}:{self.party_ports[j] if j == i else self.relay_ports[j]}"
+                for j in range(len(self.party_ports))
+            ]
+            path = Path(directory) / f"{prefix}{i}"
+            path.write_text("\n".join(lines) + "\n")
+            files.append(path)
+        return files
+
+
+# ======================================================
+# Main script
+# ======================================================
+
+if __name__ == "__main__":
+    # Standalone relays, e.g. for parties started by hand:
+    #   python src/netem_proxy.py --profile wan50 --party-ports 17540 17541 --relay-ports 17542 17543
+    parser = argparse.ArgumentParser(description="Shape traffic between MPC parties.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="wan10")
+    parser.add_argument("--rtt-ms", type=float, help="Override the profile's round-trip time")
+    parser.add_argument("--bandwidth-mbps", type=float, help="Override the profile's bandwidth")
+    parser.add_argument("--jitter-ms", type=float, help="Override the profile's jitter")
+    parser.add_argument("--party-ports", type=int, nargs="+", required=True)
+    parser.add_argument("--relay-ports", type=int, nargs="+", required=True)
+    parser.add_argument("--hosts-dir", type=Path, help="Write hosts-P<i> files here")
+    args = parser.parse_args()
+
+    base = PROFILES[args.profile]
+    profile = NetworkProfile(
+        base.name,
+        base.rtt_ms if args.rtt_ms is None else args.rtt_ms,
+        base.bandwidth_mbps if args.bandwidth_mbps is None else args.bandwidth_mbps,
+        base.jitter_ms if args.jitter_ms is None else args.jitter_ms,
+    )
+    with NetemProxy(profile, args.party_ports, args.relay_ports) as proxy:
+        if args.hosts_dir:
+            print(f"[NET] Hosts files: {[str(p) for p in proxy.hosts_files(args.hosts_dir)]}")
+        print(f"[NET] Relaying {args.relay_ports} -> {args.party_ports} with {profile}; Ctrl-C to stop")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
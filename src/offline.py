@@ -1,27 +1,61 @@
-import pandas as pd
-import sys, os
+import os
+import argparse
+import math
+import struct
+import json
+import hashlib
 from pathlib import Path
 import secrets
-from sklearn.model_selection import train_test_split
 import numpy as np
 
+from preprocessing.datasetLoader import find_dataset, load_array, load_data, source_sha256
+
+# Datasets are read through preprocessing/datasetLoader.py (find_dataset,
+# load_array): CSVs are parsed once into memory-mapped float64 arrays.
+# pandas is only imported where CSVs are parsed (first conversion, appended
+# rows): a cache hit never needs it, and callers that import this module
+# (main.py) do not pay for it up front
+
 # ===========================================================
 # Global constants
 # ===========================================================
 
-DEFAULT_SCALE = 2**16 # fixed-point scaling factor for features
+DEFAULT_SCALE = 2**16 # fixed-point scaling factor for features (2^f of sfix)
+DEFAULT_K = 64 # sfix bit length the shares are meant for (k of sfix)
 RING_P = 2**64 # ring for additive shares, must match MP-SPDZ ring
 DEFAULT_TEST_SIZE = 0.2 # default fraction of samples for test set
 OUTPUT_DIR = "Player-Data" # MP-SPDZ input directory
 DEFAULT_BATCH_SIZE = 1 # not used here, but relevant for MPC training
 
+# Share file formats: decimal text (compatible) or raw little-endian int64
+SHARE_FORMATS = ("text", "binary")
+DEFAULT_SHARE_FORMAT = "text"
+BINARY_SUFFIX = ".bin"
+BINARY_MAGIC = b"MPCSHR01"
+BINARY_DTYPE = "<i8"
+# header: magic, rows, cols, scale, dtype string; padded to BINARY_HEADER_SIZE
+BINARY_HEADER = struct.Struct("<8sQQQ8s")
+BINARY_HEADER_SIZE = 64
+
+DEFAULT_CHUNK_ROWS = 10_000 # rows per chunk in streaming mode
+
+# Share domains (see backends.py): "ring" shares are uniform in Z_{2^64},
+# "field" shares are integers with statistical masks below 2^FIELD_MASK_BITS
+# whose plain sum is x (for prime-field protocols such as MASCOT)
+SHARE_DOMAINS = ("ring", "field")
+DEFAULT_DOMAIN = "ring"
+DEFAULT_N_PARTIES = 2
+FIELD_MASK_BITS = 60
+FIELD_SECURITY_BITS = 40 # statistical security of the masks, so only |x| < 2^20 is hidden
+SHARE_CACHE_FILE = "share_cache.json" # state of the shares in an output directory
+
 
 
 # ===========================================================
 # Helper functions
 # ===========================================================
 
-def create_metafile(n_rows_train, n_cols, n_rows_test):
+def create_metafile(n_rows_train, n_cols, n_rows_test, extra=None, output_dir=OUTPUT_DIR):
     """
     Create metadata.txt for MP-SPDZ training script.
 
@@ -31,14 +65,20 @@ def create_metafile(n_rows_train, n_cols, n_rows_test):
         3: number of test rows
         4: batch size (default: 8, can be overwritten later)
         5: number of epochs (default: 2, can be overwritten later)
+        6+: optional 'key=value' settings from 'extra' (e.g. share_format,
+            scale and k, from which thesis.mpc sets the sfix precision)
+
+    The file is written to 'output_dir' (Player-Data or a namespace in it).
     """
-    metafile_path = os.path.join(OUTPUT_DIR, "metadata.txt")
+    metafile_path = os.path.join(output_dir, "metadata.txt")
     with open(metafile_path, "w") as meta_f:
         meta_f.write(f"{n_rows_train}\n")      # number of train data rows
         meta_f.write(f"{n_cols-1}\n")          # number of features
         meta_f.write(f"{n_rows_test}\n")       # number of test data rows
         meta_f.write("8\n")                    # default batch size
         meta_f.write("2\n")                    # default n_epoch
+        for key, value in (extra or {}).items():
+            meta_f.write(f"{key}={value}\n")
 
     print(
         f"[create_metafile] n_rows_train={n_rows_train}, "
@@ -46,44 +86,32 @@ def create_metafile(n_rows_train, n_cols, n_rows_test):
     )
 
 
-def load_data(name):
-     """
-    Load a CSV dataset from <project_root>/data_small/{name}.csv and cast to float.
-
-    The function:
-    - walks up the directory tree starting from this script
-    - finds the first folder that contains 'data_small'
-    - loads {name}.csv from that folder
-
-    Raises:
-        RuntimeError: if the project root with 'data_small' cannot be found
-        FileNotFoundError: if the CSV does not exist
+def count_rows(path):
+    """
+    Count the data rows of a CSV file without loading it
+    (reads fixed-size blocks, memory use is independent of file size).
     """
 
-    script_path = Path(__file__).resolve()
-    current = script_path.parent
-    root = None
+    n_rows, last = 0, b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            n_rows += block.count(b"\n")
+            last = block[-1:]
+    # last line without trailing newline
+    return n_rows + (last != b"\n")
 
-    # --- Walk up to find project root containing 'data_small' ---
-    while current != current.root:
-        if (current / "data_small").exists():
-            root = current
-            break
-        current = current.parent
 
-    if root is None:
-        raise RuntimeError(
-            f"Could not locate project root from script: {script_path}\n"
-            f"Walked parents: {list(script_path.parents)}"
-        )
+def split_sizes(n_rows, test_size: float = DEFAULT_TEST_SIZE):
+    """
+    Train/test sizes of an unshuffled split, matching sklearn's
+    train_test_split for a fractional test_size.
 
-    data_path = root / "data_small" / f"{name}.csv"
-    if not data_path.exists():
-        raise FileNotFoundError(f"Dataset not found: {data_path}\n")
+    Returns:
+        tuple[int, int]: (n_train, n_test)
+    """
 
-    # --- Load CSV into DataFrame ---
-    df = pd.read_csv(data_path, header=None).astype(float)
-    return df
+    n_test = math.ceil(test_size * n_rows)
+    return n_rows - n_test, n_test
 
 
 def additive_shares(x):
@@ -102,7 +130,7 @@ def additive_shares(x):
 
 
 def to_signed_64(x: int) -> int:
-     """
+    """
     Map an unsigned 64-bit value in [0, 2^64) to a signed 64-bit integer
     using two's complement representation.
     """
@@ -113,11 +141,277 @@ def to_signed_64(x: int) -> int:
         return x
 
 
-def save_shares(filename_p0, filename_p1, data, scale: int = DEFAULT_SCALE):
-     """
+def encode_fixed_point(data, scale: int = DEFAULT_SCALE):
+    """
+    Encode a labeled matrix to integers in one vectorized pass.
+
+    Feature columns are scaled by 'scale' and rounded half-to-even (same as
+    Python's round()), the last column is the label and truncated to int.
+
+    Returns:
+        np.ndarray: int64 matrix with the same shape as 'data'
+    """
+
+    values = np.asarray(data, dtype=np.float64)
+    encoded = np.empty(values.shape, dtype=np.int64)
+    encoded[:, :-1] = np.rint(values[:, :-1] * scale)
+    encoded[:, -1] = np.trunc(values[:, -1])
+    return encoded
+
+
+def random_ring_elements(shape):
+    """
+    Draw uniform elements of Z_{2^64} from one bulk CSPRNG buffer.
+
+    Returns:
+        np.ndarray: uint64 array of the given shape
+    """
+
+    n_values = int(np.prod(shape))
+    buffer = secrets.token_bytes(8 * n_values)
+    return np.frombuffer(buffer, dtype="<u8").astype(np.uint64, copy=False).reshape(shape)
+
+
+def share_matrix(
+    data,
+    scale: int = DEFAULT_SCALE,
+    n_parties: int = DEFAULT_N_PARTIES,
+    domain: str = DEFAULT_DOMAIN,
+):
+    """
+    Secret-share a labeled matrix without per-element Python code.
+
+    In the ring domain s0 is uniform in Z_{2^64}, s1 = x - s0 computed with
+    wraparound uint64 arithmetic, and both are reinterpreted as signed 64-bit
+    (two's complement) for MP-SPDZ. This is the vectorized equivalent of
+    additive_shares() and to_signed_64() applied to every cell. See
+    share_encoded for more parties and the field domain.
+
+    Returns:
+        tuple[np.ndarray, ...]: int64 share matrices (p0, p1, ...)
+    """
+
+    return share_encoded(encode_fixed_point(data, scale), n_parties, domain)
+
+
+def share_encoded(encoded, n_parties: int = DEFAULT_N_PARTIES, domain: str = DEFAULT_DOMAIN):
+    """
+    Secret-share an already encoded int64 matrix (e.g. unlabeled query rows)
+    into 'n_parties' additive shares.
+
+    ring:  n - 1 shares uniform in Z_{2^64}, the last one x minus their sum
+           modulo 2^64.
+    field: n - 1 shares uniform in [-2^FIELD_MASK_BITS, 2^FIELD_MASK_BITS),
+           the last one x minus their sum over the integers; the shares fit
+           int64 and sum to x in any prime field larger than 2^64. The
+           masks only hide |x| < 2^(FIELD_MASK_BITS - FIELD_SECURITY_BITS);
+           larger values raise ValueError.
+
+    Returns:
+        tuple[np.ndarray, ...]: int64 share matrices (p0, p1, ...)
+    """
+
+    encoded = np.asarray(encoded, dtype=np.int64)
+    if domain == "ring":
+        shares = [random_ring_elements(encoded.shape) for _ in range(n_parties - 1)]
+        last = encoded.view(np.uint64) - sum(shares, np.zeros(encoded.shape, dtype=np.uint64))
+        return tuple(share.view(np.int64) for share in shares + [last])  # wraps modulo 2^64
+    if domain == "field":
+        max_abs = int(np.abs(encoded).max()) if encoded.size else 0
+        if max_abs >= 2 ** (FIELD_MASK_BITS - FIELD_SECURITY_BITS):
+            raise ValueError(
+                f"Encoded value {max_abs} needs {max_abs.bit_length()} bits, the field masks "
+                f"only hide {FIELD_MASK_BITS - FIELD_SECURITY_BITS} bits with "
+                f"{FIELD_SECURITY_BITS}-bit statistical security; normalize the features "
+                f"or use a smaller scale"
+            )
+        shift = np.uint64(64 - FIELD_MASK_BITS - 1)
+        offset = np.int64(1) << np.int64(FIELD_MASK_BITS)
+        shares = [
+            (random_ring_elements(encoded.shape) >> shift).view(np.int64) - offset
+            for _ in range(n_parties - 1)
+        ]
+        return tuple(shares) + (encoded - sum(shares, np.zeros(encoded.shape, dtype=np.int64)),)
+    raise ValueError(f"Unknown share domain: {domain}")
+
+
+def write_share_text(file, shares):
+    """
+    Write an int64 share matrix as space-separated decimal text,
+    one row per line and without trailing newline on the last line.
+    """
+
+    file.write("\n".join(" ".join(map(str, row)) for row in shares.tolist()))
+
+
+def pack_share_header(n_rows, n_cols, scale: int = DEFAULT_SCALE):
+    """
+    Build the BINARY_HEADER_SIZE bytes header of a binary share file.
+    """
+
+    header = BINARY_HEADER.pack(
+        BINARY_MAGIC, n_rows, n_cols, scale, BINARY_DTYPE.encode()
+    )
+    return header.ljust(BINARY_HEADER_SIZE, b"\0")
+
+
+def write_share_binary(file, shares, scale: int = DEFAULT_SCALE):
+    """
+    Write an int64 share matrix as raw little-endian int64 with a small header.
+
+    Layout:
+        bytes [0, 64)  : magic, rows, cols, scale, dtype (see BINARY_HEADER)
+        bytes [64, ...): rows * cols values in row-major order
+    """
+
+    n_rows, n_cols = shares.shape
+    file.write(pack_share_header(n_rows, n_cols, scale))
+    file.write(np.ascontiguousarray(shares, dtype=BINARY_DTYPE).tobytes())
+
+
+def read_share_header(path):
+    """
+    Read the header of a binary share file.
+
+    Returns:
+        tuple[int, int, int, str]: (rows, cols, scale, dtype)
+
+    Raises:
+        ValueError: if the file does not start with BINARY_MAGIC
+    """
+
+    with open(path, "rb") as f:
+        header = f.read(BINARY_HEADER.size)
+    magic, n_rows, n_cols, scale, dtype = BINARY_HEADER.unpack(header)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"Not a binary share file: {path}")
+    return n_rows, n_cols, scale, dtype.rstrip(b"\0").decode()
+
+
+def load_share_binary(path):
+    """
+    Open a binary share file as a read-only memory-mapped int64 matrix.
+    """
+
+    n_rows, n_cols, _, dtype = read_share_header(path)
+    return np.memmap(
+        path, dtype=dtype, mode="r", offset=BINARY_HEADER_SIZE, shape=(n_rows, n_cols)
+    )
+
+
+def share_filename(
+    party: int, part: int, share_format: str = DEFAULT_SHARE_FORMAT, output_dir=OUTPUT_DIR
+):
+    """
+    Path of the share file of 'party' for 'part' (0 = train, 1 = test)
+    in 'output_dir'. Binary files get BINARY_SUFFIX so they never shadow
+    the text files.
+    """
+
+    name = f"Input-P{party}-{part}"
+    if share_format == "binary":
+        name += BINARY_SUFFIX
+    return os.path.join(output_dir, name)
+
+
+def party_filenames(
+    part: int, n_parties: int = DEFAULT_N_PARTIES, share_format: str = DEFAULT_SHARE_FORMAT,
+    output_dir=OUTPUT_DIR,
+):
+    """Share files of all parties for 'part' (0 = train, 1 = test)."""
+
+    return [share_filename(p, part, share_format, output_dir) for p in range(n_parties)]
+
+
+class ShareWriter:
+    """
+    Append secret-shared row blocks to the party files of one split
+    (one file per party, see share_filename).
+
+    Rows are shared with share_matrix in 'domain' and written in the selected format.
+    Binary files get a placeholder header that is patched with the final
+    row count on close(), so chunks can be appended without knowing the
+    total size in advance. With resume=True existing files are extended
+    instead of truncated.
+    """
+
+    def __init__(
+        self,
+        filenames,
+        scale: int = DEFAULT_SCALE,
+        share_format: str = DEFAULT_SHARE_FORMAT,
+        resume: bool = False,
+        domain: str = DEFAULT_DOMAIN,
+    ):
+        self.scale = scale
+        self.domain = domain
+        self.binary = share_format == "binary"
+        self.n_rows = 0
+        self.n_cols = 0
+
+        if resume and self.binary:
+            self.n_rows, self.n_cols, _, _ = read_share_header(filenames[0])
+            self.files = [open(filename, "r+b") for filename in filenames]
+            for f in self.files:
+                f.seek(0, os.SEEK_END)
+        elif resume:
+            self.n_rows = count_rows(filenames[0]) if os.path.getsize(filenames[0]) else 0
+            self.files = [open(filename, "a") for filename in filenames]
+        else:
+            mode = "wb" if self.binary else "w"
+            self.files = [open(filename, mode) for filename in filenames]
+            if self.binary:
+                for f in self.files:
+                    f.write(pack_share_header(0, 0, scale))
+
+    def append(self, data):
+        """Secret-share 'data' (features + label column) and append it."""
+        if len(data) == 0:
+            return
+        self.append_shares(*share_matrix(data, self.scale, len(self.files), self.domain))
+
+    def append_shares(self, *shares):
+        """Append rows that are already secret-shared (one int64 matrix per party)."""
+        if len(shares[0]) == 0:
+            return
+
+        for f, party_shares in zip(self.files, shares):
+            if self.binary:
+                f.write(np.ascontiguousarray(party_shares, dtype=BINARY_DTYPE).tobytes())
+            else:
+                # separate from previous block, no trailing newline on last line
+                if self.n_rows:
+                    f.write("\n")
+                write_share_text(f, party_shares)
+
+        self.n_rows += shares[0].shape[0]
+        self.n_cols = shares[0].shape[1]
+
+    def close(self):
+        for f in self.files:
+            if self.binary:
+                f.seek(0)
+                f.write(pack_share_header(self.n_rows, self.n_cols, self.scale))
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_shares(
+    filename_p0,
+    filename_p1,
+    data,
+    scale: int = DEFAULT_SCALE,
+    share_format: str = DEFAULT_SHARE_FORMAT,
+):
+    """
     Secret-share a labeled dataset and write shares to two MP-SPDZ input files.
 
-    For each row:
+    For the whole matrix at once (see share_matrix):
         - all feature columns are scaled by 'scale' and rounded to int
         - the last column is treated as label and kept as int (e.g., 0/1)
         - each value is split into two additive shares in Z_{2^64}
@@ -132,104 +426,413 @@ def save_shares(filename_p0, filename_p1, data, scale: int = DEFAULT_SCALE):
             Data with features in all columns except last, label in last column.
         scale : int
             Fixed-point scaling factor for feature values.
+        share_format : str
+            "text" (space-separated decimal) or "binary" (see write_share_binary).
+    """
+
+    with ShareWriter([filename_p0, filename_p1], scale, share_format) as writer:
+        writer.append(data)
+
+
+def stream_shares(
+    data_path,
+    scale: int = DEFAULT_SCALE,
+    test_size: float = DEFAULT_TEST_SIZE,
+    share_format: str = DEFAULT_SHARE_FORMAT,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    output_dir=OUTPUT_DIR,
+    n_parties: int = DEFAULT_N_PARTIES,
+    domain: str = DEFAULT_DOMAIN,
+):
     """
+    Secret-share a CSV in fixed-size chunks with bounded memory.
 
-    with open(filename_p0, "w") as f0, open(filename_p1, "w") as f1:
-        n_rows, n_cols = data.shape
-        for i in range(n_rows):
-            row_p0, row_p1 = [], []
-            for j in range(n_cols):
-                val = data.iat[i, j]
-                if j == n_cols - 1:
-                     # last column is label: keep as integer (e.g. 0/1)
-                    val = int(val)
-                else:
-                    # feature columns: encode as fixed-point integer
-                    val = int(round(val * scale))
+    Rows are routed to the train or test files by position (unshuffled
+    split, same sizes as train_test_split), so peak memory depends on
+    'chunk_rows' and not on the size of the dataset. The rows come from
+    the memory-mapped dataset cache (load_array), which is converted in
+    chunks as well.
 
-                # generate additive shares
-                s0, s1 = additive_shares(val)
+    Returns:
+        tuple[int, int, int]: (n_rows_train, n_cols, n_rows_test) as
+        counted while writing
+    """
 
-                # map to signed 64-bit for MP-SPDZ input
-                row_p0.append(to_signed_64(s0))
-                row_p1.append(to_signed_64(s1))
+    data = load_array(data_path)
+    n_train, _ = split_sizes(len(data), test_size)
 
-            # write rows to files, avoid trailing newline on last line
-            f0.write(" ".join(str(x) for x in row_p0) + ("\n" if i != n_rows - 1 else ""))
-            f1.write(" ".join(str(x) for x in row_p1) + ("\n" if i != n_rows - 1 else ""))
+    with ShareWriter(
+        party_filenames(0, n_parties, share_format, output_dir), scale, share_format, domain=domain
+    ) as train_writer, ShareWriter(
+        party_filenames(1, n_parties, share_format, output_dir), scale, share_format, domain=domain
+    ) as test_writer:
+        for start in range(0, len(data), chunk_rows):
+            values = np.asarray(data[start:start + chunk_rows])
+            cut = min(max(n_train - start, 0), len(values))
+            train_writer.append(values[:cut])
+            test_writer.append(values[cut:])
 
+    n_cols = max(train_writer.n_cols, test_writer.n_cols)
+    return train_writer.n_rows, n_cols, test_writer.n_rows
 
 
-def check_file_dim(f0, f1):
+def check_file_dim(*paths):
     """
-    Print number of rows and columns for two MP-SPDZ input files.
+    Print number of rows and columns for the MP-SPDZ input files of each party.
     Used as a sanity check for train/test share files.
+    Text files are read line by line, binary files only by header.
     """
-    with open(f0, "r") as file0, open(f1, "r") as file1:
-        lines0 = file0.readlines()
-        lines1 = file1.readlines()
+    for path in paths:
+        if path.endswith(BINARY_SUFFIX):
+            n_rows, n_cols, _, _ = read_share_header(path)
+        else:
+            with open(path, "r") as file:
+                first = file.readline()
+                n_rows = (1 if first else 0) + sum(1 for _ in file)
+            n_cols = len(first.split())
+
+        print(f"File {path} has {n_rows} rows and {n_cols} columns.")
 
-        cols0 = lines0[0].split()
-        cols1 = lines1[0].split()
 
-        print(f"File {f0} has {len(lines0)} rows and {len(cols0)} columns.")
-        print(f"File {f1} has {len(lines1)} rows and {len(cols1)} columns.")
+# ===========================================================
+# Share cache
+# ===========================================================
+#
+# SHARE_CACHE_FILE in the output directory records which CSV the shares
+# were made from: its size and SHA-256, the scale, test_size and format,
+# and the split sizes. On the next run
+#   - unchanged inputs reuse the shares as they are (no work at all; a CSV
+#     of the recorded size is not even read while the dataset cache has an
+#     entry with its current modification time, see source_sha256),
+#   - a CSV that only grew at the end (its first 'size' bytes still hash
+#     to the recorded SHA-256) is handled by sharing just the new rows:
+#     the train files are extended, the test files rewritten from the old
+#     test shares plus the new rows, and metadata.txt updated,
+#   - anything else is shared from scratch.
+# With an unshuffled split, appending rows moves the first test rows into
+# train; their existing shares are moved along rather than reshared.
+
+
+def hash_file(path, prefix_bytes=None):
+    """
+    SHA-256 of a file and, in the same pass, of its first 'prefix_bytes'.
+
+    Returns:
+        tuple[str, str | None]: (full digest, prefix digest or None if the
+        file is shorter than prefix_bytes or no prefix was asked for)
+    """
 
+    digest, prefix, position = hashlib.sha256(), None, 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            if prefix_bytes is not None and prefix is None and position + len(block) >= prefix_bytes:
+                cut = prefix_bytes - position
+                digest.update(block[:cut])
+                prefix = digest.copy().hexdigest()
+                block = block[cut:]
+            digest.update(block)
+            position += len(block)
+    if prefix_bytes == 0:
+        prefix = hashlib.sha256().hexdigest()
+    return digest.hexdigest(), prefix
+
+
+def share_settings(
+    share_format, scale, n_parties=DEFAULT_N_PARTIES, domain=DEFAULT_DOMAIN, k=DEFAULT_K
+):
+    """Optional metadata.txt lines describing the share files (see create_metafile)."""
+    return {
+        "share_format": share_format, "scale": scale, "k": k,
+        "n_parties": n_parties, "domain": domain,
+    }
+
+
+def load_share_state(output_dir=OUTPUT_DIR):
+    """State of the shares in 'output_dir' (see Share cache), None if unknown."""
+    try:
+        with open(os.path.join(output_dir, SHARE_CACHE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_share_state(
+    data_path, scale, test_size, share_format, n_rows_train, n_cols, n_rows_test,
+    output_dir=OUTPUT_DIR, sha256=None, n_parties=DEFAULT_N_PARTIES, domain=DEFAULT_DOMAIN,
+    k=DEFAULT_K,
+):
+    """Record what the shares in 'output_dir' were made from."""
+    size = os.path.getsize(data_path)
+    with open(data_path, "rb") as f:
+        f.seek(max(size - 1, 0))
+        last_byte = f.read(1)
+    state = {
+        "source": str(data_path),
+        "size": size,
+        "sha256": sha256 or source_sha256(data_path),
+        "ends_with_newline": last_byte == b"\n",
+        "scale": scale,
+        "k": k,
+        "test_size": test_size,
+        "share_format": share_format,
+        "n_parties": n_parties,
+        "domain": domain,
+        "n_rows_train": n_rows_train,
+        "n_cols": n_cols,
+        "n_rows_test": n_rows_test,
+    }
+    with open(os.path.join(output_dir, SHARE_CACHE_FILE), "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def read_shares(path, share_format: str = DEFAULT_SHARE_FORMAT):
+    """Load a whole share file into memory as an int64 matrix."""
+    if share_format == "binary":
+        return np.array(load_share_binary(path))
+    if os.path.getsize(path) == 0:
+        return np.empty((0, 0), dtype=np.int64)
+    return np.loadtxt(path, dtype=np.int64, ndmin=2)
+
+
+def reuse_shares(
+    data_path,
+    scale: int = DEFAULT_SCALE,
+    test_size: float = DEFAULT_TEST_SIZE,
+    share_format: str = DEFAULT_SHARE_FORMAT,
+    output_dir=OUTPUT_DIR,
+    n_parties: int = DEFAULT_N_PARTIES,
+    domain: str = DEFAULT_DOMAIN,
+    k: int = DEFAULT_K,
+):
+    """
+    Bring the shares in 'output_dir' up to date with 'data_path' without
+    resharing rows that are already shared (see Share cache).
+
+    Returns:
+        tuple[str, tuple[int, int, int] | None]: ("hit" | "append" | "miss",
+        (n_rows_train, n_cols, n_rows_test) or None on "miss")
+    """
+
+    state = load_share_state(output_dir)
+    files = party_filenames(0, n_parties, share_format, output_dir)
+    files += party_filenames(1, n_parties, share_format, output_dir)
+    settings = {"scale": scale, "k": k, "test_size": test_size, "share_format": share_format,
+                "n_parties": n_parties, "domain": domain}
+    if (
+        state is None
+        or any(state.get(name) != value for name, value in settings.items())
+        or not all(os.path.exists(f) for f in files)
+        or not os.path.exists(os.path.join(output_dir, "metadata.txt"))
+    ):
+        return "miss", None
+
+    counts = state["n_rows_train"], state["n_cols"], state["n_rows_test"]
+    size = os.path.getsize(data_path)
+    if size < state["size"]:
+        return "miss", None
+    if size == state["size"]:
+        # digest from the dataset cache, which only rehashes a CSV whose mtime changed
+        return ("hit", counts) if source_sha256(data_path) == state["sha256"] else ("miss", None)
+    sha256, prefix = hash_file(data_path, state["size"])
+    if prefix != state["sha256"]:
+        return "miss", None
+
+    # --- Only rows were appended: read just the new bytes ---
+    import pandas as pd
+
+    with open(data_path, "rb") as f:
+        f.seek(state["size"])
+        if not state["ends_with_newline"] and f.read(1) != b"\n":
+            return "miss", None  # the last old row was extended, not a new row added
+        try:
+            new_rows = pd.read_csv(f, header=None).to_numpy(dtype=np.float64)
+        except pd.errors.EmptyDataError:
+            return "miss", None
+    if new_rows.ndim != 2 or new_rows.shape[1] != state["n_cols"]:
+        return "miss", None
+
+    n_old_train, n_cols, n_old_test = counts
+    n_train, n_test = split_sizes(n_old_train + n_old_test + len(new_rows), test_size)
+    # old test rows that move into train, then new rows that go to train
+    moved = min(n_train - n_old_train, n_old_test)
+    new_train = n_train - n_old_train - moved
+
+    os.remove(os.path.join(output_dir, SHARE_CACHE_FILE))  # stale if interrupted below
+    train_files = party_filenames(0, n_parties, share_format, output_dir)
+    test_files = party_filenames(1, n_parties, share_format, output_dir)
+    old_test = [read_shares(f, share_format) for f in test_files]
+    new_shares = share_matrix(new_rows, scale, n_parties, domain)
+
+    with ShareWriter(train_files, scale, share_format, resume=True) as train_writer:
+        train_writer.append_shares(*(share[:moved] for share in old_test))
+        train_writer.append_shares(*(share[:new_train] for share in new_shares))
+    with ShareWriter(test_files, scale, share_format) as test_writer:
+        test_writer.append_shares(*(share[moved:] for share in old_test))
+        test_writer.append_shares(*(share[new_train:] for share in new_shares))
+
+    counts = train_writer.n_rows, n_cols, test_writer.n_rows
+    create_metafile(
+        *counts, extra=share_settings(share_format, scale, n_parties, domain, k), output_dir=output_dir
+    )
+    save_share_state(
+        data_path, scale, test_size, share_format, *counts, output_dir, sha256, n_parties, domain, k
+    )
+    print(
+        f"[CACHE] Shared {len(new_rows)} appended rows ({moved} test rows moved to train) "
+        f"into {output_dir}"
+    )
+    return "append", counts
 
 
 # ===========================================================
-# Main script
+# Preprocessing API
 # ===========================================================
 
-if __name__ == "__main__":
-    # --- Parse command-line arguments ---
-    if len(sys.argv) < 2:
-        print("Usage: python offline.py <dataset_name> [scale] [test_size]")
-        sys.exit(1)
+def preprocess(
+    dataset_name,
+    scale: int = DEFAULT_SCALE,
+    test_size: float = DEFAULT_TEST_SIZE,
+    share_format: str = DEFAULT_SHARE_FORMAT,
+    namespace: str = None,
+    n_parties: int = DEFAULT_N_PARTIES,
+    domain: str = DEFAULT_DOMAIN,
+    k: int = DEFAULT_K,
+    stream: bool = False,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    use_cache: bool = True,
+    player_data=OUTPUT_DIR,
+):
+    """
+    Secret-share a dataset into MP-SPDZ input files and write metadata.txt,
+    reusing up-to-date shares (see Share cache). Same as the command line,
+    but callable in-process or from a worker pool (plain arguments only).
+
+    Files go to <player_data>/<namespace>/ (without namespace:
+    <player_data>/); 'player_data' is relative to the working directory
+    unless absolute, so in-process callers should pass an absolute path.
+
+    Returns:
+        tuple[str, tuple[int, int, int]]: ("hit" | "append" | "share",
+        (n_rows_train, n_cols, n_rows_test))
+    """
 
-    dataset_name = sys.argv[1]
-    scale = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SCALE
-    test_size = float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_TEST_SIZE
+    output_dir = os.path.join(player_data, namespace) if namespace else str(player_data)
 
     # --- Ensure output directory exists ---
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
 
-    # --- Load dataset and split into train/test ---
-    df = load_data(dataset_name)
-    df = df.iloc[:, :]
-    X = df.iloc[:, :-1]
-    y = df.iloc[:, -1]
+    # --- Reuse shares of an unchanged or appended-to dataset ---
+    data_path = find_dataset(dataset_name)
+    if use_cache:
+        action, counts = reuse_shares(
+            data_path, scale, test_size, share_format, output_dir, n_parties, domain, k
+        )
+        if action == "hit":
+            print(f"[CACHE] Shares in {output_dir} are up to date with {data_path}")
+        if action != "miss":
+            return action, counts
+    # shares are about to be overwritten; an interrupted run must not look cached
+    if os.path.exists(os.path.join(output_dir, SHARE_CACHE_FILE)):
+        os.remove(os.path.join(output_dir, SHARE_CACHE_FILE))
+
+    if stream:
+        # --- Share chunk by chunk, counting rows on the way ---
+        counts = stream_shares(
+            data_path, scale, test_size, share_format, chunk_rows, output_dir, n_parties, domain
+        )
+    else:
+        # --- Load dataset and split into train/test ---
+        data = load_array(data_path)
 
-    # -- Split without shuffling to preserve temporal order if any ---
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, shuffle=False
-    )
-    train_data = pd.concat([X_train, y_train], axis=1)
-    test_data = pd.concat([X_test, y_test], axis=1)
+        # -- Split without shuffling to preserve temporal order if any ---
+        n_train, _ = split_sizes(len(data), test_size)
 
-    # --- Secret-share and save train/test datasets ---
-    save_shares(
-        os.path.join(OUTPUT_DIR, "Input-P0-0"),
-        os.path.join(OUTPUT_DIR, "Input-P1-0"),
-        train_data,
-        scale,
+        # --- Secret-share and save train/test datasets ---
+        for part, part_data in enumerate((data[:n_train], data[n_train:])):
+            with ShareWriter(
+                party_filenames(part, n_parties, share_format, output_dir), scale, share_format,
+                domain=domain,
+            ) as writer:
+                writer.append(part_data)
+        counts = n_train, data.shape[1], len(data) - n_train
+
+    # --- Create metadata file ---
+    create_metafile(
+        *counts, extra=share_settings(share_format, scale, n_parties, domain, k), output_dir=output_dir
     )
-    save_shares(
-        os.path.join(OUTPUT_DIR, "Input-P0-1"),
-        os.path.join(OUTPUT_DIR, "Input-P1-1"),
-        test_data,
-        scale,
+    save_share_state(
+        data_path, scale, test_size, share_format, *counts, output_dir,
+        n_parties=n_parties, domain=domain, k=k,
     )
+    return "share", counts
 
-    # --- Create metadata file ---
-    create_metafile(len(train_data), df.shape[1], len(test_data))
 
-    # --- Sanity check: print file dimensions ---
-    check_file_dim(
-        os.path.join(OUTPUT_DIR, "Input-P0-0"),
-        os.path.join(OUTPUT_DIR, "Input-P1-0"),
+# ===========================================================
+# Main script
+# ===========================================================
+
+if __name__ == "__main__":
+    # --- Parse command-line arguments ---
+    parser = argparse.ArgumentParser(
+        description="Secret-share a dataset into MP-SPDZ input files."
+    )
+    parser.add_argument("dataset_name", help="Dataset name (without .csv) or path to a .csv")
+    parser.add_argument("scale", nargs="?", type=int, default=DEFAULT_SCALE)
+    parser.add_argument("test_size", nargs="?", type=float, default=DEFAULT_TEST_SIZE)
+    parser.add_argument(
+        "--format",
+        dest="share_format",
+        choices=SHARE_FORMATS,
+        default=DEFAULT_SHARE_FORMAT,
+        help="Share file format (default: text)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read and share the CSV in chunks (bounded memory)",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help=f"Rows per chunk in streaming mode (default: {DEFAULT_CHUNK_ROWS})",
     )
-    check_file_dim(
-        os.path.join(OUTPUT_DIR, "Input-P0-1"),
-        os.path.join(OUTPUT_DIR, "Input-P1-1"),
+    parser.add_argument(
+        "--namespace",
+        help="Write shares and metadata to Player-Data/<namespace>/ instead of Player-Data/",
     )
+    parser.add_argument(
+        "--parties",
+        type=int,
+        default=DEFAULT_N_PARTIES,
+        help=f"Number of input parties to share among (default: {DEFAULT_N_PARTIES})",
+    )
+    parser.add_argument(
+        "--domain",
+        choices=SHARE_DOMAINS,
+        default=DEFAULT_DOMAIN,
+        help="Share domain of the protocol backend: 'ring' (Z_2^64) or 'field' (default: ring)",
+    )
+    parser.add_argument(
+        "--k",
+        type=int,
+        default=DEFAULT_K,
+        help=f"sfix bit length recorded for the MPC program (default: {DEFAULT_K})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Reshare everything even if the shares are up to date or only rows were appended",
+    )
+    args = parser.parse_args()
+
+    action, _ = preprocess(
+        args.dataset_name, args.scale, args.test_size, args.share_format, args.namespace,
+        args.parties, args.domain, args.k, args.stream, args.chunk_rows, not args.no_cache,
+    )
+
+    # --- Sanity check: print file dimensions ---
+    if action == "share":
+        output_dir = os.path.join(OUTPUT_DIR, args.namespace) if args.namespace else OUTPUT_DIR
+        for part in (0, 1):
+            check_file_dim(*party_filenames(part, args.parties, args.share_format, output_dir))
@@ -0,0 +1,212 @@
+# Dataset loader: CSVs converted once to memory-mappable float64 arrays
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# ======================================================
+# Configuration
+# ======================================================
+#
+# Every dataset (header-less CSV, label in the last column) is parsed once
+# and stored in CACHE_DIR as raw little-endian float64 rows plus a JSON
+# schema sidecar:
+#   <stem>-<sha256[:16]>.f64   n_rows x n_cols, C order
+#   <stem>-<sha256[:16]>.json  source, size, mtime_ns, sha256, n_rows, n_cols, dtype
+# Later loads memory-map the matching array, so nothing is parsed and only
+# the pages that are touched are read. While the CSV keeps the size and
+# modification time recorded in a sidecar, that entry is used without
+# reading the CSV at all; otherwise the CSV is hashed, and a changed CSV
+# hashes differently and is converted again. Entries of the old version of
+# the same source are removed then. The conversion reads the CSV in chunks, so
+# its memory use does not grow with the dataset either.
+
+BASE_DIR = Path(__file__).parents[2].resolve()
+DATA_DIRS = [BASE_DIR / "data_small", BASE_DIR / "data"]  # name lookup, first match wins
+CACHE_DIR = BASE_DIR / "dataset_cache"
+
+CACHE_DTYPE = "<f8"
+CACHE_VERSION = 2  # bump when the layout changes, older entries are converted again
+CONVERT_CHUNK_ROWS = 100_000
+
+
+def find_dataset(name) -> Path:
+    """A .csv path as is, otherwise <name>.csv from data_small/ or data/."""
+    if str(name).endswith(".csv") and Path(name).is_file():
+        return Path(name).resolve()
+    for data_dir in DATA_DIRS:
+        if (data_dir / f"{name}.csv").exists():
+            return data_dir / f"{name}.csv"
+    raise FileNotFoundError(f"Dataset {name} not found in {', '.join(map(str, DATA_DIRS))}")
+
+
+def hash_source(path) -> str:
+    """sha256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_paths(path: Path, sha256: str, cache_dir=CACHE_DIR) -> tuple:
+    """(array file, schema sidecar) of one version of a dataset."""
+    stem = Path(cache_dir) / f"{path.stem}-{sha256[:16]}"
+    return stem.with_suffix(".f64"), stem.with_suffix(".json")
+
+
+def read_schema(schema_file: Path):
+    """Schema sidecar as dict, or None if it is missing or unreadable."""
+    try:
+        return json.loads(schema_file.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def write_schema(schema_file: Path, schema: dict):
+    """Write a sidecar atomically (unique temporary file, then rename)."""
+    with tempfile.NamedTemporaryFile(
+        "w", dir=schema_file.parent, prefix=f"{schema_file.name}.", suffix=".tmp", delete=False
+    ) as f:
+        f.write(json.dumps(schema, indent=2))
+    os.replace(f.name, schema_file)
+
+
+def is_complete(schema: dict, array_file: Path) -> bool:
+    """Whether 'schema' is of the current layout and its array file has all rows."""
+    return (
+        schema.get("version") == CACHE_VERSION
+        and array_file.exists()
+        and array_file.stat().st_size == 8 * schema["n_rows"] * schema["n_cols"]
+    )
+
+
+def fresh_schema(path: Path, cache_dir=CACHE_DIR):
+    """
+    Schema of the complete cache entry of the CSV at 'path' if the CSV
+    still has the size and modification time recorded in it, else None.
+    Reads only sidecars, never the CSV.
+    """
+    stat = path.stat()
+    for schema_file in Path(cache_dir).glob(f"{path.stem}-*.json"):
+        schema = read_schema(schema_file)
+        if (
+            schema
+            and schema.get("source") == str(path)
+            and schema.get("size") == stat.st_size
+            and schema.get("mtime_ns") == stat.st_mtime_ns
+            and is_complete(schema, schema_file.with_suffix(".f64"))
+        ):
+            return schema
+    return None
+
+
+def source_sha256(name, cache_dir=CACHE_DIR) -> str:
+    """sha256 of dataset 'name' (see find_dataset), from a fresh cache entry if there is one."""
+    path = find_dataset(name)
+    schema = fresh_schema(path, cache_dir)
+    return schema["sha256"] if schema else hash_source(path)
+
+
+# ======================================================
+# Conversion and loading
+# ======================================================
+
+def convert_dataset(path: Path, sha256: str, cache_dir=CACHE_DIR, stat=None) -> dict:
+    """
+    Parse the CSV at 'path' in chunks into the cache (see Configuration)
+    and remove older entries of the same source. 'stat' is os.stat of the
+    CSV taken before it was hashed (default: now), so a CSV modified after
+    hashing does not look fresh.
+
+    The array is written under a unique temporary name and the sidecar
+    last, so an interrupted conversion never looks cached and concurrent
+    conversions (threads or processes) do not write to the same file.
+
+    Returns:
+        dict: schema of the new entry
+    """
+    import pandas as pd
+
+    stat = stat or path.stat()
+    array_file, schema_file = cache_paths(path, sha256, cache_dir)
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+    n_rows, n_cols = 0, 0
+    with tempfile.NamedTemporaryFile(
+        dir=cache_dir, prefix=f"{array_file.name}.", suffix=".tmp", delete=False
+    ) as f:
+        for chunk in pd.read_csv(path, header=None, chunksize=CONVERT_CHUNK_ROWS):
+            values = chunk.to_numpy(dtype=np.float64)
+            f.write(np.ascontiguousarray(values, dtype=CACHE_DTYPE).tobytes())
+            n_rows += len(values)
+            n_cols = values.shape[1]
+    os.replace(f.name, array_file)
+
+    schema = {
+        "version": CACHE_VERSION,
+        "source": str(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256,
+        "n_rows": n_rows,
+        "n_cols": n_cols,
+        "dtype": CACHE_DTYPE,
+        "array": array_file.name,
+    }
+    write_schema(schema_file, schema)
+
+    # --- Invalidate older versions of this source ---
+    for old_schema in Path(cache_dir).glob(f"{path.stem}-*.json"):
+        old = read_schema(old_schema)
+        if old_schema != schema_file and old and old.get("source") == str(path):
+            old_schema.unlink(missing_ok=True)
+            old_schema.with_suffix(".f64").unlink(missing_ok=True)
+    return schema
+
+
+def load_array(name, cache_dir=CACHE_DIR) -> np.ndarray:
+    """
+    Dataset 'name' (see find_dataset) as an n_rows x n_cols float64 array,
+    memory-mapped from the cache and converted first if needed.
+
+    The map is copy-on-write: callers may modify the array, changes stay
+    in memory and never reach the cache.
+
+    Returns:
+        np.ndarray: float64 matrix (np.memmap), label in the last column
+    """
+    path = find_dataset(name)
+    schema = fresh_schema(path, cache_dir)
+    if schema is None:
+        # size or modification time changed (or no entry yet): hash the CSV
+        stat = path.stat()
+        sha256 = hash_source(path)
+        array_file, schema_file = cache_paths(path, sha256, cache_dir)
+        schema = read_schema(schema_file)
+        if schema and schema.get("sha256") == sha256 and is_complete(schema, array_file):
+            # same content, e.g. copied or touched: record the new size and mtime
+            schema.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            write_schema(schema_file, schema)
+        else:
+            schema = convert_dataset(path, sha256, cache_dir, stat)
+    array_file = Path(cache_dir) / schema["array"]
+
+    shape = (schema["n_rows"], schema["n_cols"])
+    if schema["n_rows"] == 0:
+        return np.empty(shape, dtype=np.float64)
+    return np.memmap(array_file, dtype=schema["dtype"], mode="c", shape=shape)
+
+
+def load_data(name, cache_dir=CACHE_DIR):
+    """
+    Dataset 'name' as a float DataFrame with integer column labels, the
+    same as pd.read_csv(path, header=None).astype(float), without copying
+    the memory-mapped array.
+    """
+    import pandas as pd
+
+    return pd.DataFrame(load_array(name, cache_dir), copy=False)
@@ -0,0 +1,257 @@
+import json
+import re
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import psutil
+
+# ======================================================
+# Sampling profiler for running party processes
+# ======================================================
+#
+# A background thread samples every party process each 'interval'
+# seconds and appends one JSON line per party and sample:
+#   {"t", "party", "rss_mb", "peak_rss_mb", "cpu_percent",
+#    "threads": {tid: cpu_percent}, "sent_mb", "received_mb",
+#    "sent_mb_s", "received_mb_s"}
+# 't' uses the clock of the run's EventStream, so samples line up with
+# the epoch events parsed from the party log.
+#
+# Socket bytes come from the kernel's per-connection TCP counters
+# (`ss -tinp`, Linux), summed over the sockets owned by the party. Where
+# ss is missing the read/write syscall bytes of the process (psutil
+# io_counters) are used instead, which also count file I/O.
+
+DEFAULT_INTERVAL_S = 0.1
+CPU_BOUND_PERCENT = 80.0  # busiest thread above this: CPU-bound
+MEMORY_BOUND_FRACTION = 0.8  # peak RSS above this share of RAM: memory-bound
+
+
+_ss_pid_pattern = re.compile(r"pid=(\d+)")
+_ss_sent_pattern = re.compile(r"bytes_sent:(\d+)")
+_ss_received_pattern = re.compile(r"bytes_received:(\d+)")
+
+
+def socket_bytes(pids):
+    """
+    Bytes sent/received per TCP connection of the given processes.
+
+    Returns:
+        {pid: {(local, peer): (sent, received)}}, or None if ss is not available
+    """
+    try:
+        out = subprocess.run(
+            ["ss", "-tinpH", "state", "established"], capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    connections = {pid: {} for pid in pids}
+    owner = key = None
+    for line in out.splitlines():
+        if line[:1].isspace():  # info line of the socket above
+            if owner is not None:
+                sent = _ss_sent_pattern.search(line)
+                received = _ss_received_pattern.search(line)
+                connections[owner][key] = (
+                    int(sent.group(1)) if sent else 0,
+                    int(received.group(1)) if received else 0,
+                )
+            continue
+        owner = None
+        for pid in map(int, _ss_pid_pattern.findall(line)):
+            if pid in connections:
+                owner, key = pid, tuple(line.split("users:")[0].split()[-2:])
+    return connections
+
+
+def read_peak_rss_mb(pid: int):
+    """High-water mark of the resident set (Linux VmHWM), None elsewhere."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class PartyProfiler(threading.Thread):
+    """Samples memory, per-thread CPU and I/O of party processes."""
+
+    def __init__(self, pids: dict, path: Path, interval: float = DEFAULT_INTERVAL_S, clock=None):
+        super().__init__(daemon=True)
+        self.path = Path(path)
+        self.interval = interval
+        t0 = time.perf_counter()
+        self.clock = clock or (lambda: time.perf_counter() - t0)
+        self.procs = {}
+        for party, pid in pids.items():
+            try:
+                self.procs[party] = psutil.Process(pid)
+            except psutil.NoSuchProcess:  # already finished
+                pass
+        self.peak_rss_mb = dict.fromkeys(pids, 0.0)
+        self._sockets = {party: {} for party in pids}  # counters survive closed sockets
+        self._last = {}  # party -> (t, {tid: cpu_s}, sent, received)
+        self._done = threading.Event()
+
+    def _traffic(self, party: int, proc: psutil.Process, connections):
+        """Total (sent, received) bytes of the party so far."""
+        if connections is None:
+            try:
+                io = proc.io_counters()
+                return getattr(io, "write_chars", io.write_bytes), getattr(io, "read_chars", io.read_bytes)
+            except (AttributeError, psutil.AccessDenied):  # not available on macOS
+                return 0, 0
+        seen = self._sockets[party]
+        seen.update(connections.get(proc.pid, {}))
+        return sum(c[0] for c in seen.values()), sum(c[1] for c in seen.values())
+
+    def _sample(self, party: int, proc: psutil.Process, connections):
+        t = self.clock()
+        with proc.oneshot():
+            rss_mb = proc.memory_info().rss / (1024 * 1024)
+            threads = {th.id: th.user_time + th.system_time for th in proc.threads()}
+        sent, received = self._traffic(party, proc, connections)
+
+        peak = max(self.peak_rss_mb[party], rss_mb, read_peak_rss_mb(proc.pid) or 0.0)
+        self.peak_rss_mb[party] = peak
+
+        sample = {
+            "t": round(t, 6),
+            "party": party,
+            "rss_mb": rss_mb,
+            "peak_rss_mb": peak,
+            "sent_mb": sent / 1e6,
+            "received_mb": received / 1e6,
+        }
+        last = self._last.get(party)
+        if last:
+            dt = max(t - last[0], 1e-9)
+            per_thread = {
+                str(tid): 100.0 * (cpu - last[1].get(tid, 0.0)) / dt for tid, cpu in threads.items()
+            }
+            sample.update(
+                cpu_percent=sum(per_thread.values()),
+                threads=per_thread,
+                sent_mb_s=(sent - last[2]) / 1e6 / dt,
+                received_mb_s=(received - last[3]) / 1e6 / dt,
+            )
+        self._last[party] = (t, threads, sent, received)
+        return sample
+
+    def run(self):
+        with open(self.path, "w") as out:
+            while self.procs and not self._done.is_set():
+                connections = socket_bytes([proc.pid for proc in self.procs.values()])
+                for party, proc in list(self.procs.items()):
+                    try:
+                        out.write(json.dumps(self._sample(party, proc, connections)) + "\n")
+                    except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+                        del self.procs[party]  # party exited
+                out.flush()
+                self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+# ======================================================
+# Phase summaries
+# ======================================================
+
+def read_jsonl(path: Path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def phase_boundaries(events, t_last: float = None):
+    """
+    Phases of a run from its events (party 0): "epoch <i>" ends with that
+    epoch's train_acc line (epoch 1 includes the input phase), "final"
+    lasts until the last party exited (or 't_last' without exit events).
+
+    Returns:
+        list of (name, t_start, t_end)
+    """
+    ends = [e["t"] for e in events if e["event"] == "epoch" and e["party"] == 0]
+    exits = [e["t"] for e in events if e["event"] == "exit"]
+    t_end = max(exits) if exits else t_last
+
+    phases, t = [], 0.0
+    for i, end in enumerate(ends, 1):
+        phases.append((f"epoch {i}", t, end))
+        t = end
+    phases.append(("final", t, t_end))
+    return phases
+
+
+def classify(peak_rss_mb: float, busiest_thread_percent: float) -> str:
+    total_mb = psutil.virtual_memory().total / (1024 * 1024)
+    if peak_rss_mb >= MEMORY_BOUND_FRACTION * total_mb:
+        return "memory"
+    if busiest_thread_percent >= CPU_BOUND_PERCENT:
+        return "cpu"
+    return "network"  # neither computing nor short of memory: waiting on the peer
+
+
+def summarize_profile(profile_path: Path, events_path: Path):
+    """
+    Peaks and averages of the samples per phase and party.
+
+    Returns:
+        list of dicts (phase, party, t_start, t_end, peak_rss_mb, mean_cpu_percent,
+        busiest_thread_percent, mean_sent_mb_s, mean_received_mb_s, bound);
+        busiest_thread_percent averages the most loaded thread of each sample
+    """
+    samples = read_jsonl(profile_path)
+    t_last = max((s["t"] for s in samples), default=0.0)
+    summary = []
+    for name, start, end in phase_boundaries(read_jsonl(events_path), t_last):
+        for party in sorted({s["party"] for s in samples}):
+            window = [s for s in samples if s["party"] == party and start < s["t"] <= end]
+            rated = [s for s in window if "cpu_percent" in s]
+            if not rated:
+                continue
+            peak_rss = max(s["peak_rss_mb"] for s in window)
+            busiest = sum(max(s["threads"].values(), default=0.0) for s in rated) / len(rated)
+            summary.append({
+                "phase": name,
+                "party": party,
+                "t_start": start,
+                "t_end": end,
+                "peak_rss_mb": peak_rss,
+                "mean_cpu_percent": sum(s["cpu_percent"] for s in rated) / len(rated),
+                "busiest_thread_percent": busiest,
+                "mean_sent_mb_s": sum(s["sent_mb_s"] for s in rated) / len(rated),
+                "mean_received_mb_s": sum(s["received_mb_s"] for s in rated) / len(rated),
+                "bound": classify(peak_rss, busiest),
+            })
+    return summary
+
+
+def print_summary(summary):
+    print(
+        f"{'phase':<10}{'party':>6}{'seconds':>9}{'peak MB':>9}{'cpu %':>8}"
+        f"{'busiest %':>11}{'sent MB/s':>11}{'recv MB/s':>11}  bound"
+    )
+    for row in summary:
+        duration = row["t_end"] - row["t_start"]
+        print(
+            f"{row['phase']:<10}{row['party']:>6}{duration:>9.3f}{row['peak_rss_mb']:>9.1f}"
+            f"{row['mean_cpu_percent']:>8.1f}{row['busiest_thread_percent']:>11.1f}"
+            f"{row['mean_sent_mb_s']:>11.2f}{row['mean_received_mb_s']:>11.2f}  {row['bound']}"
+        )
+
+
+if __name__ == "__main__":
+    # Usage: python src/profiler.py logs/<exp_name> [...]
+    for run_dir in map(Path, sys.argv[1:]):
+        print(f"=== {run_dir.name} ===")
+        print_summary(summarize_profile(run_dir / "profile.jsonl", run_dir / "events.jsonl"))
@@ -0,0 +1,66 @@
+# Correctness of the vectorized Mersenne field kernels against Python integers
+# (python -m pytest tests, or python tests/test_mersenne.py)
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src" / "mpc"))
+
+import mersenne
+import mersenne127
+
+N = 100_000
+SCALE = 2**16
+OPERATIONS = (
+    ("mul", lambda x, y, p: x * y % p),
+    ("add", lambda x, y, p: (x + y) % p),
+    ("sub", lambda x, y, p: (x - y) % p),
+)
+
+
+def test_mersenne61_kernel():
+    """mul/add/sub on random and extreme values, CSPRNG samples in [0, p)."""
+    p = mersenne.P
+    a, b = mersenne.random_elements(N), mersenne.random_elements(N)
+    a[:4] = [0, 1, p - 1, p - 2]
+    b[:4] = [p - 1, p - 1, p - 1, 2**32]
+    assert int(a.max()) < p and int(b.max()) < p
+    for name, ref in OPERATIONS:
+        got = getattr(mersenne, name)(a, b).tolist()
+        assert got == [ref(x, y, p) for x, y in zip(a.tolist(), b.tolist())], name
+
+
+def test_mersenne61_sharing():
+    """Shares reconstruct the encoded values and MAC shares add up to alpha * x."""
+    data = np.random.default_rng(0).normal(size=(1000, 8))
+    for sign in (1, -1):  # negative values wrap around p
+        values = mersenne.encode(sign * data, SCALE)
+        alpha = int(mersenne.random_elements(()))
+        x0, x1, m0, m1 = mersenne.share_with_macs(values, alpha)
+        assert np.array_equal(mersenne.add(x0, x1), values)
+        assert np.array_equal(mersenne.add(m0, m1), mersenne.mul(values, np.uint64(alpha)))
+        assert np.allclose(mersenne.decode(values, SCALE), sign * data, atol=1 / SCALE)
+
+
+def test_mersenne127_kernel():
+    """mul/add/sub on random values and on all pairs of extreme values."""
+    p = mersenne127.P
+    extremes = [0, 1, 2, p - 1, p - 2, 2**63, 2**64 - 1, 2**64, 2**126, 2**127 - 2]
+    a, b = mersenne127.random_elements(N), mersenne127.random_elements(N)
+    a_ints, b_ints = mersenne127.to_ints(a), mersenne127.to_ints(b)
+    assert max(a_ints) < p and max(b_ints) < p
+    edges = np.stack([mersenne127.from_int(x) for x in extremes])
+    for name, ref in OPERATIONS:
+        op = getattr(mersenne127, name)
+        assert mersenne127.to_ints(op(a, b)) == [ref(x, y, p) for x, y in zip(a_ints, b_ints)], name
+        for y in extremes:
+            got = mersenne127.to_ints(op(edges, mersenne127.from_int(y)))
+            assert got == [ref(x, y, p) for x in extremes], (name, y)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"[OK] {name}")